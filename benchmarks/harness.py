@@ -0,0 +1,114 @@
+import gc
+import json
+import platform
+import statistics
+import time
+import tracemalloc
+from collections.abc import Awaitable, Callable
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any
+
+Operation = Callable[[], Awaitable[Any]]
+
+
+@dataclass
+class Result:
+    name: str
+    us_per_op: float
+    peak_bytes_per_op: float
+    retained_blocks_per_op: float
+
+
+@dataclass
+class Regression:
+    name: str
+    metric: str
+    baseline: float
+    current: float
+
+    @property
+    def ratio(self) -> float:
+        return self.current / self.baseline if self.baseline else float("inf")
+
+
+async def measure(
+    name: str, operation: Operation, iterations: int = 2000, repeats: int = 5, warmup: int = 200
+) -> Result:
+    """Time `operation` and trace the memory it allocates.
+
+    The time is the median over `repeats` runs of `iterations` calls, with the garbage collector disabled so a
+    collection triggered by another benchmark doesn't land in this one. Allocations are traced separately, because
+    tracemalloc slows every allocation down: `peak_bytes_per_op` is the average transient memory peak of a call,
+    and `retained_blocks_per_op` the number of memory blocks still alive after the calls, which should stay close
+    to zero.
+    """
+    for _ in range(warmup):
+        await operation()
+
+    timings = []
+    gc.disable()
+    try:
+        for _ in range(repeats):
+            start = time.perf_counter_ns()
+            for _ in range(iterations):
+                await operation()
+            timings.append((time.perf_counter_ns() - start) / iterations / 1000)
+    finally:
+        gc.enable()
+
+    traced_calls = max(1, iterations // 10)
+    gc.collect()
+    tracemalloc.start()
+    try:
+        peaks = 0
+        before = tracemalloc.take_snapshot()
+        for _ in range(traced_calls):
+            current, _ = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+            await operation()
+            peaks += tracemalloc.get_traced_memory()[1] - current
+        gc.collect()
+        after = tracemalloc.take_snapshot()
+    finally:
+        tracemalloc.stop()
+
+    retained = sum(stat.count_diff for stat in after.compare_to(before, "filename"))
+    return Result(
+        name=name,
+        us_per_op=statistics.median(timings),
+        peak_bytes_per_op=peaks / traced_calls,
+        retained_blocks_per_op=retained / traced_calls,
+    )
+
+
+def load_baselines(path: Path) -> dict[str, dict[str, float]]:
+    if not path.exists():
+        return {}
+    return json.loads(path.read_text())["results"]
+
+
+def save_baselines(path: Path, results: list[Result]) -> None:
+    data = {
+        "machine": {"python": platform.python_version(), "platform": platform.platform()},
+        "results": {result.name: asdict(result) for result in results},
+    }
+    path.write_text(json.dumps(data, indent=2, sort_keys=True) + "\n")
+
+
+def find_regressions(
+    results: list[Result], baselines: dict[str, dict[str, float]], threshold: float
+) -> list[Regression]:
+    """Results slower, or allocating more, than their baseline by more than `threshold` (0.25 is 25%)."""
+    regressions = []
+    for result in results:
+        baseline = baselines.get(result.name)
+        if baseline is None:
+            continue
+
+        for metric in ("us_per_op", "peak_bytes_per_op"):
+            current = getattr(result, metric)
+            if current > baseline[metric] * (1 + threshold):
+                regressions.append(Regression(result.name, metric, baseline[metric], current))
+
+    return regressions
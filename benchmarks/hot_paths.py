@@ -0,0 +1,252 @@
+"""Microbenchmarks of the code every request goes through: the cache decorator, the rate limiter and the auth
+dependencies, and of the list endpoints' page queries.
+
+They run in-process against local stand-ins, fakeredis for Redis and a throwaway SQLite database for Postgres, so
+the numbers measure the application's own overhead rather than the network. Compare them across commits on the
+same machine only.
+
+    python -m benchmarks.hot_paths              # compare against benchmarks/baselines.json
+    python -m benchmarks.hot_paths --save       # record new baselines
+"""
+
+import asyncio
+import os
+import tempfile
+import uuid
+from collections.abc import Awaitable, Callable
+from contextlib import AsyncExitStack
+from datetime import UTC, datetime, timedelta
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any
+from unittest.mock import patch
+
+import typer
+
+os.environ.setdefault("SECRET_KEY", "benchmark-secret-key")
+
+import fakeredis  # noqa: E402
+from fastapi import Response  # noqa: E402
+from sqlalchemy import insert  # noqa: E402
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine  # noqa: E402
+from starlette.datastructures import State  # noqa: E402
+from starlette.requests import Request  # noqa: E402
+
+from src.app.api import dependencies  # noqa: E402
+from src.app.api.dependencies import get_current_user, rate_limiter_dependency  # noqa: E402
+from src.app.core.db.database import Base  # noqa: E402
+from src.app.core.security import TokenType, create_access_token, verify_token  # noqa: E402
+from src.app.core.utils import cache as cache_module  # noqa: E402
+from src.app.core.utils.pagination import encode_cursor, keyset_paginated_response  # noqa: E402
+from src.app.core.utils.rate_limit import SCRIPTS, RateLimiter, rate_limiter  # noqa: E402
+from src.app.crud.crud_posts import crud_posts  # noqa: E402
+from src.app.models import Post, User  # noqa: E402
+from src.app.schemas.post import PostRead  # noqa: E402
+from src.app.schemas.rate_limit import RateLimitAlgorithm  # noqa: E402
+
+from .harness import Result, find_regressions, load_baselines, measure, save_baselines  # noqa: E402
+
+BASELINES = Path(__file__).parent / "baselines.json"
+# high enough that no benchmark is ever rejected, so every call takes the same path
+LIMIT = 10**6
+# posts of the paginated user, the deep page being the last
+POSTS = 5000
+PAGE_SIZE = 10
+
+Benchmark = tuple[str, Callable[[], Awaitable[Any]]]
+
+app = typer.Typer(pretty_exceptions_show_locals=False)
+
+
+def _request(method: str = "GET", headers: list[tuple[bytes, bytes]] | None = None) -> Request:
+    return Request(
+        {
+            "type": "http",
+            "method": method,
+            "path": "/api/v1/posts/1",
+            "query_string": b"",
+            "headers": headers or [],
+            "client": ("127.0.0.1", 50000),
+            "app": SimpleNamespace(state=State()),
+        }
+    )
+
+
+async def _redis_benchmarks(stack: AsyncExitStack) -> list[Benchmark]:
+    redis = fakeredis.FakeAsyncRedis()
+    scripts = {algorithm: redis.register_script(script) for algorithm, script in SCRIPTS.items()}
+    stack.enter_context(patch.object(cache_module, "client", redis))
+    stack.enter_context(patch.object(RateLimiter, "client", redis))
+    stack.enter_context(patch.object(RateLimiter, "scripts", scripts))
+    stack.enter_context(patch.object(dependencies, "DEFAULT_LIMIT", LIMIT))
+
+    @cache_module.cache(key_prefix="benchmark_post", resource_id_name="id")
+    async def read_post(request: Request, id: int) -> dict:
+        return {"id": id, "title": "Benchmark", "text": "x" * 200}
+
+    request = _request()
+    await read_post(request, id=1)
+
+    async def cache_hit() -> None:
+        await read_post(request, id=1)
+
+    async def fixed_window() -> None:
+        await rate_limiter.is_rate_limited(1, "api_v1_posts", limit=LIMIT, period=60)
+
+    async def gcra() -> None:
+        await rate_limiter.is_rate_limited(1, "api_v1_posts", limit=LIMIT, period=60, algorithm=RateLimitAlgorithm.GCRA)
+
+    async def anonymous_dependency() -> None:
+        await rate_limiter_dependency(_request(), Response(), user=None)
+
+    return [
+        ("cache.inner[hit]", cache_hit),
+        ("RateLimiter.is_rate_limited[fixed_window]", fixed_window),
+        ("RateLimiter.is_rate_limited[gcra]", gcra),
+        ("rate_limiter_dependency[anonymous]", anonymous_dependency),
+    ]
+
+
+async def _auth_benchmarks(stack: AsyncExitStack, database: Path) -> list[Benchmark]:
+    engine = create_async_engine(f"sqlite+aiosqlite:///{database}")
+    stack.push_async_callback(engine.dispose)
+    # SQLite can't autoincrement a column of a composite primary key, so the user's id is set by hand
+    tables = [Base.metadata.tables[name] for name in ("tier", "user", "token_blacklist")]
+    with patch.object(User.__table__.c.id, "autoincrement", False):
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all, tables=tables)
+
+    db = await stack.enter_async_context(async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)())
+    user = User(name="Benchmark", username="benchmark", email="benchmark@example.com", hashed_password="x")
+    user.id = 1
+    db.add(user)
+    await db.commit()
+
+    token = await create_access_token(data={"sub": user.username})
+
+    async def verify() -> None:
+        await verify_token(token, TokenType.ACCESS, db)
+
+    headers = [(b"authorization", f"Bearer {token}".encode())]
+
+    async def current_user() -> None:
+        # a new request each time, so the auth context isn't reused
+        await get_current_user(_request(headers=headers), token, db=db)
+
+    return [("verify_token", verify), ("get_current_user", current_user)]
+
+
+async def _pagination_benchmarks(stack: AsyncExitStack, database: Path) -> list[Benchmark]:
+    engine = create_async_engine(f"sqlite+aiosqlite:///{database}")
+    stack.push_async_callback(engine.dispose)
+    tables = [Base.metadata.tables[name] for name in ("tier", "user", "post")]
+    with (
+        patch.object(User.__table__.c.id, "autoincrement", False),
+        patch.object(Post.__table__.c.id, "autoincrement", False),
+    ):
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all, tables=tables)
+
+    start = datetime(2025, 1, 1, tzinfo=UTC)
+    posts = [
+        {
+            "id": i,
+            "uuid": uuid.uuid4(),
+            "created_by_user_id": 1,
+            "title": f"Post {i}",
+            "text": "x" * 200,
+            "created_at": start + timedelta(seconds=i),
+            "is_deleted": False,
+        }
+        for i in range(1, POSTS + 1)
+    ]
+    async with engine.begin() as conn:
+        await conn.execute(
+            insert(User.__table__),
+            {
+                "id": 1,
+                "uuid": uuid.uuid4(),
+                "name": "Benchmark",
+                "username": "benchmark",
+                "email": "b@example.com",
+                "hashed_password": "x",
+                "profile_image_url": "",
+                "created_at": start,
+                "is_deleted": False,
+                "is_superuser": False,
+            },
+        )
+        await conn.execute(insert(Post.__table__), posts)
+
+    db = await stack.enter_async_context(async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)())
+    # the newest first, as keyset pagination orders them
+    deepest = posts[PAGE_SIZE]
+    cursor = encode_cursor(deepest["created_at"].replace(tzinfo=None), deepest["id"])
+
+    async def offset_page() -> None:
+        await crud_posts.get_multi(
+            db=db,
+            offset=POSTS - PAGE_SIZE,
+            limit=PAGE_SIZE,
+            sort_columns=["created_at", "id"],
+            sort_orders=["desc", "desc"],
+            return_total_count=False,
+            created_by_user_id=1,
+            is_deleted=False,
+        )
+
+    async def keyset_page() -> None:
+        await keyset_paginated_response(
+            crud_posts, db, cursor, PAGE_SIZE, schema_to_select=PostRead, created_by_user_id=1, is_deleted=False
+        )
+
+    return [("posts_page[offset,deep]", offset_page), ("posts_page[keyset,deep]", keyset_page)]
+
+
+async def run(iterations: int, repeats: int) -> list[Result]:
+    results = []
+    async with AsyncExitStack() as stack:
+        directory = Path(stack.enter_context(tempfile.TemporaryDirectory()))
+        benchmarks = (
+            await _redis_benchmarks(stack)
+            + await _auth_benchmarks(stack, directory / "benchmark.db")
+            + await _pagination_benchmarks(stack, directory / "pagination.db")
+        )
+        for name, operation in benchmarks:
+            result = await measure(name, operation, iterations=iterations, repeats=repeats, warmup=iterations // 10)
+            typer.echo(
+                f"{name:<45} {result.us_per_op:>10.1f} µs/op {result.peak_bytes_per_op:>10.0f} B/op "
+                f"{result.retained_blocks_per_op:>8.2f} retained blocks/op"
+            )
+            results.append(result)
+    return results
+
+
+@app.command()
+def main(
+    iterations: int = typer.Option(2000, help="Calls per timed run."),
+    repeats: int = typer.Option(5, help="Timed runs, the median is reported."),
+    threshold: float = typer.Option(0.25, help="Slowdown or allocation growth flagged as a regression."),
+    save: bool = typer.Option(False, help="Store the results as the new baselines."),
+    baselines: Path = typer.Option(BASELINES, help="Baselines file."),
+) -> None:
+    results = asyncio.run(run(iterations, repeats))
+
+    if save:
+        save_baselines(baselines, results)
+        typer.echo(f"Saved baselines to {baselines}")
+        return
+
+    regressions = find_regressions(results, load_baselines(baselines), threshold)
+    for regression in regressions:
+        typer.echo(
+            f"REGRESSION {regression.name} {regression.metric}: {regression.baseline:.1f} -> "
+            f"{regression.current:.1f} ({regression.ratio:.2f}x)",
+            err=True,
+        )
+    if regressions:
+        raise typer.Exit(code=1)
+
+
+if __name__ == "__main__":
+    app()
@@ -1,6 +1,8 @@
+from collections.abc import AsyncGenerator
+from dataclasses import dataclass
 from typing import Annotated, Any, cast
 
-from fastapi import Depends, HTTPException, Request
+from fastapi import Depends, HTTPException, Request, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from ..core.config import settings
@@ -8,52 +10,83 @@ from ..core.db.database import async_get_db
 from ..core.exceptions.http_exceptions import ForbiddenException, RateLimitException, UnauthorizedException
 from ..core.logger import logging
 from ..core.security import TokenType, oauth2_scheme, verify_token
+from ..core.utils.concurrency_limit import concurrency_limiter
+from ..core.utils.principal_cache import principal_cache
 from ..core.utils.rate_limit import rate_limiter
-from ..crud.crud_rate_limit import crud_rate_limits
-from ..crud.crud_tier import crud_tiers
+from ..core.utils.rate_limit_policies import policy_table
 from ..crud.crud_users import crud_users
-from ..schemas.rate_limit import RateLimitRead, sanitize_path
-from ..schemas.tier import TierRead
+from ..schemas.rate_limit import RateLimitAlgorithm, route_key
+from ..schemas.user import UserPrincipal
 
 logger = logging.getLogger(__name__)
 
 DEFAULT_LIMIT = settings.DEFAULT_RATE_LIMIT_LIMIT
 DEFAULT_PERIOD = settings.DEFAULT_RATE_LIMIT_PERIOD
+DEFAULT_ALGORITHM = RateLimitAlgorithm(settings.DEFAULT_RATE_LIMIT_ALGORITHM)
 
 
-async def get_current_user(
-    token: Annotated[str, Depends(oauth2_scheme)], db: Annotated[AsyncSession, Depends(async_get_db)]
-) -> dict[str, Any] | None:
+@dataclass(frozen=True, slots=True)
+class AuthContext:
+    """Who a request is authenticated as, resolved at most once per request and kept on `request.state.auth`."""
+
+    token: str | None
+    user: dict[str, Any] | None
+
+
+async def authenticate(token: str, db: AsyncSession) -> dict[str, Any] | None:
+    """Decode `token`, check it wasn't revoked and load its user, from the principal cache when possible."""
     token_data = await verify_token(token, TokenType.ACCESS, db)
     if token_data is None:
-        raise UnauthorizedException("User not authenticated.")
+        return None
+
+    subject = token_data.username_or_email
+    principal = await principal_cache.get(subject)
+    if principal is not None:
+        return principal
 
-    if "@" in token_data.username_or_email:
-        user = await crud_users.get(db=db, email=token_data.username_or_email, is_deleted=False)
+    if "@" in subject:
+        user = await crud_users.get(db=db, email=subject, is_deleted=False, schema_to_select=UserPrincipal)
     else:
-        user = await crud_users.get(db=db, username=token_data.username_or_email, is_deleted=False)
+        user = await crud_users.get(db=db, username=subject, is_deleted=False, schema_to_select=UserPrincipal)
 
     if user:
+        await principal_cache.set(subject, cast(dict[str, Any], user))
         return cast(dict[str, Any], user)
 
-    raise UnauthorizedException("User not authenticated.")
+    return None
 
 
-async def get_optional_user(request: Request, db: AsyncSession = Depends(async_get_db)) -> dict | None:
-    token = request.headers.get("Authorization")
-    if not token:
-        return None
+async def get_auth_context(request: Request, db: AsyncSession) -> AuthContext:
+    """Authenticate the request's bearer token on first use, then return the same context to every dependency."""
+    context: AuthContext | None = getattr(request.state, "auth", None)
+    if context is not None:
+        return context
 
-    try:
-        token_type, _, token_value = token.partition(" ")
-        if token_type.lower() != "bearer" or not token_value:
-            return None
+    token_type, _, token = request.headers.get("Authorization", "").partition(" ")
+    if token_type.lower() != "bearer" or not token:
+        context = AuthContext(token=None, user=None)
+    else:
+        context = AuthContext(token=token, user=await authenticate(token, db))
 
-        token_data = await verify_token(token_value, TokenType.ACCESS, db)
-        if token_data is None:
-            return None
+    request.state.auth = context
+    return context
 
-        return await get_current_user(token_value, db=db)
+
+async def get_current_user(
+    request: Request,
+    token: Annotated[str, Depends(oauth2_scheme)],
+    db: Annotated[AsyncSession, Depends(async_get_db)],
+) -> dict[str, Any] | None:
+    context = await get_auth_context(request, db)
+    if context.user is None:
+        raise UnauthorizedException("User not authenticated.")
+
+    return context.user
+
+
+async def get_optional_user(request: Request, db: AsyncSession = Depends(async_get_db)) -> dict | None:
+    try:
+        context = await get_auth_context(request, db)
 
     except HTTPException as http_exc:
         if http_exc.status_code != 401:
@@ -64,6 +97,8 @@ async def get_optional_user(request: Request, db: AsyncSession = Depends(async_g
         logger.error(f"Unexpected error in get_optional_user: {exc}")
         return None
 
+    return context.user
+
 
 async def get_current_superuser(current_user: Annotated[dict, Depends(get_current_user)]) -> dict:
     if not current_user["is_superuser"]:
@@ -73,34 +108,76 @@ async def get_current_superuser(current_user: Annotated[dict, Depends(get_curren
 
 
 async def rate_limiter_dependency(
-    request: Request, db: Annotated[AsyncSession, Depends(async_get_db)], user: dict | None = Depends(get_optional_user)
+    request: Request, response: Response, user: dict | None = Depends(get_optional_user)
 ) -> None:
     if hasattr(request.app.state, "initialization_complete"):
         await request.app.state.initialization_complete.wait()
 
-    path = sanitize_path(request.url.path)
+    if user:
+        policy_table.remember_subject(user["username"], user["id"], user["tier_id"])
+
+    counted = getattr(request.state, "rate_limit", None)
+    if counted is not None:
+        # already admitted and counted by RateLimitMiddleware
+        response.headers.update(counted.headers())
+        return
+
+    path = route_key(request.scope.get("route"), request.url.path)
     if user:
         user_id = user["id"]
-        tier = await crud_tiers.get(db, id=user["tier_id"], schema_to_select=TierRead)
-        if tier:
-            tier = cast(TierRead, tier)
-            rate_limit = await crud_rate_limits.get(db=db, tier_id=tier.id, path=path, schema_to_select=RateLimitRead)
-            if rate_limit:
-                rate_limit = cast(RateLimitRead, rate_limit)
-                limit, period = rate_limit.limit, rate_limit.period
+        tier_name = policy_table.tier_name(user["tier_id"]) if user["tier_id"] is not None else None
+        if tier_name is not None:
+            policy = policy_table.get(user["tier_id"], path)
+            if policy is not None:
+                limit, period, algorithm = policy.limit, policy.period, policy.algorithm
             else:
                 logger.warning(
-                    f"User {user_id} with tier '{tier.name}' has no specific rate limit for path '{path}'. \
+                    f"User {user_id} with tier '{tier_name}' has no specific rate limit for path '{path}'. \
                         Applying default rate limit."
                 )
-                limit, period = DEFAULT_LIMIT, DEFAULT_PERIOD
+                limit, period, algorithm = DEFAULT_LIMIT, DEFAULT_PERIOD, DEFAULT_ALGORITHM
         else:
             logger.warning(f"User {user_id} has no assigned tier. Applying default rate limit.")
-            limit, period = DEFAULT_LIMIT, DEFAULT_PERIOD
+            limit, period, algorithm = DEFAULT_LIMIT, DEFAULT_PERIOD, DEFAULT_ALGORITHM
     else:
         user_id = request.client.host if request.client else "unknown"
-        limit, period = DEFAULT_LIMIT, DEFAULT_PERIOD
+        limit, period, algorithm = DEFAULT_LIMIT, DEFAULT_PERIOD, DEFAULT_ALGORITHM
+
+    result = await rate_limiter.check(user_id=user_id, path=path, limit=limit, period=period, algorithm=algorithm)
+    if not result.allowed:
+        raise RateLimitException("Rate limit exceeded.", headers=result.headers())
+
+    response.headers.update(result.headers())
+
 
-    is_limited = await rate_limiter.is_rate_limited(db=db, user_id=user_id, path=path, limit=limit, period=period)
-    if is_limited:
-        raise RateLimitException("Rate limit exceeded.")
+async def bulk_request() -> None:
+    """Marks a route as bulk traffic, which is shed before interactive requests when the server is overloaded."""
+
+
+async def concurrency_limiter_dependency(
+    request: Request, user: dict | None = Depends(get_optional_user)
+) -> AsyncGenerator[None, None]:
+    """Hold one of the user's concurrency slots on the route for the duration of the request.
+
+    When all slots are taken, the request waits up to the policy's queue timeout for one to free up, then is
+    rejected with a 429.
+    """
+    if concurrency_limiter.client is None:
+        yield
+        return
+
+    path = route_key(request.scope.get("route"), request.url.path)
+    if user:
+        user_id, tier_id = user["id"], user["tier_id"]
+    else:
+        user_id, tier_id = (request.client.host if request.client else "unknown"), None
+
+    key = concurrency_limiter.key(user_id, path)
+    token = await concurrency_limiter.acquire(key, policy_table.resolve_concurrency(tier_id, path))
+    if token is None:
+        raise RateLimitException("Too many concurrent requests.", headers={"Retry-After": "1"})
+
+    try:
+        yield
+    finally:
+        await concurrency_limiter.release(key, token)
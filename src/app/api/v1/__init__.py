@@ -1,7 +1,10 @@
 from fastapi import APIRouter
 
+from .cache import router as cache_router
+from .concurrency_limits import router as concurrency_limits_router
 from .login import router as login_router
 from .logout import router as logout_router
+from .metrics import router as metrics_router
 from .utils import router as utils_router
 from .rate_limits import router as rate_limits_router
 from .tasks import router as tasks_router
@@ -12,3 +15,6 @@ router.include_router(logout_router)
 router.include_router(utils_router)
 router.include_router(tasks_router)
 router.include_router(rate_limits_router)
+router.include_router(concurrency_limits_router)
+router.include_router(metrics_router)
+router.include_router(cache_router)
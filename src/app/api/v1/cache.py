@@ -0,0 +1,41 @@
+from fastapi import APIRouter, Depends, HTTPException
+
+from ...api.dependencies import get_current_superuser
+from ...core.utils import queue
+from ...core.utils.cache import bump_namespaces
+from ...schemas.job import Job
+
+router = APIRouter(prefix="/cache", tags=["cache"])
+
+
+@router.post("/warm", response_model=Job, status_code=202, dependencies=[Depends(get_current_superuser)])
+async def warm_cache(max_users: int | None = None, pages: int | None = None) -> dict[str, str]:
+    """Enqueue a cache warming job on the worker.
+
+    Parameters
+    ----------
+    max_users: int | None
+        How many of the most active users to warm. Defaults to `CACHE_WARMING_MAX_USERS`.
+    pages: int | None
+        How many pages of posts to warm per user. Defaults to `CACHE_WARMING_PAGES`.
+
+    Returns
+    -------
+    dict[str, str]
+        A dictionary containing the ID of the warming job.
+    """
+    if queue.pool is None:
+        raise HTTPException(status_code=503, detail="Queue is not available")
+
+    job = await queue.pool.enqueue_job("warm_cache", max_users, pages)
+    if job is None:
+        raise HTTPException(status_code=500, detail="Failed to create task")
+
+    return {"id": job.job_id}
+
+
+@router.post("/namespace/{namespace}/bump", dependencies=[Depends(get_current_superuser)])
+async def bump_cache_namespace(namespace: str) -> dict[str, str]:
+    """Invalidate every cache entry of a namespace, such as "post_schema" or "user:{username}"."""
+    await bump_namespaces(namespace)
+    return {"message": f"Cache namespace {namespace} invalidated"}
@@ -0,0 +1,145 @@
+from typing import Annotated, Any, cast
+
+from fastapi import APIRouter, Depends, Request
+from fastcrud.paginated import PaginatedListResponse, compute_offset, paginated_response
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ...api.dependencies import bulk_request, get_current_superuser
+from ...core.db.database import async_get_db, async_get_read_db
+from ...core.exceptions.http_exceptions import DuplicateValueException, NotFoundException
+from ...core.utils.rate_limit_policies import publish_policy_change
+from ...crud.crud_concurrency_limit import crud_concurrency_limits
+from ...crud.crud_tier import crud_tiers
+from ...schemas.concurrency_limit import (
+    ConcurrencyLimitCreate,
+    ConcurrencyLimitCreateInternal,
+    ConcurrencyLimitRead,
+    ConcurrencyLimitUpdate,
+)
+from ...schemas.tier import TierRead
+
+router = APIRouter(tags=["concurrency_limits"])
+
+
+@router.post("/tier/{tier_name}/concurrency_limit", dependencies=[Depends(get_current_superuser)], status_code=201)
+async def write_concurrency_limit(
+    request: Request,
+    tier_name: str,
+    concurrency_limit: ConcurrencyLimitCreate,
+    db: Annotated[AsyncSession, Depends(async_get_db)],
+) -> ConcurrencyLimitRead:
+    db_tier = await crud_tiers.get(db=db, name=tier_name, schema_to_select=TierRead)
+    if not db_tier:
+        raise NotFoundException("Tier not found")
+
+    db_tier = cast(TierRead, db_tier)
+    concurrency_limit_internal_dict = concurrency_limit.model_dump()
+    concurrency_limit_internal_dict["tier_id"] = db_tier.id
+
+    db_concurrency_limit = await crud_concurrency_limits.exists(db=db, name=concurrency_limit_internal_dict["name"])
+    if db_concurrency_limit:
+        raise DuplicateValueException("Concurrency Limit Name not available")
+
+    concurrency_limit_internal = ConcurrencyLimitCreateInternal(**concurrency_limit_internal_dict)
+    created_concurrency_limit = await crud_concurrency_limits.create(db=db, object=concurrency_limit_internal)
+    await publish_policy_change()
+
+    concurrency_limit_read = await crud_concurrency_limits.get(
+        db=db, id=created_concurrency_limit.id, schema_to_select=ConcurrencyLimitRead
+    )
+    if concurrency_limit_read is None:
+        raise NotFoundException("Created concurrency limit not found")
+
+    return cast(ConcurrencyLimitRead, concurrency_limit_read)
+
+
+@router.get(
+    "/tier/{tier_name}/concurrency_limits",
+    response_model=PaginatedListResponse[ConcurrencyLimitRead],
+    dependencies=[Depends(bulk_request)],
+)
+async def read_concurrency_limits(
+    request: Request,
+    tier_name: str,
+    db: Annotated[AsyncSession, Depends(async_get_read_db)],
+    page: int = 1,
+    items_per_page: int = 10,
+) -> dict:
+    db_tier = await crud_tiers.get(db=db, name=tier_name, schema_to_select=TierRead)
+    if not db_tier:
+        raise NotFoundException("Tier not found")
+
+    db_tier = cast(TierRead, db_tier)
+    concurrency_limits_data = await crud_concurrency_limits.get_multi(
+        db=db,
+        offset=compute_offset(page, items_per_page),
+        limit=items_per_page,
+        tier_id=db_tier.id,
+    )
+
+    response: dict[str, Any] = paginated_response(
+        crud_data=concurrency_limits_data, page=page, items_per_page=items_per_page
+    )
+    return response
+
+
+@router.get("/tier/{tier_name}/concurrency_limit/{id}", response_model=ConcurrencyLimitRead)
+async def read_concurrency_limit(
+    request: Request, tier_name: str, id: int, db: Annotated[AsyncSession, Depends(async_get_read_db)]
+) -> ConcurrencyLimitRead:
+    db_tier = await crud_tiers.get(db=db, name=tier_name, schema_to_select=TierRead)
+    if not db_tier:
+        raise NotFoundException("Tier not found")
+
+    db_tier = cast(TierRead, db_tier)
+    db_concurrency_limit = await crud_concurrency_limits.get(
+        db=db, tier_id=db_tier.id, id=id, schema_to_select=ConcurrencyLimitRead
+    )
+    if db_concurrency_limit is None:
+        raise NotFoundException("Concurrency Limit not found")
+
+    return cast(ConcurrencyLimitRead, db_concurrency_limit)
+
+
+@router.patch("/tier/{tier_name}/concurrency_limit/{id}", dependencies=[Depends(get_current_superuser)])
+async def patch_concurrency_limit(
+    request: Request,
+    tier_name: str,
+    id: int,
+    values: ConcurrencyLimitUpdate,
+    db: Annotated[AsyncSession, Depends(async_get_db)],
+) -> dict[str, str]:
+    db_tier = await crud_tiers.get(db=db, name=tier_name, schema_to_select=TierRead)
+    if not db_tier:
+        raise NotFoundException("Tier not found")
+
+    db_tier = cast(TierRead, db_tier)
+    db_concurrency_limit = await crud_concurrency_limits.get(
+        db=db, tier_id=db_tier.id, id=id, schema_to_select=ConcurrencyLimitRead
+    )
+    if db_concurrency_limit is None:
+        raise NotFoundException("Concurrency Limit not found")
+
+    await crud_concurrency_limits.update(db=db, object=values, id=id)
+    await publish_policy_change()
+    return {"message": "Concurrency Limit updated"}
+
+
+@router.delete("/tier/{tier_name}/concurrency_limit/{id}", dependencies=[Depends(get_current_superuser)])
+async def erase_concurrency_limit(
+    request: Request, tier_name: str, id: int, db: Annotated[AsyncSession, Depends(async_get_db)]
+) -> dict[str, str]:
+    db_tier = await crud_tiers.get(db=db, name=tier_name, schema_to_select=TierRead)
+    if not db_tier:
+        raise NotFoundException("Tier not found")
+
+    db_tier = cast(TierRead, db_tier)
+    db_concurrency_limit = await crud_concurrency_limits.get(
+        db=db, tier_id=db_tier.id, id=id, schema_to_select=ConcurrencyLimitRead
+    )
+    if db_concurrency_limit is None:
+        raise NotFoundException("Concurrency Limit not found")
+
+    await crud_concurrency_limits.delete(db=db, id=id)
+    await publish_policy_change()
+    return {"message": "Concurrency Limit deleted"}
@@ -19,6 +19,7 @@ from ...core.security import (
     create_refresh_token,
     verify_token,
 )
+from ...core.utils.login_throttle import login_throttle
 
 from ...crud.crud_users import crud_users
 
@@ -26,13 +27,19 @@ router = APIRouter(tags=["login"])
 
 @router.post("/login", response_model=Token)
 async def login_for_access_token(
+    request: Request,
     response: Response,
     form_data: Annotated[OAuth2PasswordRequestForm, Depends()],
     db: Annotated[AsyncSession, Depends(async_get_db)],
 ) -> dict[str, str]:
-    user = await authenticate_user(username_or_email=form_data.username, password=form_data.password, db=db)
-    if not user:
-        raise UnauthorizedException("Wrong username, email or password.")
+    ip = request.client.host if request.client else "unknown"
+    async with login_throttle.attempt(form_data.username, ip):
+        user = await authenticate_user(username_or_email=form_data.username, password=form_data.password, db=db)
+        if not user:
+            await login_throttle.failed(form_data.username, ip)
+            raise UnauthorizedException("Wrong username, email or password.")
+
+    await login_throttle.succeeded(form_data.username)
 
     access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = await create_access_token(data={"sub": user["username"]}, expires_delta=access_token_expires)
@@ -0,0 +1,25 @@
+from typing import Any
+
+from fastapi import APIRouter, Depends
+from fastapi.responses import PlainTextResponse
+
+from ...api.dependencies import get_current_superuser
+from ...core.utils.cache import hot_keys
+from ...core.utils.metrics import registry
+
+router = APIRouter(tags=["metrics"])
+
+
+@router.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+async def read_metrics() -> str:
+    """Expose process metrics in the Prometheus text format."""
+    return registry.render()
+
+
+@router.get("/metrics/cache/hot_keys", dependencies=[Depends(get_current_superuser)])
+async def read_cache_hot_keys(limit: int = 20) -> dict[str, Any]:
+    """Report the most requested cache keys seen by this worker.
+
+    Counts are estimated from a sample of lookups, scaled by the configured sample rate.
+    """
+    return {"sample_rate": hot_keys.sample_rate, "capacity": hot_keys.capacity, "keys": hot_keys.top(limit)}
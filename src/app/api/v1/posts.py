@@ -1,20 +1,35 @@
 from typing import Annotated, Any, cast
 
-from fastapi import APIRouter, Depends, Request
+from fastapi import APIRouter, Body, Depends, Query, Request
 from fastcrud.paginated import PaginatedListResponse, compute_offset, paginated_response
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from ...api.dependencies import get_current_superuser, get_current_user
+from ...api.dependencies import bulk_request, get_current_superuser, get_current_user
+from ...core.config import settings
 from ...core.db.database import async_get_db
 from ...core.exceptions.http_exceptions import ForbiddenException, NotFoundException
-from ...core.utils.cache import cache
+from ...core.utils.bulk import BulkCreateResponse, BulkReadResponse, get_many, insert_many, validate_items
+from ...core.utils.cache import cache, clear_not_found_markers, resolve_cache_key, resolve_cache_keys
+from ...core.utils.counts import CountStrategy, count_rows
+from ...core.utils.pagination import CursorPaginatedListResponse, keyset_paginated_response
 from ...crud.crud_posts import crud_posts
+from ...crud.crud_user_scoped import get_user_post, get_user_posts, resolve_user
 from ...crud.crud_users import crud_users
 from ...schemas.post import PostCreate, PostCreateInternal, PostRead, PostUpdate
 from ...schemas.user import UserRead
 
 router = APIRouter(tags=["posts"])
 
+POSTS_CACHE_KEY_PREFIX = "{username}_posts:page_{page}:items_per_page:{items_per_page}:cursor_{cursor}"
+POSTS_CACHE_EXPIRATION = 60
+POST_CACHE_KEY_PREFIX = "{username}_post_cache"
+POST_CACHE_EXPIRATION = 3600
+NOT_FOUND_EXPIRATION = settings.CACHE_NOT_FOUND_EXPIRATION
+# bump "post_schema" when PostRead changes, "user:{username}" to drop everything cached for one user
+POSTS_CACHE_NAMESPACES = ["post_schema", "user:{username}"]
+# a user's post count is kept until one of their posts is written, so paging doesn't recount them
+POSTS_COUNT_STRATEGY = CountStrategy.CACHED
+
 
 @router.post("/{username}/post", response_model=PostRead, status_code=201)
 async def write_post(
@@ -39,6 +54,11 @@ async def write_post(
 
     post_internal = PostCreateInternal(**post_internal_dict)
     created_post = await crud_posts.create(db=db, object=post_internal)
+    await clear_not_found_markers(
+        await resolve_cache_key(
+            POST_CACHE_KEY_PREFIX, created_post.id, {"username": username}, namespaces=POSTS_CACHE_NAMESPACES
+        )
+    )
 
     post_read = await crud_posts.get(db=db, id=created_post.id, schema_to_select=PostRead)
     if post_read is None:
@@ -47,11 +67,53 @@ async def write_post(
     return cast(PostRead, post_read)
 
 
-@router.get("/{username}/posts", response_model=PaginatedListResponse[PostRead])
+@router.post(
+    "/{username}/posts/bulk",
+    response_model=BulkCreateResponse[PostRead],
+    status_code=201,
+    dependencies=[Depends(bulk_request)],
+)
+async def write_posts(
+    request: Request,
+    username: str,
+    posts: Annotated[list[dict[str, Any]], Body(max_length=settings.BULK_MAX_ITEMS)],
+    current_user: Annotated[dict, Depends(get_current_user)],
+    db: Annotated[AsyncSession, Depends(async_get_db)],
+) -> dict[str, Any]:
+    db_user = await resolve_user(db, username)
+    if db_user is None:
+        raise NotFoundException("User not found")
+
+    if current_user["id"] != db_user["id"]:
+        raise ForbiddenException()
+
+    valid, errors = validate_items(PostCreate, posts)
+    rows = [{**post.model_dump(), "created_by_user_id": db_user["id"]} for _, post in valid]
+    created = await insert_many(crud_posts, db, rows, PostRead) if rows else []
+    if created:
+        await clear_not_found_markers(
+            *await resolve_cache_keys(
+                POST_CACHE_KEY_PREFIX,
+                [post["id"] for post in created],
+                {"username": username},
+                namespaces=POSTS_CACHE_NAMESPACES,
+            )
+        )
+
+    return {"data": created, "errors": errors}
+
+
+@router.get(
+    "/{username}/posts",
+    response_model=PaginatedListResponse[PostRead] | CursorPaginatedListResponse[PostRead],
+    dependencies=[Depends(bulk_request)],
+)
 @cache(
-    key_prefix="{username}_posts:page_{page}:items_per_page:{items_per_page}",
+    key_prefix=POSTS_CACHE_KEY_PREFIX,
     resource_id_name="username",
-    expiration=60,
+    expiration=POSTS_CACHE_EXPIRATION,
+    not_found_expiration=NOT_FOUND_EXPIRATION,
+    namespaces=POSTS_CACHE_NAMESPACES,
 )
 async def read_posts(
     request: Request,
@@ -59,37 +121,67 @@ async def read_posts(
     db: Annotated[AsyncSession, Depends(async_get_db)],
     page: int = 1,
     items_per_page: int = 10,
+    cursor: str | None = None,
 ) -> dict:
-    db_user = await crud_users.get(db=db, username=username, is_deleted=False, schema_to_select=UserRead)
-    if not db_user:
+    if cursor is not None:
+        db_user = await resolve_user(db, username)
+        if db_user is None:
+            raise NotFoundException("User not found")
+
+        return await keyset_paginated_response(
+            crud_posts,
+            db,
+            cursor,
+            items_per_page,
+            schema_to_select=PostRead,
+            created_by_user_id=db_user["id"],
+            is_deleted=False,
+        )
+
+    db_user, posts = await get_user_posts(db, username, compute_offset(page, items_per_page), items_per_page)
+    if db_user is None:
         raise NotFoundException("User not found")
 
-    db_user = cast(UserRead, db_user)
-    posts_data = await crud_posts.get_multi(
-        db=db,
-        offset=compute_offset(page, items_per_page),
-        limit=items_per_page,
-        created_by_user_id=db_user.id,
-        is_deleted=False,
+    total_count = await count_rows(
+        crud_posts, db, POSTS_COUNT_STRATEGY, created_by_user_id=db_user["id"], is_deleted=False
     )
+    posts_data = {"data": posts, "total_count": total_count}
 
     response: dict[str, Any] = paginated_response(crud_data=posts_data, page=page, items_per_page=items_per_page)
     return response
 
 
+@router.get("/{username}/posts/bulk", response_model=BulkReadResponse[PostRead], dependencies=[Depends(bulk_request)])
+async def read_posts_by_ids(
+    request: Request,
+    username: str,
+    ids: Annotated[list[int], Query(max_length=settings.BULK_MAX_ITEMS)],
+    db: Annotated[AsyncSession, Depends(async_get_db)],
+) -> dict[str, Any]:
+    db_user = await resolve_user(db, username)
+    if db_user is None:
+        raise NotFoundException("User not found")
+
+    posts = await get_many(crud_posts, db, ids, PostRead, created_by_user_id=db_user["id"], is_deleted=False)
+    found = {post["id"] for post in posts}
+    return {"data": posts, "missing": [id for id in dict.fromkeys(ids) if id not in found]}
+
+
 @router.get("/{username}/post/{id}", response_model=PostRead)
-@cache(key_prefix="{username}_post_cache", resource_id_name="id")
+@cache(
+    key_prefix=POST_CACHE_KEY_PREFIX,
+    resource_id_name="id",
+    expiration=POST_CACHE_EXPIRATION,
+    not_found_expiration=NOT_FOUND_EXPIRATION,
+    namespaces=POSTS_CACHE_NAMESPACES,
+)
 async def read_post(
     request: Request, username: str, id: int, db: Annotated[AsyncSession, Depends(async_get_db)]
 ) -> PostRead:
-    db_user = await crud_users.get(db=db, username=username, is_deleted=False, schema_to_select=UserRead)
+    db_user, db_post = await get_user_post(db, username, id)
     if db_user is None:
         raise NotFoundException("User not found")
 
-    db_user = cast(UserRead, db_user)
-    db_post = await crud_posts.get(
-        db=db, id=id, created_by_user_id=db_user.id, is_deleted=False, schema_to_select=PostRead
-    )
     if db_post is None:
         raise NotFoundException("Post not found")
 
@@ -97,7 +189,12 @@ async def read_post(
 
 
 @router.patch("/{username}/post/{id}")
-@cache("{username}_post_cache", resource_id_name="id", pattern_to_invalidate_extra=["{username}_posts:*"])
+@cache(
+    POST_CACHE_KEY_PREFIX,
+    resource_id_name="id",
+    pattern_to_invalidate_extra=["{username}_posts:*"],
+    namespaces=POSTS_CACHE_NAMESPACES,
+)
 async def patch_post(
     request: Request,
     username: str,
@@ -106,24 +203,28 @@ async def patch_post(
     current_user: Annotated[dict, Depends(get_current_user)],
     db: Annotated[AsyncSession, Depends(async_get_db)],
 ) -> dict[str, str]:
-    db_user = await crud_users.get(db=db, username=username, is_deleted=False, schema_to_select=UserRead)
+    db_user, db_post = await get_user_post(db, username, id)
     if db_user is None:
         raise NotFoundException("User not found")
 
-    db_user = cast(UserRead, db_user)
-    if current_user["id"] != db_user.id:
+    if current_user["id"] != db_user["id"]:
         raise ForbiddenException()
 
-    db_post = await crud_posts.get(db=db, id=id, is_deleted=False, schema_to_select=PostRead)
     if db_post is None:
         raise NotFoundException("Post not found")
 
-    await crud_posts.update(db=db, object=values, id=id)
+    # filtering by the author as well lets the write invalidate only their cached post counts
+    await crud_posts.update(db=db, object=values, id=id, created_by_user_id=db_user["id"])
     return {"message": "Post updated"}
 
 
 @router.delete("/{username}/post/{id}")
-@cache("{username}_post_cache", resource_id_name="id", to_invalidate_extra={"{username}_posts": "{username}"})
+@cache(
+    POST_CACHE_KEY_PREFIX,
+    resource_id_name="id",
+    to_invalidate_extra={"{username}_posts": "{username}"},
+    namespaces=POSTS_CACHE_NAMESPACES,
+)
 async def erase_post(
     request: Request,
     username: str,
@@ -131,25 +232,28 @@ async def erase_post(
     current_user: Annotated[dict, Depends(get_current_user)],
     db: Annotated[AsyncSession, Depends(async_get_db)],
 ) -> dict[str, str]:
-    db_user = await crud_users.get(db=db, username=username, is_deleted=False, schema_to_select=UserRead)
+    db_user, db_post = await get_user_post(db, username, id)
     if db_user is None:
         raise NotFoundException("User not found")
 
-    db_user = cast(UserRead, db_user)
-    if current_user["id"] != db_user.id:
+    if current_user["id"] != db_user["id"]:
         raise ForbiddenException()
 
-    db_post = await crud_posts.get(db=db, id=id, is_deleted=False, schema_to_select=PostRead)
     if db_post is None:
         raise NotFoundException("Post not found")
 
-    await crud_posts.delete(db=db, id=id)
+    await crud_posts.delete(db=db, id=id, created_by_user_id=db_user["id"])
 
     return {"message": "Post deleted"}
 
 
 @router.delete("/{username}/db_post/{id}", dependencies=[Depends(get_current_superuser)])
-@cache("{username}_post_cache", resource_id_name="id", to_invalidate_extra={"{username}_posts": "{username}"})
+@cache(
+    POST_CACHE_KEY_PREFIX,
+    resource_id_name="id",
+    to_invalidate_extra={"{username}_posts": "{username}"},
+    namespaces=POSTS_CACHE_NAMESPACES,
+)
 async def erase_db_post(
     request: Request, username: str, id: int, db: Annotated[AsyncSession, Depends(async_get_db)]
 ) -> dict[str, str]:
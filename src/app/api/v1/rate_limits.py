@@ -4,9 +4,12 @@ from fastapi import APIRouter, Depends, Request
 from fastcrud.paginated import PaginatedListResponse, compute_offset, paginated_response
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from ...api.dependencies import get_current_superuser
-from ...core.db.database import async_get_db
+from ...api.dependencies import bulk_request, get_current_superuser
+from ...core.db.database import async_get_db, async_get_read_db
 from ...core.exceptions.http_exceptions import DuplicateValueException, NotFoundException
+from ...core.utils.counts import CountStrategy, count_rows
+from ...core.utils.pagination import CursorPaginatedListResponse, keyset_paginated_response
+from ...core.utils.rate_limit_policies import publish_policy_change
 from ...crud.crud_rate_limit import crud_rate_limits
 from ...crud.crud_tier import crud_tiers
 from ...schemas.rate_limit import RateLimitCreate, RateLimitCreateInternal, RateLimitRead, RateLimitUpdate
@@ -14,6 +17,9 @@ from ...schemas.tier import TierRead
 
 router = APIRouter(tags=["rate_limits"])
 
+# a tier has a handful of rate limits, counting them is cheap
+RATE_LIMITS_COUNT_STRATEGY = CountStrategy.EXACT
+
 
 @router.post("/tier/{tier_name}/rate_limit", dependencies=[Depends(get_current_superuser)], status_code=201)
 async def write_rate_limit(
@@ -33,6 +39,7 @@ async def write_rate_limit(
 
     rate_limit_internal = RateLimitCreateInternal(**rate_limit_internal_dict)
     created_rate_limit = await crud_rate_limits.create(db=db, object=rate_limit_internal)
+    await publish_policy_change()
 
     rate_limit_read = await crud_rate_limits.get(db=db, id=created_rate_limit.id, schema_to_select=RateLimitRead)
     if rate_limit_read is None:
@@ -41,25 +48,39 @@ async def write_rate_limit(
     return cast(RateLimitRead, rate_limit_read)
 
 
-@router.get("/tier/{tier_name}/rate_limits", response_model=PaginatedListResponse[RateLimitRead])
+@router.get(
+    "/tier/{tier_name}/rate_limits",
+    response_model=PaginatedListResponse[RateLimitRead] | CursorPaginatedListResponse[RateLimitRead],
+    dependencies=[Depends(bulk_request)],
+)
 async def read_rate_limits(
     request: Request,
     tier_name: str,
-    db: Annotated[AsyncSession, Depends(async_get_db)],
+    db: Annotated[AsyncSession, Depends(async_get_read_db)],
     page: int = 1,
     items_per_page: int = 10,
+    cursor: str | None = None,
 ) -> dict:
     db_tier = await crud_tiers.get(db=db, name=tier_name, schema_to_select=TierRead)
     if not db_tier:
         raise NotFoundException("Tier not found")
 
     db_tier = cast(TierRead, db_tier)
+    if cursor is not None:
+        return await keyset_paginated_response(
+            crud_rate_limits, db, cursor, items_per_page, schema_to_select=RateLimitRead, tier_id=db_tier.id
+        )
+
     rate_limits_data = await crud_rate_limits.get_multi(
         db=db,
         offset=compute_offset(page, items_per_page),
         limit=items_per_page,
+        return_total_count=False,
         tier_id=db_tier.id,
     )
+    rate_limits_data["total_count"] = await count_rows(
+        crud_rate_limits, db, RATE_LIMITS_COUNT_STRATEGY, tier_id=db_tier.id
+    )
 
     response: dict[str, Any] = paginated_response(crud_data=rate_limits_data, page=page, items_per_page=items_per_page)
     return response
@@ -67,7 +88,7 @@ async def read_rate_limits(
 
 @router.get("/tier/{tier_name}/rate_limit/{id}", response_model=RateLimitRead)
 async def read_rate_limit(
-    request: Request, tier_name: str, id: int, db: Annotated[AsyncSession, Depends(async_get_db)]
+    request: Request, tier_name: str, id: int, db: Annotated[AsyncSession, Depends(async_get_read_db)]
 ) -> RateLimitRead:
     db_tier = await crud_tiers.get(db=db, name=tier_name, schema_to_select=TierRead)
     if not db_tier:
@@ -99,6 +120,7 @@ async def patch_rate_limit(
         raise NotFoundException("Rate Limit not found")
 
     await crud_rate_limits.update(db=db, object=values, id=id)
+    await publish_policy_change()
     return {"message": "Rate Limit updated"}
 
 
@@ -116,4 +138,5 @@ async def erase_rate_limit(
         raise NotFoundException("Rate Limit not found")
 
     await crud_rate_limits.delete(db=db, id=id)
+    await publish_policy_change()
     return {"message": "Rate Limit deleted"}
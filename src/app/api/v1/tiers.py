@@ -4,9 +4,10 @@ from fastapi import APIRouter, Depends, Request
 from fastcrud.paginated import PaginatedListResponse, compute_offset, paginated_response
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from ...api.dependencies import get_current_superuser
-from ...core.db.database import async_get_db
+from ...api.dependencies import bulk_request, get_current_superuser
+from ...core.db.database import async_get_db, async_get_read_db
 from ...core.exceptions.http_exceptions import DuplicateValueException, NotFoundException
+from ...core.utils.rate_limit_policies import publish_policy_change
 from ...crud.crud_tier import crud_tiers
 from ...schemas.tier import TierCreate, TierCreateInternal, TierRead, TierUpdate
 
@@ -24,6 +25,7 @@ async def write_tier(
 
     tier_internal = TierCreateInternal(**tier_internal_dict)
     created_tier = await crud_tiers.create(db=db, object=tier_internal)
+    await publish_policy_change()
 
     tier_read = await crud_tiers.get(db=db, id=created_tier.id, schema_to_select=TierRead)
     if tier_read is None:
@@ -32,9 +34,9 @@ async def write_tier(
     return cast(TierRead, tier_read)
 
 
-@router.get("/tiers", response_model=PaginatedListResponse[TierRead])
+@router.get("/tiers", response_model=PaginatedListResponse[TierRead], dependencies=[Depends(bulk_request)])
 async def read_tiers(
-    request: Request, db: Annotated[AsyncSession, Depends(async_get_db)], page: int = 1, items_per_page: int = 10
+    request: Request, db: Annotated[AsyncSession, Depends(async_get_read_db)], page: int = 1, items_per_page: int = 10
 ) -> dict:
     tiers_data = await crud_tiers.get_multi(db=db, offset=compute_offset(page, items_per_page), limit=items_per_page)
 
@@ -43,7 +45,7 @@ async def read_tiers(
 
 
 @router.get("/tier/{name}", response_model=TierRead)
-async def read_tier(request: Request, name: str, db: Annotated[AsyncSession, Depends(async_get_db)]) -> TierRead:
+async def read_tier(request: Request, name: str, db: Annotated[AsyncSession, Depends(async_get_read_db)]) -> TierRead:
     db_tier = await crud_tiers.get(db=db, name=name, schema_to_select=TierRead)
     if db_tier is None:
         raise NotFoundException("Tier not found")
@@ -60,6 +62,7 @@ async def patch_tier(
         raise NotFoundException("Tier not found")
 
     await crud_tiers.update(db=db, object=values, name=name)
+    await publish_policy_change()
     return {"message": "Tier updated"}
 
 
@@ -70,4 +73,5 @@ async def erase_tier(request: Request, name: str, db: Annotated[AsyncSession, De
         raise NotFoundException("Tier not found")
 
     await crud_tiers.delete(db=db, name=name)
+    await publish_policy_change()
     return {"message": "Tier deleted"}
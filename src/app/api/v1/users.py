@@ -1,21 +1,52 @@
 from typing import Annotated, Any, cast
 
-from fastapi import APIRouter, Depends, Request
+from fastapi import APIRouter, Body, Depends, Query, Request
 from fastcrud.paginated import PaginatedListResponse, compute_offset, paginated_response
+from sqlalchemy import or_, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from ...api.dependencies import get_current_superuser, get_current_user
-from ...core.db.database import async_get_db
+from ...api.dependencies import bulk_request, get_current_superuser, get_current_user
+from ...core.config import settings
+from ...core.db.database import async_get_db, async_get_read_db
 from ...core.exceptions.http_exceptions import DuplicateValueException, ForbiddenException, NotFoundException
-from ...core.security import blacklist_token, get_password_hash, oauth2_scheme
-from ...crud.crud_rate_limit import crud_rate_limits
+from ...core.security import blacklist_token, hash_password, hash_passwords, oauth2_scheme
+from ...core.utils.bulk import (
+    BulkCreateResponse,
+    BulkReadResponse,
+    get_many,
+    insert_many,
+    item_error,
+    validate_items,
+)
+from ...core.utils.cache import (
+    build_cache_key,
+    bump_namespaces,
+    clear_not_found_markers,
+    get_not_found_marker,
+    set_not_found_marker,
+)
+from ...core.utils.counts import CountStrategy, count_rows
+from ...core.utils.pagination import CursorPaginatedListResponse, keyset_paginated_response
 from ...crud.crud_tier import crud_tiers
+from ...crud.crud_user_scoped import get_user_rate_limits, get_user_tier
 from ...crud.crud_users import crud_users
+from ...models.user import User
 from ...schemas.tier import TierRead
 from ...schemas.user import UserCreate, UserCreateInternal, UserRead, UserTierUpdate, UserUpdate
 
 router = APIRouter(tags=["users"])
 
+USER_NOT_FOUND_KEY_PREFIX = "user_not_found"
+NOT_FOUND_EXPIRATION = settings.CACHE_NOT_FOUND_EXPIRATION
+# the user list is public and large, an estimate of its total is close enough
+USERS_COUNT_STRATEGY = CountStrategy.ESTIMATED
+
+
+async def _clear_user_not_found_markers(*usernames: str) -> None:
+    await clear_not_found_markers(*[build_cache_key(USER_NOT_FOUND_KEY_PREFIX, username, {}) for username in usernames])
+    # the markers of their posts are namespaced by the user, so bumping it hides them without scanning for them
+    await bump_namespaces(*[f"user:{username}" for username in usernames])
+
 
 @router.post("/user", response_model=UserRead, status_code=201)
 async def write_user(
@@ -30,11 +61,12 @@ async def write_user(
         raise DuplicateValueException("Username not available")
 
     user_internal_dict = user.model_dump()
-    user_internal_dict["hashed_password"] = get_password_hash(password=user_internal_dict["password"])
+    user_internal_dict["hashed_password"] = await hash_password(password=user_internal_dict["password"])
     del user_internal_dict["password"]
 
     user_internal = UserCreateInternal(**user_internal_dict)
     created_user = await crud_users.create(db=db, object=user_internal)
+    await _clear_user_not_found_markers(user.username)
 
     user_read = await crud_users.get(db=db, id=created_user.id, schema_to_select=UserRead)
     if user_read is None:
@@ -43,16 +75,92 @@ async def write_user(
     return cast(UserRead, user_read)
 
 
-@router.get("/users", response_model=PaginatedListResponse[UserRead])
+@router.post(
+    "/users/bulk",
+    response_model=BulkCreateResponse[UserRead],
+    status_code=201,
+    dependencies=[Depends(get_current_superuser), Depends(bulk_request)],
+)
+async def write_users(
+    request: Request,
+    users: Annotated[list[dict[str, Any]], Body(max_length=settings.BULK_MAX_USERS)],
+    db: Annotated[AsyncSession, Depends(async_get_db)],
+) -> dict[str, Any]:
+    valid, errors = validate_items(UserCreate, users)
+    usernames, emails = [user.username for _, user in valid], [user.email for _, user in valid]
+    taken = await db.execute(
+        select(User.username, User.email).where(or_(User.username.in_(usernames), User.email.in_(emails)))
+    )
+    taken_usernames, taken_emails = set(), set()
+    for username, email in taken:
+        taken_usernames.add(username)
+        taken_emails.add(email)
+
+    # checked in order, so of two items with the same username or email the first is created
+    accepted = []
+    for index, user in valid:
+        if user.email in taken_emails:
+            errors.append(item_error(index, "email", "Email is already registered", "duplicate_value"))
+        elif user.username in taken_usernames:
+            errors.append(item_error(index, "username", "Username not available", "duplicate_value"))
+        else:
+            taken_usernames.add(user.username)
+            taken_emails.add(user.email)
+            accepted.append(user)
+    errors.sort(key=lambda error: error["index"])
+
+    hashed_passwords = await hash_passwords([user.password for user in accepted])
+    rows = [
+        {**user.model_dump(exclude={"password"}), "hashed_password": hashed_password}
+        for user, hashed_password in zip(accepted, hashed_passwords, strict=True)
+    ]
+    created = await insert_many(crud_users, db, rows, UserRead) if rows else []
+    if created:
+        await _clear_user_not_found_markers(*[user["username"] for user in created])
+
+    return {"data": created, "errors": errors}
+
+
+@router.get(
+    "/users/bulk",
+    response_model=BulkReadResponse[UserRead],
+    dependencies=[Depends(bulk_request)],
+)
+async def read_users_by_ids(
+    request: Request,
+    ids: Annotated[list[int], Query(max_length=settings.BULK_MAX_ITEMS)],
+    db: Annotated[AsyncSession, Depends(async_get_read_db)],
+) -> dict[str, Any]:
+    users = await get_many(crud_users, db, ids, UserRead, is_deleted=False)
+    found = {user["id"] for user in users}
+    return {"data": users, "missing": [id for id in dict.fromkeys(ids) if id not in found]}
+
+
+@router.get(
+    "/users",
+    response_model=PaginatedListResponse[UserRead] | CursorPaginatedListResponse[UserRead],
+    dependencies=[Depends(bulk_request)],
+)
 async def read_users(
-    request: Request, db: Annotated[AsyncSession, Depends(async_get_db)], page: int = 1, items_per_page: int = 10
+    request: Request,
+    db: Annotated[AsyncSession, Depends(async_get_read_db)],
+    page: int = 1,
+    items_per_page: int = 10,
+    cursor: str | None = None,
 ) -> dict:
+    if cursor is not None:
+        return await keyset_paginated_response(
+            crud_users, db, cursor, items_per_page, schema_to_select=UserRead, is_deleted=False
+        )
+
     users_data = await crud_users.get_multi(
         db=db,
         offset=compute_offset(page, items_per_page),
         limit=items_per_page,
+        return_total_count=False,
         is_deleted=False,
     )
+    users_data["total_count"] = await count_rows(crud_users, db, USERS_COUNT_STRATEGY, is_deleted=False)
 
     response: dict[str, Any] = paginated_response(crud_data=users_data, page=page, items_per_page=items_per_page)
     return response
@@ -65,8 +173,14 @@ async def read_users_me(request: Request, current_user: Annotated[dict, Depends(
 
 @router.get("/user/{username}", response_model=UserRead)
 async def read_user(request: Request, username: str, db: Annotated[AsyncSession, Depends(async_get_db)]) -> UserRead:
+    not_found_key = build_cache_key(USER_NOT_FOUND_KEY_PREFIX, username, {})
+    not_found_detail = await get_not_found_marker(not_found_key)
+    if not_found_detail is not None:
+        raise NotFoundException(not_found_detail)
+
     db_user = await crud_users.get(db=db, username=username, is_deleted=False, schema_to_select=UserRead)
     if db_user is None:
+        await set_not_found_marker(not_found_key, "User not found", NOT_FOUND_EXPIRATION)
         raise NotFoundException("User not found")
 
     return cast(UserRead, db_user)
@@ -99,6 +213,10 @@ async def patch_user(
             raise DuplicateValueException("Email is already registered")
 
     await crud_users.update(db=db, object=values, username=username)
+    if values.username is not None and values.username != username:
+        await bump_namespaces(f"user:{username}")
+        await _clear_user_not_found_markers(values.username)
+
     return {"message": "User updated"}
 
 
@@ -118,6 +236,7 @@ async def erase_user(
         raise ForbiddenException()
 
     await crud_users.delete(db=db, username=username)
+    await bump_namespaces(f"user:{username}")
     await blacklist_token(token=token, db=db)
     return {"message": "User deleted"}
 
@@ -134,61 +253,49 @@ async def erase_db_user(
         raise NotFoundException("User not found")
 
     await crud_users.db_delete(db=db, username=username)
+    await bump_namespaces(f"user:{username}")
     await blacklist_token(token=token, db=db)
     return {"message": "User deleted from the database"}
 
 
 @router.get("/user/{username}/rate_limits", dependencies=[Depends(get_current_superuser)])
 async def read_user_rate_limits(
-    request: Request, username: str, db: Annotated[AsyncSession, Depends(async_get_db)]
+    request: Request, username: str, db: Annotated[AsyncSession, Depends(async_get_read_db)]
 ) -> dict[str, Any]:
-    db_user = await crud_users.get(db=db, username=username, schema_to_select=UserRead)
+    db_user, db_tier, db_rate_limits = await get_user_rate_limits(db, username)
     if db_user is None:
         raise NotFoundException("User not found")
 
-    db_user = cast(UserRead, db_user)
-    user_dict = db_user.model_dump()
-    if db_user.tier_id is None:
-        user_dict["tier_rate_limits"] = []
-        return user_dict
+    if db_user["tier_id"] is None:
+        db_user["tier_rate_limits"] = []
+        return db_user
 
-    db_tier = await crud_tiers.get(db=db, id=db_user.tier_id, schema_to_select=TierRead)
     if db_tier is None:
         raise NotFoundException("Tier not found")
 
-    db_tier = cast(TierRead, db_tier)
-    db_rate_limits = await crud_rate_limits.get_multi(db=db, tier_id=db_tier.id)
+    db_user["tier_rate_limits"] = db_rate_limits
 
-    user_dict["tier_rate_limits"] = db_rate_limits["data"]
-
-    return user_dict
+    return db_user
 
 
 @router.get("/user/{username}/tier")
 async def read_user_tier(
-    request: Request, username: str, db: Annotated[AsyncSession, Depends(async_get_db)]
+    request: Request, username: str, db: Annotated[AsyncSession, Depends(async_get_read_db)]
 ) -> dict | None:
-    db_user = await crud_users.get(db=db, username=username, schema_to_select=UserRead)
+    db_user, db_tier = await get_user_tier(db, username)
     if db_user is None:
         raise NotFoundException("User not found")
 
-    db_user = cast(UserRead, db_user)
-    if db_user.tier_id is None:
+    if db_user["tier_id"] is None:
         return None
 
-    db_tier = await crud_tiers.get(db=db, id=db_user.tier_id, schema_to_select=TierRead)
     if not db_tier:
         raise NotFoundException("Tier not found")
 
-    db_tier = cast(TierRead, db_tier)
-
-    user_dict = db_user.model_dump()
-    tier_dict = db_tier.model_dump()
-
-    for key, value in tier_dict.items():
-        user_dict[f"tier_{key}"] = value
+    for key, value in db_tier.items():
+        db_user[f"tier_{key}"] = value
 
-    return user_dict
+    return db_user
 
 
 @router.patch("/user/{username}/tier", dependencies=[Depends(get_current_superuser)])
@@ -205,4 +312,5 @@ async def patch_user_tier(
         raise NotFoundException("Tier not found")
 
     await crud_users.update(db=db, object=values.model_dump(), username=username)
+    await bump_namespaces(f"user:{username}")
     return {"message": f"User {db_user.name} Tier updated"}
@@ -59,6 +59,16 @@ class PostgresSettings(DatabaseSettings):
     POSTGRES_ASYNC_PREFIX: str = config("POSTGRES_ASYNC_PREFIX", default="postgresql+asyncpg://")
     POSTGRES_URI: str = f"{POSTGRES_USER}:{POSTGRES_PASSWORD}@{POSTGRES_SERVER}:{POSTGRES_PORT}/{POSTGRES_DB}"
     POSTGRES_URL: str | None = config("POSTGRES_URL", default=None)
+    # comma separated, each in the form of POSTGRES_URI
+    POSTGRES_READ_REPLICA_URIS: str = config("POSTGRES_READ_REPLICA_URIS", default="")
+
+
+class DatabasePoolSettings(BaseSettings):
+    DATABASE_POOL_SIZE: int = config("DATABASE_POOL_SIZE", default=5)
+    DATABASE_MAX_OVERFLOW: int = config("DATABASE_MAX_OVERFLOW", default=10)
+    DATABASE_POOL_TIMEOUT: float = config("DATABASE_POOL_TIMEOUT", default=30.0)
+    DATABASE_POOL_PRE_PING: bool = config("DATABASE_POOL_PRE_PING", default=True)
+    DATABASE_POOL_RECYCLE: int = config("DATABASE_POOL_RECYCLE", default=1800)
 
 
 class FirstUserSettings(BaseSettings):
@@ -77,6 +87,31 @@ class RedisCacheSettings(BaseSettings):
     REDIS_CACHE_URL: str = f"redis://{REDIS_CACHE_HOST}:{REDIS_CACHE_PORT}"
 
 
+class CacheMetricsSettings(BaseSettings):
+    CACHE_HOT_KEY_SAMPLE_RATE: float = config("CACHE_HOT_KEY_SAMPLE_RATE", default=0.01)
+    CACHE_HOT_KEY_CAPACITY: int = config("CACHE_HOT_KEY_CAPACITY", default=128)
+
+
+class CacheNamespaceSettings(BaseSettings):
+    CACHE_KEY_VERSION: int = config("CACHE_KEY_VERSION", default=1)
+
+
+class NegativeCacheSettings(BaseSettings):
+    CACHE_NOT_FOUND_EXPIRATION: int = config("CACHE_NOT_FOUND_EXPIRATION", default=30)
+
+
+class CountCacheSettings(BaseSettings):
+    COUNT_CACHE_EXPIRATION: int = config("COUNT_CACHE_EXPIRATION", default=300)
+
+
+class CacheWarmingSettings(BaseSettings):
+    CACHE_WARMING_ON_STARTUP: bool = config("CACHE_WARMING_ON_STARTUP", default=True)
+    CACHE_WARMING_MAX_USERS: int = config("CACHE_WARMING_MAX_USERS", default=50)
+    CACHE_WARMING_PAGES: int = config("CACHE_WARMING_PAGES", default=1)
+    CACHE_WARMING_ITEMS_PER_PAGE: int = config("CACHE_WARMING_ITEMS_PER_PAGE", default=10)
+    CACHE_WARMING_DELAY_SECONDS: float = config("CACHE_WARMING_DELAY_SECONDS", default=0.05)
+
+
 class ClientSideCacheSettings(BaseSettings):
     CLIENT_CACHE_MAX_AGE: int = config("CLIENT_CACHE_MAX_AGE", default=60)
 
@@ -95,6 +130,65 @@ class RedisRateLimiterSettings(BaseSettings):
 class DefaultRateLimitSettings(BaseSettings):
     DEFAULT_RATE_LIMIT_LIMIT: int = config("DEFAULT_RATE_LIMIT_LIMIT", default=10)
     DEFAULT_RATE_LIMIT_PERIOD: int = config("DEFAULT_RATE_LIMIT_PERIOD", default=3600)
+    DEFAULT_RATE_LIMIT_ALGORITHM: str = config("DEFAULT_RATE_LIMIT_ALGORITHM", default="fixed_window")
+    RATE_LIMIT_MIDDLEWARE_ENABLED: bool = config("RATE_LIMIT_MIDDLEWARE_ENABLED", default=True)
+
+
+class ConcurrencyLimitSettings(BaseSettings):
+    DEFAULT_CONCURRENCY_LIMIT: int = config("DEFAULT_CONCURRENCY_LIMIT", default=4)
+    DEFAULT_CONCURRENCY_QUEUE_TIMEOUT: float = config("DEFAULT_CONCURRENCY_QUEUE_TIMEOUT", default=0.0)
+    CONCURRENCY_LEASE_SECONDS: int = config("CONCURRENCY_LEASE_SECONDS", default=60)
+    CONCURRENCY_POLL_INTERVAL: float = config("CONCURRENCY_POLL_INTERVAL", default=0.05)
+
+
+class RateLimitLeaseSettings(BaseSettings):
+    RATE_LIMIT_LEASE_ENABLED: bool = config("RATE_LIMIT_LEASE_ENABLED", default=False)
+    RATE_LIMIT_LEASE_FRACTION: float = config("RATE_LIMIT_LEASE_FRACTION", default=0.05)
+    RATE_LIMIT_LEASE_SYNC_INTERVAL: float = config("RATE_LIMIT_LEASE_SYNC_INTERVAL", default=0.25)
+    RATE_LIMIT_LEASE_MIN_LIMIT: int = config("RATE_LIMIT_LEASE_MIN_LIMIT", default=100)
+
+
+class PasswordHashingSettings(BaseSettings):
+    PASSWORD_HASH_WORKERS: int = config("PASSWORD_HASH_WORKERS", default=4)
+    PASSWORD_HASH_MAX_QUEUED: int = config("PASSWORD_HASH_MAX_QUEUED", default=64)
+    PASSWORD_HASH_ROUNDS: int = config("PASSWORD_HASH_ROUNDS", default=12)
+
+
+class LoginThrottleSettings(BaseSettings):
+    LOGIN_MAX_FAILURES_PER_USERNAME: int = config("LOGIN_MAX_FAILURES_PER_USERNAME", default=5)
+    LOGIN_MAX_FAILURES_PER_IP: int = config("LOGIN_MAX_FAILURES_PER_IP", default=20)
+    LOGIN_FAILURE_WINDOW_SECONDS: int = config("LOGIN_FAILURE_WINDOW_SECONDS", default=3600)
+    LOGIN_LOCKOUT_SECONDS: float = config("LOGIN_LOCKOUT_SECONDS", default=1.0)
+    LOGIN_MAX_LOCKOUT_SECONDS: float = config("LOGIN_MAX_LOCKOUT_SECONDS", default=900.0)
+    LOGIN_MAX_CONCURRENT_CHECKS: int = config("LOGIN_MAX_CONCURRENT_CHECKS", default=16)
+
+
+class TokenRevocationSettings(BaseSettings):
+    TOKEN_REVOCATION_BLOOM_CAPACITY: int = config("TOKEN_REVOCATION_BLOOM_CAPACITY", default=100000)
+    TOKEN_REVOCATION_BLOOM_ERROR_RATE: float = config("TOKEN_REVOCATION_BLOOM_ERROR_RATE", default=0.001)
+    TOKEN_BLACKLIST_PURGE_BATCH_SIZE: int = config("TOKEN_BLACKLIST_PURGE_BATCH_SIZE", default=1000)
+
+
+class PrincipalCacheSettings(BaseSettings):
+    PRINCIPAL_CACHE_TTL: int = config("PRINCIPAL_CACHE_TTL", default=30)
+    PRINCIPAL_CACHE_MAX_ENTRIES: int = config("PRINCIPAL_CACHE_MAX_ENTRIES", default=10000)
+
+
+class LoadSheddingSettings(BaseSettings):
+    LOAD_SHEDDING_ENABLED: bool = config("LOAD_SHEDDING_ENABLED", default=True)
+    LOAD_SHEDDING_MAX_LOOP_LAG: float = config("LOAD_SHEDDING_MAX_LOOP_LAG", default=0.1)
+    LOAD_SHEDDING_MAX_DB_WAIT: float = config("LOAD_SHEDDING_MAX_DB_WAIT", default=0.2)
+    LOAD_SHEDDING_MAX_IN_FLIGHT: int = config("LOAD_SHEDDING_MAX_IN_FLIGHT", default=500)
+    LOAD_SHEDDING_SEVERE_PRESSURE: float = config("LOAD_SHEDDING_SEVERE_PRESSURE", default=2.0)
+
+
+class BulkSettings(BaseSettings):
+    BULK_MAX_ITEMS: int = config("BULK_MAX_ITEMS", default=500)
+    BULK_MAX_USERS: int = config("BULK_MAX_USERS", default=50)
+
+
+class ContentSettings(BaseSettings):
+    CONTENT_RECHECK_INTERVAL: float = config("CONTENT_RECHECK_INTERVAL", default=2.0)
 
 
 class CRUDAdminSettings(BaseSettings):
@@ -131,14 +225,29 @@ class EnvironmentSettings(BaseSettings):
 class Settings(
     AppSettings,
     PostgresSettings,
+    DatabasePoolSettings,
     CryptSettings,
     FirstUserSettings,
     TestSettings,
     RedisCacheSettings,
+    CacheMetricsSettings,
+    CacheNamespaceSettings,
+    NegativeCacheSettings,
+    CountCacheSettings,
+    CacheWarmingSettings,
     ClientSideCacheSettings,
     RedisQueueSettings,
     RedisRateLimiterSettings,
     DefaultRateLimitSettings,
+    RateLimitLeaseSettings,
+    ConcurrencyLimitSettings,
+    PasswordHashingSettings,
+    LoginThrottleSettings,
+    TokenRevocationSettings,
+    PrincipalCacheSettings,
+    LoadSheddingSettings,
+    BulkSettings,
+    ContentSettings,
     CRUDAdminSettings,
     EnvironmentSettings,
 ):
@@ -1,24 +1,77 @@
+import itertools
+import time
 from collections.abc import AsyncGenerator
+from typing import Any
 
-from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.asyncio.session import AsyncSession
 from sqlalchemy.orm import DeclarativeBase, MappedAsDataclass
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 
 from ..config import settings
+from ..utils.admission import admission_controller
 
 
 class Base(DeclarativeBase, MappedAsDataclass):
     pass
 
 
+class TimedQueuePool(AsyncAdaptedQueuePool):
+    """Queue pool reporting how long every checkout waited for a connection to the admission controller."""
+
+    def _do_get(self) -> Any:
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            admission_controller.record_db_wait(time.perf_counter() - start)
+
+
 DATABASE_URI = settings.POSTGRES_URI
 DATABASE_PREFIX = settings.POSTGRES_ASYNC_PREFIX
 DATABASE_URL = f"{DATABASE_PREFIX}{DATABASE_URI}"
 
-async_engine = create_async_engine(DATABASE_URL, echo=False, future=True)
+
+def create_pooled_engine(url: str) -> AsyncEngine:
+    return create_async_engine(
+        url,
+        echo=False,
+        future=True,
+        poolclass=TimedQueuePool,
+        pool_size=settings.DATABASE_POOL_SIZE,
+        max_overflow=settings.DATABASE_MAX_OVERFLOW,
+        pool_timeout=settings.DATABASE_POOL_TIMEOUT,
+        pool_pre_ping=settings.DATABASE_POOL_PRE_PING,
+        pool_recycle=settings.DATABASE_POOL_RECYCLE,
+    )
+
+
+async_engine = create_pooled_engine(DATABASE_URL)
 
 local_session = async_sessionmaker(bind=async_engine, class_=AsyncSession, expire_on_commit=False)
 
+read_engines = [
+    create_pooled_engine(f"{DATABASE_PREFIX}{uri.strip()}")
+    for uri in settings.POSTGRES_READ_REPLICA_URIS.split(",")
+    if uri.strip()
+]
+# without replicas, reads go to the primary
+read_sessions = [
+    async_sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False) for engine in read_engines
+] or [local_session]
+_reads = itertools.count()
+
+
 async def async_get_db() -> AsyncGenerator[AsyncSession, None]:
     async with local_session() as db:
         yield db
+
+
+async def async_get_read_db() -> AsyncGenerator[AsyncSession, None]:
+    """Session on a read replica, taken in turn, for handlers that only read.
+
+    Replicas lag behind the primary, so a handler that must see its own writes, or that fills a cache which writes
+    invalidate, should use `async_get_db` instead.
+    """
+    async with read_sessions[next(_reads) % len(read_sessions)]() as db:
+        yield db
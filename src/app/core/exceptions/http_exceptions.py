@@ -7,5 +7,17 @@ from fastcrud.exceptions.http_exceptions import (
     UnauthorizedException,
     UnprocessableEntityException,
     DuplicateValueException,
-    RateLimitException,
+    RateLimitException as _RateLimitException,
 )
+
+
+class RateLimitException(_RateLimitException):
+    def __init__(self, detail: str | None = None, headers: dict[str, str] | None = None) -> None:
+        super().__init__(detail=detail)
+        self.headers = headers  # e.g. Retry-After, sent back by FastAPI's HTTPException handler
+
+
+class ServiceUnavailableException(CustomException):
+    def __init__(self, detail: str | None = None, headers: dict[str, str] | None = None) -> None:
+        super().__init__(status_code=503, detail=detail)
+        self.headers = headers
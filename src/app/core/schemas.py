@@ -58,7 +58,7 @@ class TokenData(BaseModel):
 
 
 class TokenBlacklistBase(BaseModel):
-    token: str
+    jti: str
     expires_at: datetime
 
 
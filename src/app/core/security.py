@@ -1,17 +1,24 @@
+import asyncio
+import uuid
 from datetime import UTC, datetime, timedelta
 from enum import Enum
 from typing import Any, Literal, cast
 
-import bcrypt
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
 from pydantic import SecretStr
+from sqlalchemy import update
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from ..crud.crud_users import crud_users
+from ..models.user import User
 from .config import settings
 from .db.crud_token_blacklist import crud_token_blacklist
+from .db.database import local_session
+from .logger import logging
 from .schemas import TokenBlacklistCreate, TokenData
+from .utils.password_hashing import password_hashing_pool
+from .utils.token_revocation import token_id, token_revocations
 
 SECRET_KEY: SecretStr = settings.SECRET_KEY
 ALGORITHM = settings.ALGORITHM
@@ -20,6 +27,11 @@ REFRESH_TOKEN_EXPIRE_DAYS = settings.REFRESH_TOKEN_EXPIRE_DAYS
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/login")
 
+logger = logging.getLogger(__name__)
+
+# rehashes running after their login returned, kept referenced until they finish
+_rehash_tasks: set[asyncio.Task] = set()
+
 
 class TokenType(str, Enum):
     ACCESS = "access"
@@ -27,13 +39,46 @@ class TokenType(str, Enum):
 
 
 async def verify_password(plain_password: str, hashed_password: str) -> bool:
-    correct_password: bool = bcrypt.checkpw(plain_password.encode(), hashed_password.encode())
-    return correct_password
+    return await password_hashing_pool.check(plain_password, hashed_password)
+
+
+async def hash_password(password: str) -> str:
+    return await password_hashing_pool.hash(password)
+
+
+async def hash_passwords(passwords: list[str]) -> list[str]:
+    """Hash `passwords` as many at a time as the pool has threads, leaving its queue to logins."""
+    hashed: list[str] = []
+    for start in range(0, len(passwords), password_hashing_pool.workers):
+        batch = passwords[start : start + password_hashing_pool.workers]
+        hashed += await asyncio.gather(*(password_hashing_pool.hash(password) for password in batch))
+    return hashed
 
 
 def get_password_hash(password: str) -> str:
-    hashed_password: str = bcrypt.hashpw(password.encode(), bcrypt.gensalt()).decode()
-    return hashed_password
+    """Hash `password` on the calling thread, for synchronous callers only: from a coroutine, use `hash_password`."""
+    return password_hashing_pool.hash_sync(password)
+
+
+async def rehash_password(user_id: int, password: str, hashed_password: str) -> None:
+    """Replace a user's `hashed_password` with one at the current cost, unless the password changed meanwhile."""
+    try:
+        new_hashed_password = await hash_password(password)
+        async with local_session() as db:
+            await db.execute(
+                update(User)
+                .where(User.id == user_id, User.hashed_password == hashed_password)
+                .values(hashed_password=new_hashed_password)
+            )
+            await db.commit()
+    except Exception as e:
+        logger.warning(f"Could not rehash the password of user {user_id}: {e}")
+
+
+def rehash_soon(user_id: int, password: str, hashed_password: str) -> None:
+    task = asyncio.get_running_loop().create_task(rehash_password(user_id, password, hashed_password))
+    _rehash_tasks.add(task)
+    task.add_done_callback(_rehash_tasks.discard)
 
 
 async def authenticate_user(username_or_email: str, password: str, db: AsyncSession) -> dict[str, Any] | Literal[False]:
@@ -49,6 +94,10 @@ async def authenticate_user(username_or_email: str, password: str, db: AsyncSess
     if not await verify_password(password, db_user["hashed_password"]):
         return False
 
+    # the login doesn't wait for the new hash, which only upgrades hashes made at an older cost
+    if password_hashing_pool.needs_rehash(db_user["hashed_password"]):
+        rehash_soon(db_user["id"], password, db_user["hashed_password"])
+
     return db_user
 
 
@@ -58,7 +107,7 @@ async def create_access_token(data: dict[str, Any], expires_delta: timedelta | N
         expire = datetime.now(UTC).replace(tzinfo=None) + expires_delta
     else:
         expire = datetime.now(UTC).replace(tzinfo=None) + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
-    to_encode.update({"exp": expire, "token_type": TokenType.ACCESS})
+    to_encode.update({"exp": expire, "token_type": TokenType.ACCESS, "jti": uuid.uuid4().hex})
     encoded_jwt: str = jwt.encode(to_encode, SECRET_KEY.get_secret_value(), algorithm=ALGORITHM)
     return encoded_jwt
 
@@ -69,7 +118,7 @@ async def create_refresh_token(data: dict[str, Any], expires_delta: timedelta |
         expire = datetime.now(UTC).replace(tzinfo=None) + expires_delta
     else:
         expire = datetime.now(UTC).replace(tzinfo=None) + timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS)
-    to_encode.update({"exp": expire, "token_type": TokenType.REFRESH})
+    to_encode.update({"exp": expire, "token_type": TokenType.REFRESH, "jti": uuid.uuid4().hex})
     encoded_jwt: str = jwt.encode(to_encode, SECRET_KEY.get_secret_value(), algorithm=ALGORITHM)
     return encoded_jwt
 
@@ -91,23 +140,39 @@ async def verify_token(token: str, expected_token_type: TokenType, db: AsyncSess
     TokenData | None
         TokenData instance if the token is valid, None otherwise.
     """
-    is_blacklisted = await crud_token_blacklist.exists(db, token=token)
-    if is_blacklisted:
-        return None
-
     try:
         payload = jwt.decode(token, SECRET_KEY.get_secret_value(), algorithms=[ALGORITHM])
-        username_or_email: str | None = payload.get("sub")
-        token_type: str | None = payload.get("token_type")
+    except JWTError:
+        return None
+
+    username_or_email: str | None = payload.get("sub")
+    token_type: str | None = payload.get("token_type")
+
+    if username_or_email is None or token_type != expected_token_type:
+        return None
+
+    if await token_revocations.is_revoked(token_id(token, payload), db):
+        return None
+
+    return TokenData(username_or_email=username_or_email)
 
-        if username_or_email is None or token_type != expected_token_type:
-            return None
 
-        return TokenData(username_or_email=username_or_email)
+def get_token_subject(token: str, expected_token_type: TokenType = TokenType.ACCESS) -> str | None:
+    """Return the `sub` claim of a validly signed, unexpired token, without checking the blacklist.
 
+    Cheap enough to run on every request, but a revoked token still passes: only use it where that is acceptable,
+    such as picking whose rate limit a request counts against.
+    """
+    try:
+        payload = jwt.decode(token, SECRET_KEY.get_secret_value(), algorithms=[ALGORITHM])
     except JWTError:
         return None
 
+    if payload.get("token_type") != expected_token_type:
+        return None
+
+    return cast(str | None, payload.get("sub"))
+
 
 async def blacklist_tokens(access_token: str, refresh_token: str, db: AsyncSession) -> None:
     """Blacklist both access and refresh tokens.
@@ -122,16 +187,14 @@ async def blacklist_tokens(access_token: str, refresh_token: str, db: AsyncSessi
         Database session for performing database operations.
     """
     for token in [access_token, refresh_token]:
-        payload = jwt.decode(token, SECRET_KEY.get_secret_value(), algorithms=[ALGORITHM])
-        exp_timestamp = payload.get("exp")
-        if exp_timestamp is not None:
-            expires_at = datetime.fromtimestamp(exp_timestamp)
-            await crud_token_blacklist.create(db, object=TokenBlacklistCreate(token=token, expires_at=expires_at))
+        await blacklist_token(token, db)
 
 
 async def blacklist_token(token: str, db: AsyncSession) -> None:
     payload = jwt.decode(token, SECRET_KEY.get_secret_value(), algorithms=[ALGORITHM])
     exp_timestamp = payload.get("exp")
     if exp_timestamp is not None:
+        jti = token_id(token, payload)
         expires_at = datetime.fromtimestamp(exp_timestamp)
-        await crud_token_blacklist.create(db, object=TokenBlacklistCreate(token=token, expires_at=expires_at))
+        await crud_token_blacklist.create(db, object=TokenBlacklistCreate(jti=jti, expires_at=expires_at))
+        await token_revocations.revoke(jti, exp_timestamp)
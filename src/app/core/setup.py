@@ -1,3 +1,4 @@
+import time
 from collections.abc import AsyncGenerator, Callable
 from contextlib import _AsyncGeneratorContextManager, asynccontextmanager
 from typing import Any
@@ -14,23 +15,37 @@ from fastapi.staticfiles import StaticFiles
 from fastapi_tailwind import tailwind
 
 from ..api.dependencies import get_current_superuser
+from ..core.utils.concurrency_limit import concurrency_limiter
+from ..core.utils.login_throttle import login_throttle
+from ..core.utils.password_hashing import password_hashing_pool
 from ..core.utils.rate_limit import rate_limiter
+from ..core.utils.rate_limit_policies import policy_table
+from ..core.utils.token_revocation import token_revocations
+from ..front.content import CONTENT_PATH, RESOURCES_PATH, page_cache
 from ..middleware.client_cache_middleware import ClientCacheMiddleware
+from ..middleware.load_shedding_middleware import LoadSheddingMiddleware
+from ..middleware.rate_limit_middleware import RateLimitMiddleware, compile_rate_limited_routes
 from ..models import *  # noqa: F403
 from .config import (
     AppSettings,
+    CacheWarmingSettings,
     ClientSideCacheSettings,
     DatabaseSettings,
+    DefaultRateLimitSettings,
     EnvironmentOption,
     EnvironmentSettings,
+    LoadSheddingSettings,
+    RateLimitLeaseSettings,
     RedisCacheSettings,
     RedisQueueSettings,
     RedisRateLimiterSettings,
+    TokenRevocationSettings,
     settings,
 )
-from .db.database import Base
+from .db.database import Base, local_session
 from .db.database import async_engine as engine
-from .utils import cache, queue
+from .utils import cache, pubsub, queue
+from .utils.admission import admission_controller
 
 
 # -------------- database --------------
@@ -55,6 +70,14 @@ async def create_redis_queue_pool() -> None:
     queue.pool = await create_pool(RedisSettings(host=settings.REDIS_QUEUE_HOST, port=settings.REDIS_QUEUE_PORT))
 
 
+async def enqueue_cache_warming() -> None:
+    if queue.pool is None:
+        return
+
+    # every process of a deploy enqueues the same per-minute job id, so arq runs the warming only once
+    await queue.pool.enqueue_job("warm_cache", _job_id=f"warm_cache:startup:{int(time.time() // 60)}")
+
+
 async def close_redis_queue_pool() -> None:
     if queue.pool is not None:
         await queue.pool.aclose()  # type: ignore
@@ -63,13 +86,43 @@ async def close_redis_queue_pool() -> None:
 # -------------- rate limit --------------
 async def create_redis_rate_limit_pool() -> None:
     rate_limiter.initialize(settings.REDIS_RATE_LIMIT_URL)  # type: ignore
+    concurrency_limiter.initialize(rate_limiter.get_client())
+    login_throttle.initialize(rate_limiter.get_client())
+    token_revocations.initialize(rate_limiter.get_client())
+    if isinstance(settings, RateLimitLeaseSettings) and settings.RATE_LIMIT_LEASE_ENABLED:
+        rate_limiter.start_leasing(
+            fraction=settings.RATE_LIMIT_LEASE_FRACTION,
+            sync_interval=settings.RATE_LIMIT_LEASE_SYNC_INTERVAL,
+            min_limit=settings.RATE_LIMIT_LEASE_MIN_LIMIT,
+        )
 
 
 async def close_redis_rate_limit_pool() -> None:
+    await rate_limiter.stop_leasing()
     if rate_limiter.client is not None:
         await rate_limiter.client.aclose()  # type: ignore
 
 
+async def load_rate_limit_policies() -> None:
+    async with local_session() as db:
+        await policy_table.load(db)
+
+
+# -------------- token revocation --------------
+async def load_token_revocations() -> None:
+    async with local_session() as db:
+        await token_revocations.load(db)
+
+
+# -------------- pub/sub --------------
+async def start_pubsub_listener() -> None:
+    await pubsub.start_listener(settings.REDIS_CACHE_URL)
+
+
+async def stop_pubsub_listener() -> None:
+    await pubsub.stop_listener()
+
+
 # -------------- application --------------
 async def set_threadpool_tokens(number_of_tokens: int = 100) -> None:
     limiter = anyio.to_thread.current_default_thread_limiter()
@@ -113,6 +166,24 @@ def lifespan_factory(
             if create_tables_on_start:
                 await create_tables()
 
+            if isinstance(settings, RedisRateLimiterSettings):
+                await load_rate_limit_policies()
+                app.state.rate_limited_routes = compile_rate_limited_routes(app.routes)
+
+            if isinstance(settings, TokenRevocationSettings):
+                await load_token_revocations()
+
+            if isinstance(settings, RedisCacheSettings):
+                await start_pubsub_listener()
+
+            if isinstance(settings, CacheWarmingSettings) and settings.CACHE_WARMING_ON_STARTUP:
+                await enqueue_cache_warming()
+
+            await page_cache.prerender(RESOURCES_PATH, CONTENT_PATH)
+
+            if isinstance(settings, LoadSheddingSettings) and settings.LOAD_SHEDDING_ENABLED:
+                admission_controller.start()
+
             process = tailwind.compile(
                 static_files.directory + "/output.css",
                 tailwind_stylesheet_path = "./src/app/resources/input.css"
@@ -123,7 +194,11 @@ def lifespan_factory(
             yield
 
         finally:
+            await admission_controller.stop()
+            password_hashing_pool.shutdown()
+
             if isinstance(settings, RedisCacheSettings):
+                await stop_pubsub_listener()
                 await close_redis_cache_pool()
 
             if isinstance(settings, RedisQueueSettings):
@@ -177,6 +252,8 @@ def create_application(
         - DatabaseSettings: Adds event handlers for initializing database tables during startup.
         - RedisCacheSettings: Sets up event handlers for creating and closing a Redis cache pool.
         - ClientSideCacheSettings: Integrates middleware for client-side caching.
+        - DefaultRateLimitSettings: Integrates middleware rejecting over-limit requests before routing.
+        - LoadSheddingSettings: Integrates middleware shedding anonymous, then bulk, traffic under pressure.
         - RedisQueueSettings: Sets up event handlers for creating and closing a Redis queue pool.
         - RedisRateLimiterSettings: Sets up event handlers for creating and closing a Redis rate limiter pool.
         - EnvironmentSettings: Conditionally sets documentation URLs and integrates custom routes for API documentation
@@ -225,6 +302,13 @@ def create_application(
     if isinstance(settings, ClientSideCacheSettings):
         application.add_middleware(ClientCacheMiddleware, max_age=settings.CLIENT_CACHE_MAX_AGE)
 
+    if isinstance(settings, DefaultRateLimitSettings) and settings.RATE_LIMIT_MIDDLEWARE_ENABLED:
+        application.add_middleware(RateLimitMiddleware)
+
+    # added last so it runs first, in front of every other middleware
+    if isinstance(settings, LoadSheddingSettings) and settings.LOAD_SHEDDING_ENABLED:
+        application.add_middleware(LoadSheddingMiddleware)
+
     if isinstance(settings, EnvironmentSettings):
         if settings.ENVIRONMENT != EnvironmentOption.PRODUCTION:
             docs_router = APIRouter()
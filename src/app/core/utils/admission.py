@@ -0,0 +1,120 @@
+import asyncio
+import math
+
+from ..config import settings
+from .metrics import registry
+
+shed_requests = registry.counter(
+    "load_shed_requests_total", "Requests rejected by the admission controller, by traffic class.", ("traffic",)
+)
+
+
+class AdmissionController:
+    """Decides whether to admit a request from the current event-loop lag, DB pool wait and in-flight requests.
+
+    Each signal is divided by its threshold and the largest ratio is the pressure. Under a pressure of 1 every
+    request is admitted. From 1, anonymous requests are shed; from `severe_pressure`, bulk requests are shed too.
+    Authenticated interactive requests are always admitted, so they keep a bounded tail latency while the rest of
+    the traffic backs off.
+
+    Loop lag and DB wait are exponentially weighted moving averages. Loop lag is probed every `probe_interval`
+    seconds by a background task, which also decays the DB wait when no connection was checked out since the
+    previous probe.
+
+    Parameters
+    ----------
+    max_loop_lag: float
+        Event-loop lag, in seconds, at which the server is considered overloaded.
+    max_db_wait: float
+        Seconds waited for a DB connection at which the server is considered overloaded.
+    max_in_flight: int
+        Concurrent requests at which the server is considered overloaded.
+    severe_pressure: float
+        Pressure from which bulk requests are shed as well.
+    smoothing: float
+        Weight of the newest sample in the moving averages.
+    probe_interval: float
+        Seconds between event-loop lag probes.
+    """
+
+    def __init__(
+        self,
+        max_loop_lag: float = 0.1,
+        max_db_wait: float = 0.2,
+        max_in_flight: int = 500,
+        severe_pressure: float = 2.0,
+        smoothing: float = 0.3,
+        probe_interval: float = 0.1,
+    ) -> None:
+        self.max_loop_lag = max_loop_lag
+        self.max_db_wait = max_db_wait
+        self.max_in_flight = max_in_flight
+        self.severe_pressure = severe_pressure
+        self.smoothing = smoothing
+        self.probe_interval = probe_interval
+        self.loop_lag = 0.0
+        self.db_wait = 0.0
+        self.in_flight = 0
+        self._db_sampled = False
+        self._task: asyncio.Task | None = None
+
+    def _average(self, current: float, sample: float) -> float:
+        return current + self.smoothing * (sample - current)
+
+    def record_loop_lag(self, seconds: float) -> None:
+        self.loop_lag = self._average(self.loop_lag, seconds)
+
+    def record_db_wait(self, seconds: float) -> None:
+        self.db_wait = self._average(self.db_wait, seconds)
+        self._db_sampled = True
+
+    def pressure(self) -> float:
+        return max(
+            self.loop_lag / self.max_loop_lag,
+            self.db_wait / self.max_db_wait,
+            self.in_flight / self.max_in_flight,
+        )
+
+    def admits(self, anonymous: bool, bulk: bool) -> bool:
+        pressure = self.pressure()
+        if pressure < 1:
+            return True
+        if anonymous:
+            return False
+        return not bulk or pressure < self.severe_pressure
+
+    def retry_after(self) -> int:
+        """Seconds a shed client should wait, growing with the pressure."""
+        return max(1, min(30, math.ceil(self.pressure())))
+
+    async def _probe_forever(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            start = loop.time()
+            await asyncio.sleep(self.probe_interval)
+            self.record_loop_lag(max(0.0, loop.time() - start - self.probe_interval))
+
+            if not self._db_sampled:
+                self.db_wait = self._average(self.db_wait, 0.0)
+            self._db_sampled = False
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._probe_forever())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+admission_controller = AdmissionController(
+    max_loop_lag=settings.LOAD_SHEDDING_MAX_LOOP_LAG,
+    max_db_wait=settings.LOAD_SHEDDING_MAX_DB_WAIT,
+    max_in_flight=settings.LOAD_SHEDDING_MAX_IN_FLIGHT,
+    severe_pressure=settings.LOAD_SHEDDING_SEVERE_PRESSURE,
+)
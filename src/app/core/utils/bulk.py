@@ -0,0 +1,112 @@
+import dataclasses
+from typing import Any, Generic, TypeVar
+
+from fastcrud import FastCRUD
+from pydantic import BaseModel, ValidationError
+from sqlalchemy import Integer, any_, insert, literal
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.ext.asyncio import AsyncSession
+
+SchemaType = TypeVar("SchemaType", bound=BaseModel)
+
+
+class BulkItemError(BaseModel):
+    index: int
+    errors: list[dict[str, Any]]
+
+
+class BulkCreateResponse(BaseModel, Generic[SchemaType]):
+    data: list[SchemaType]
+    errors: list[BulkItemError]
+
+
+class BulkReadResponse(BaseModel, Generic[SchemaType]):
+    data: list[SchemaType]
+    missing: list[int]
+
+
+def item_error(index: int, field: str, msg: str, type: str = "value_error") -> dict[str, Any]:
+    """The error of item `index` of a bulk request, shaped like a validation error."""
+    return {"index": index, "errors": [{"loc": [field], "msg": msg, "type": type}]}
+
+
+def validate_items(
+    schema: type[SchemaType], items: list[dict[str, Any]]
+) -> tuple[list[tuple[int, SchemaType]], list[dict[str, Any]]]:
+    """Validate every item of a bulk request against `schema`, collecting the errors instead of stopping at one.
+
+    Returns
+    -------
+    tuple[list[tuple[int, SchemaType]], list[dict[str, Any]]]
+        The valid items with their index, and a `BulkItemError` for each invalid one.
+    """
+    valid, errors = [], []
+    for index, item in enumerate(items):
+        try:
+            valid.append((index, schema.model_validate(item)))
+        except ValidationError as e:
+            details = [{"loc": list(error["loc"]), "msg": error["msg"], "type": error["type"]} for error in e.errors()]
+            errors.append({"index": index, "errors": details})
+    return valid, errors
+
+
+async def insert_many(
+    crud: FastCRUD, db: AsyncSession, rows: list[dict[str, Any]], schema_to_select: type[BaseModel], commit: bool = True
+) -> list[dict[str, Any]]:
+    """Insert `rows` with multi-row `INSERT ... RETURNING` statements, and return them as `schema_to_select`.
+
+    SQLAlchemy batches the rows into as few statements as the database's parameter limit allows. The model needs a
+    `uuid` column, by which the returned rows are put back in the order of `rows`. Model defaults that are only
+    dataclass factories, such as `uuid` and `created_at`, are filled in here, since an `INSERT` doesn't run them.
+
+    Parameters
+    ----------
+    crud: FastCRUD
+        CRUD of the model to insert into.
+    db: AsyncSession
+        The database session.
+    rows: list[dict[str, Any]]
+        Column values of each row.
+    schema_to_select: type[BaseModel]
+        Schema of the returned rows.
+    commit: bool
+        Whether to commit once the rows are inserted.
+    """
+    model = crud.model
+    factories = {
+        field.name: field.default_factory
+        for field in dataclasses.fields(model)
+        if field.default_factory is not dataclasses.MISSING
+    }
+    rows = [{**{name: factory() for name, factory in factories.items() if name not in row}, **row} for row in rows]
+
+    # rows come back in any order, and are put back in the order of `rows` by the uuid generated for each
+    stmt = insert(model).returning(
+        model.uuid.label("_uuid"), *[getattr(model, field) for field in schema_to_select.model_fields]
+    )
+    returned = {row["_uuid"]: dict(row) for row in (await db.execute(stmt, rows)).mappings()}
+    if commit:
+        await db.commit()
+
+    created = [returned[row["uuid"]] for row in rows]
+    for row in created:
+        del row["_uuid"]
+    return created
+
+
+async def get_many(
+    crud: FastCRUD, db: AsyncSession, ids: list[int], schema_to_select: type[BaseModel], **kwargs: Any
+) -> list[dict[str, Any]]:
+    """The rows with `ids` that match `kwargs`, in the order of `ids`, in one query.
+
+    On PostgreSQL the ids are sent as a single array for `id = ANY(...)`, so every batch size shares one statement.
+    """
+    model = crud.model
+    stmt = await crud.select(schema_to_select=schema_to_select, **kwargs)
+    if db.get_bind().dialect.name == "postgresql":
+        stmt = stmt.where(model.id == any_(literal(ids, ARRAY(Integer))))
+    else:
+        stmt = stmt.where(model.id.in_(ids))
+
+    rows = {row["id"]: dict(row) for row in (await db.execute(stmt)).mappings()}
+    return [rows[id] for id in dict.fromkeys(ids) if id in rows]
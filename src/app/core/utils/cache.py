@@ -2,17 +2,62 @@ import functools
 import json
 import re
 from collections.abc import Callable
+from time import perf_counter
 from typing import Any
 
 from fastapi import Request
 from fastapi.encoders import jsonable_encoder
 from redis.asyncio import ConnectionPool, Redis
 
+from ..config import settings
 from ..exceptions.cache_exceptions import CacheIdentificationInferenceError, InvalidRequestError, MissingClientError
+from ..exceptions.http_exceptions import NotFoundException
+from .metrics import BYTES_BUCKETS, HotKeyTracker, registry
 
 pool: ConnectionPool | None = None
 client: Redis | None = None
 
+# stored in place of a payload to remember that a lookup raised NotFoundException; the leading NUL byte can never
+# start a JSON document, so markers cannot be confused with cached data.
+NOT_FOUND_MARKER = b"\x00not_found:"
+
+GENERATION_KEY_PREFIX = "cache:generation"
+
+# Reads the generation of every namespace in KEYS, appends them to the base key in ARGV[1] and fetches the
+# resulting key, so a namespaced lookup costs a single round trip. The data key is built inside the script,
+# which is fine on a single Redis instance but not on Redis Cluster.
+NAMESPACED_GET_SCRIPT = """
+local generations = {}
+for i, key in ipairs(KEYS) do
+    generations[i] = redis.call('GET', key) or '0'
+end
+local cache_key = ARGV[1] .. ':g' .. ARGV[2] .. '.' .. table.concat(generations, '.')
+return {cache_key, redis.call('GET', cache_key)}
+"""
+_namespaced_get_script: Any = None
+
+# metrics are labelled by the key prefix template (e.g. "{username}_post_cache"), never by the concrete key,
+# so their cardinality is bounded by the number of decorated endpoints.
+cache_lookups = registry.counter(
+    "cache_lookups_total", "Cache lookups by key prefix template and result.", ("key_prefix", "result")
+)
+cache_value_bytes = registry.histogram(
+    "cache_value_bytes",
+    "Size of cached payloads read or written.",
+    ("key_prefix", "operation"),
+    buckets=BYTES_BUCKETS,
+)
+cache_redis_seconds = registry.histogram(
+    "cache_redis_seconds", "Redis round-trip latency of cache operations.", ("key_prefix", "operation")
+)
+cache_invalidated_keys = registry.histogram(
+    "cache_invalidated_keys",
+    "Number of keys removed by a single invalidation.",
+    ("key_prefix",),
+    buckets=(0, 1, 2, 5, 10, 50, 100, 500, 1000),
+)
+hot_keys = HotKeyTracker(capacity=settings.CACHE_HOT_KEY_CAPACITY, sample_rate=settings.CACHE_HOT_KEY_SAMPLE_RATE)
+
 
 def _infer_resource_id(kwargs: dict[str, Any], resource_id_type: type | tuple[type, ...]) -> int | str:
     """Infer the resource ID from a dictionary of keyword arguments.
@@ -142,7 +187,207 @@ def _format_extra_data(to_invalidate_extra: dict[str, str], kwargs: dict[str, An
     return formatted_extra
 
 
-async def _delete_keys_by_pattern(pattern: str) -> None:
+def build_cache_key(key_prefix: str, resource_id: int | str, kwargs: dict[str, Any]) -> str:
+    """Build the cache key the `cache` decorator uses for a given prefix template and resource.
+
+    Parameters
+    ----------
+    key_prefix: str
+        The key prefix template, as passed to the `cache` decorator.
+    resource_id: Union[int, str]
+        The resource ID the entry is cached under.
+    kwargs: Dict[str, Any]
+        The endpoint keyword arguments used to format the prefix template.
+
+    Returns
+    -------
+    str
+        The formatted cache key.
+
+    Example
+    -------
+    >>> build_cache_key("{username}_post_cache", 3, {"username": "alice"})
+    'alice_post_cache:3'
+    """
+    return f"{_format_prefix(key_prefix, kwargs)}:{resource_id}"
+
+
+def _generation_keys(namespaces: list[str], kwargs: dict[str, Any]) -> list[str]:
+    return [f"{GENERATION_KEY_PREFIX}:{_format_prefix(namespace, kwargs)}" for namespace in namespaces]
+
+
+def _namespaced_key(cache_key: str, generations: list[bytes | str | None]) -> str:
+    parts = [str(settings.CACHE_KEY_VERSION)]
+    for generation in generations:
+        parts.append(generation.decode() if isinstance(generation, bytes) else generation or "0")
+    return f"{cache_key}:g{'.'.join(parts)}"
+
+
+async def resolve_cache_key(
+    key_prefix: str, resource_id: int | str, kwargs: dict[str, Any], namespaces: list[str] | None = None
+) -> str:
+    """Build the cache key of an entry, including the current generation of its namespaces.
+
+    Parameters
+    ----------
+    key_prefix: str
+        The key prefix template, as passed to the `cache` decorator.
+    resource_id: Union[int, str]
+        The resource ID the entry is cached under.
+    kwargs: Dict[str, Any]
+        The endpoint keyword arguments used to format the prefix and namespace templates.
+    namespaces: List[str] | None, optional
+        The namespace templates the entry belongs to, as passed to the `cache` decorator.
+
+    Returns
+    -------
+    str
+        The concrete cache key. Without namespaces this is the same as `build_cache_key`.
+    """
+    return (await resolve_cache_keys(key_prefix, [resource_id], kwargs, namespaces))[0]
+
+
+async def resolve_cache_keys(
+    key_prefix: str, resource_ids: list[int | str], kwargs: dict[str, Any], namespaces: list[str] | None = None
+) -> list[str]:
+    """Build the cache keys of several entries sharing a prefix and namespaces, reading the generations once.
+
+    Parameters
+    ----------
+    key_prefix: str
+        The key prefix template, as passed to the `cache` decorator.
+    resource_ids: List[Union[int, str]]
+        The resource IDs the entries are cached under.
+    kwargs: Dict[str, Any]
+        The endpoint keyword arguments used to format the prefix and namespace templates.
+    namespaces: List[str] | None, optional
+        The namespace templates the entries belong to, as passed to the `cache` decorator.
+
+    Returns
+    -------
+    List[str]
+        The concrete cache keys, in the order of `resource_ids`.
+    """
+    cache_keys = [build_cache_key(key_prefix, resource_id, kwargs) for resource_id in resource_ids]
+    if not namespaces:
+        return cache_keys
+
+    if client is None:
+        raise MissingClientError
+
+    generations = await client.mget(_generation_keys(namespaces, kwargs))
+    return [_namespaced_key(cache_key, generations) for cache_key in cache_keys]
+
+
+async def _get_namespaced(cache_key: str, generation_keys: list[str]) -> tuple[str, bytes | None]:
+    global _namespaced_get_script
+
+    if client is None:
+        raise MissingClientError
+
+    if _namespaced_get_script is None or _namespaced_get_script.registered_client is not client:
+        _namespaced_get_script = client.register_script(NAMESPACED_GET_SCRIPT)
+
+    namespaced_key, cached_data = await _namespaced_get_script(
+        keys=generation_keys, args=[cache_key, settings.CACHE_KEY_VERSION]
+    )
+    return namespaced_key.decode(), cached_data
+
+
+async def bump_namespaces(*namespaces: str) -> None:
+    """Invalidate every entry of the given, already formatted, namespaces with one `INCR` each.
+
+    Entries cached under the previous generation are no longer read and simply expire with their TTL.
+
+    Parameters
+    ----------
+    *namespaces: str
+        Namespaces such as "post_schema" or "user:alice".
+
+    Note
+    ----
+        Without a configured Redis client nothing can be cached, so this is a no-op.
+    """
+    if client is None or not namespaces:
+        return
+
+    async with client.pipeline(transaction=False) as pipe:
+        for generation_key in _generation_keys(list(namespaces), {}):
+            pipe.incr(generation_key)
+        await pipe.execute()
+
+
+async def set_cache_entry(key_prefix: str, cache_key: str, value: Any, expiration: int) -> None:
+    """Store a value exactly as the `cache` decorator would after a miss.
+
+    This lets background jobs populate entries that decorated endpoints will then read.
+
+    Parameters
+    ----------
+    key_prefix: str
+        The key prefix template the entry belongs to, used to label metrics.
+    cache_key: str
+        The concrete key, usually obtained from `build_cache_key`.
+    value: Any
+        The endpoint result to cache. It is serialized with `jsonable_encoder`.
+    expiration: int
+        The expiration time for the cached data in seconds.
+    """
+    if client is None:
+        raise MissingClientError
+
+    serialized_data = json.dumps(jsonable_encoder(value))
+
+    start = perf_counter()
+    await client.set(cache_key, serialized_data, ex=expiration)
+    cache_redis_seconds.observe(perf_counter() - start, key_prefix, "set")
+    cache_value_bytes.observe(len(serialized_data), key_prefix, "write")
+
+
+async def get_not_found_marker(cache_key: str) -> str | None:
+    """Return the detail of a "not found" marker stored under `cache_key`, if any.
+
+    Negative caching is optional, so this is a no-op returning None when no Redis client is configured.
+    """
+    if client is None:
+        return None
+
+    cached_data: bytes | None = await client.get(cache_key)
+    if cached_data and cached_data.startswith(NOT_FOUND_MARKER):
+        return cached_data[len(NOT_FOUND_MARKER) :].decode()
+
+    return None
+
+
+async def set_not_found_marker(cache_key: str, detail: str, expiration: int) -> None:
+    """Remember for `expiration` seconds that the resource behind `cache_key` does not exist."""
+    if client is None:
+        return
+
+    await client.set(cache_key, NOT_FOUND_MARKER + detail.encode(), ex=expiration)
+
+
+async def clear_not_found_markers(*cache_keys: str, patterns: list[str] | None = None) -> None:
+    """Remove "not found" markers once the matching resource has been created.
+
+    Parameters
+    ----------
+    *cache_keys: str
+        Concrete keys to delete.
+    patterns: List[str] | None, optional
+        Key patterns to delete with SCAN. Only use them for rare writes, such as creating a user.
+    """
+    if client is None:
+        return
+
+    if cache_keys:
+        await client.delete(*cache_keys)
+
+    for pattern in patterns or []:
+        await _delete_keys_by_pattern(pattern)
+
+
+async def _delete_keys_by_pattern(pattern: str) -> int:
     """Delete keys from Redis that match a given pattern using the SCAN command.
 
     This function iteratively scans the Redis key space for keys that match a specific pattern
@@ -170,15 +415,23 @@ async def _delete_keys_by_pattern(pattern: str) -> None:
 
     - Be cautious with patterns that could match a large number of keys, as deleting
       many keys simultaneously may impact the performance of the Redis server.
+
+    Returns
+    -------
+    int
+        The number of keys deleted.
     """
     if client is None:
         raise MissingClientError
 
+    deleted = 0
     cursor = -1
     while cursor != 0:
         cursor, keys = await client.scan(cursor, match=pattern, count=100)
         if keys:
-            await client.delete(*keys)
+            deleted += await client.delete(*keys)
+
+    return deleted
 
 
 def cache(
@@ -188,6 +441,9 @@ def cache(
     resource_id_type: type | tuple[type, ...] = int,
     to_invalidate_extra: dict[str, Any] | None = None,
     pattern_to_invalidate_extra: list[str] | None = None,
+    not_found_expiration: int | None = None,
+    namespaces: list[str] | None = None,
+    namespaces_to_bump: list[str] | None = None,
 ) -> Callable:
     """Cache decorator for FastAPI endpoints.
 
@@ -213,6 +469,18 @@ def cache(
     pattern_to_invalidate_extra: List[str] | None, optional
         A list of string patterns for cache keys that should be invalidated when the decorated function is called.
         This allows for bulk invalidation of cache keys based on a matching pattern.
+    not_found_expiration: int | None, optional
+        If set, a GET that raises `NotFoundException` stores a "not found" marker under the cache key for this many
+        seconds, and later requests re-raise the exception from the marker without calling the endpoint.
+        Endpoints that create the resource should delete the marker with `clear_not_found_markers`.
+    namespaces: List[str] | None, optional
+        Namespace templates (e.g. "post_schema", "user:{username}") whose current generation is embedded in the
+        cache key. Bumping a namespace makes every key of the previous generation unreachable at once. On GET the
+        generations and the cached data are fetched in a single round trip. Decorators that invalidate a namespaced
+        entry must pass the same namespaces so they delete the current key.
+    namespaces_to_bump: List[str] | None, optional
+        Namespace templates whose generation is incremented when the decorated function is called with a method
+        other than GET.
 
     Returns
     -------
@@ -281,6 +549,8 @@ def cache(
     - `to_invalidate_extra` and `pattern_to_invalidate_extra` are used for cache invalidation on methods other than GET.
     - Using `pattern_to_invalidate_extra` can be resource-intensive on large datasets. Use it judiciously and
       consider the potential impact on Redis performance.
+    - Keep `not_found_expiration` short: a marker hides a resource created by a path that does not clear it.
+    - Keys in `to_invalidate_extra` are deleted as given, without namespace generations.
     """
 
     def wrapper(func: Callable) -> Callable:
@@ -294,39 +564,77 @@ def cache(
             else:
                 resource_id = _infer_resource_id(kwargs=kwargs, resource_id_type=resource_id_type)
 
-            formatted_key_prefix = _format_prefix(key_prefix, kwargs)
-            cache_key = f"{formatted_key_prefix}:{resource_id}"
+            cache_key = build_cache_key(key_prefix, resource_id, kwargs)
             if request.method == "GET":
-                if to_invalidate_extra is not None or pattern_to_invalidate_extra is not None:
+                if (
+                    to_invalidate_extra is not None
+                    or pattern_to_invalidate_extra is not None
+                    or namespaces_to_bump is not None
+                ):
                     raise InvalidRequestError
 
-                cached_data = await client.get(cache_key)
+                start = perf_counter()
+                if namespaces:
+                    cache_key, cached_data = await _get_namespaced(cache_key, _generation_keys(namespaces, kwargs))
+                else:
+                    cached_data = await client.get(cache_key)
+                cache_redis_seconds.observe(perf_counter() - start, key_prefix, "get")
+                hot_keys.record(key_prefix, cache_key, hit=cached_data is not None)
                 if cached_data:
+                    if cached_data.startswith(NOT_FOUND_MARKER):
+                        cache_lookups.inc(key_prefix, "not_found")
+                        raise NotFoundException(cached_data[len(NOT_FOUND_MARKER) :].decode())
+
+                    cache_lookups.inc(key_prefix, "hit")
+                    cache_value_bytes.observe(len(cached_data), key_prefix, "read")
                     return json.loads(cached_data.decode())
 
-            result = await func(request, *args, **kwargs)
+                cache_lookups.inc(key_prefix, "miss")
+
+                try:
+                    result = await func(request, *args, **kwargs)
+                except NotFoundException as not_found:
+                    if not_found_expiration is not None:
+                        await set_not_found_marker(cache_key, str(not_found.detail), not_found_expiration)
+                    raise
+
+            else:
+                result = await func(request, *args, **kwargs)
 
             if request.method == "GET":
                 serializable_data = jsonable_encoder(result)
                 serialized_data = json.dumps(serializable_data)
 
-                await client.set(cache_key, serialized_data)
-                await client.expire(cache_key, expiration)
+                start = perf_counter()
+                await client.set(cache_key, serialized_data, ex=expiration)
+                cache_redis_seconds.observe(perf_counter() - start, key_prefix, "set")
+                cache_value_bytes.observe(len(serialized_data), key_prefix, "write")
 
                 return json.loads(serialized_data)
 
             else:
-                await client.delete(cache_key)
+                start = perf_counter()
+                if namespaces:
+                    generations = await client.mget(_generation_keys(namespaces, kwargs))
+                    cache_key = _namespaced_key(cache_key, generations)
+
+                invalidated = await client.delete(cache_key)
                 if to_invalidate_extra is not None:
                     formatted_extra = _format_extra_data(to_invalidate_extra, kwargs)
                     for prefix, id in formatted_extra.items():
                         extra_cache_key = f"{prefix}:{id}"
-                        await client.delete(extra_cache_key)
+                        invalidated += await client.delete(extra_cache_key)
 
                 if pattern_to_invalidate_extra is not None:
                     for pattern in pattern_to_invalidate_extra:
                         formatted_pattern = _format_prefix(pattern, kwargs)
-                        await _delete_keys_by_pattern(formatted_pattern + "*")
+                        invalidated += await _delete_keys_by_pattern(formatted_pattern + "*")
+
+                if namespaces_to_bump is not None:
+                    await bump_namespaces(*(_format_prefix(namespace, kwargs) for namespace in namespaces_to_bump))
+
+                cache_redis_seconds.observe(perf_counter() - start, key_prefix, "invalidate")
+                cache_invalidated_keys.observe(invalidated, key_prefix)
 
             return result
 
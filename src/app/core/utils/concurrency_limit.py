@@ -0,0 +1,123 @@
+import asyncio
+import time
+import uuid
+
+from redis.asyncio import Redis
+from redis.commands.core import AsyncScript
+
+from ...core.config import settings
+from ...core.logger import logging
+from .rate_limit_policies import ConcurrencyPolicy
+
+logger = logging.getLogger(__name__)
+
+# KEYS[1] is a sorted set of the slots held for a user and route, scored by when they expire. Expired slots (from a
+# worker that died mid-request) are dropped before counting, so a slot can never leak for longer than its lease.
+ACQUIRE_SCRIPT = """
+local now = tonumber(ARGV[1])
+local max_concurrent = tonumber(ARGV[2])
+local lease = tonumber(ARGV[3])
+redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', now)
+if redis.call('ZCARD', KEYS[1]) >= max_concurrent then
+    return 0
+end
+redis.call('ZADD', KEYS[1], now + lease, ARGV[4])
+redis.call('PEXPIRE', KEYS[1], lease)
+return 1
+"""
+
+
+class ConcurrencyLimiter:
+    """Distributed semaphore bounding the in-flight requests of a user on a route.
+
+    Slots are held in Redis with a lease of `lease_seconds`, after which they expire on their own. The number of
+    slots held by this process is also counted locally: once it reaches the limit, requests are turned away or
+    queued without asking Redis, and queued requests are woken up as soon as a local slot is released. Slots held
+    by other processes are polled every `poll_interval` seconds until the request's deadline.
+
+    Parameters
+    ----------
+    lease_seconds: int
+        How long a slot is held at most, which should exceed the slowest request it protects.
+    poll_interval: float
+        Seconds between attempts while waiting for a slot held elsewhere.
+    """
+
+    def __init__(self, lease_seconds: int = 60, poll_interval: float = 0.05) -> None:
+        self.lease_seconds = lease_seconds
+        self.poll_interval = poll_interval
+        self.client: Redis | None = None
+        self.script: AsyncScript | None = None
+        self.in_flight: dict[str, int] = {}
+        self.released: dict[str, asyncio.Event] = {}
+
+    def initialize(self, client: Redis) -> None:
+        self.client = client
+        self.script = client.register_script(ACQUIRE_SCRIPT)
+
+    @staticmethod
+    def key(user_id: int | str, path: str) -> str:
+        return f"concurrency:{user_id}:{path}"
+
+    async def _try_acquire(self, key: str, max_concurrent: int) -> str | None:
+        if self.in_flight.get(key, 0) >= max_concurrent:
+            return None
+
+        assert self.script is not None
+        token = uuid.uuid4().hex
+        now_ms = int(time.time() * 1000)
+        if not await self.script(keys=[key], args=[now_ms, max_concurrent, self.lease_seconds * 1000, token]):
+            return None
+
+        self.in_flight[key] = self.in_flight.get(key, 0) + 1
+        return token
+
+    async def _wait_for_release(self, key: str, timeout: float) -> None:
+        event = self.released.setdefault(key, asyncio.Event())
+        try:
+            await asyncio.wait_for(event.wait(), timeout)
+        except TimeoutError:
+            pass
+
+    async def acquire(self, key: str, policy: ConcurrencyPolicy) -> str | None:
+        """Take a slot, waiting up to `policy.queue_timeout` seconds for one to free up.
+
+        Returns
+        -------
+        str | None
+            The token to release the slot with, or None if no slot was free before the deadline.
+        """
+        deadline = time.monotonic() + policy.queue_timeout
+        while True:
+            token = await self._try_acquire(key, policy.max_concurrent)
+            if token is not None:
+                return token
+
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return None
+
+            await self._wait_for_release(key, min(remaining, self.poll_interval))
+
+    async def release(self, key: str, token: str) -> None:
+        if self.client is not None:
+            try:
+                await self.client.zrem(key, token)
+            except Exception as e:
+                logger.warning(f"Could not release concurrency slot {key}, it will expire with its lease: {e}")
+
+        count = self.in_flight.get(key, 0) - 1
+        if count > 0:
+            self.in_flight[key] = count
+        else:
+            self.in_flight.pop(key, None)
+
+        # wake up the requests of this process queued for the slot
+        event = self.released.pop(key, None)
+        if event is not None:
+            event.set()
+
+
+concurrency_limiter = ConcurrencyLimiter(
+    lease_seconds=settings.CONCURRENCY_LEASE_SECONDS, poll_interval=settings.CONCURRENCY_POLL_INTERVAL
+)
@@ -0,0 +1,278 @@
+import asyncio
+import json
+from collections.abc import Iterable, Iterator, Mapping
+from enum import StrEnum
+from typing import Any
+
+from fastcrud import FastCRUD
+from sqlalchemy import (
+    BinaryExpression,
+    BindParameter,
+    BooleanClauseList,
+    ColumnElement,
+    Delete,
+    Update,
+    event,
+    inspect,
+    text,
+)
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import ORMExecuteState, Session
+from sqlalchemy.sql import operators
+
+from ...core.config import settings
+from ...core.logger import logging
+from . import cache
+from .metrics import registry
+
+logger = logging.getLogger(__name__)
+
+COUNT_KEY_PREFIX = "count"
+# session.info keys collecting the count scopes, and the tables whose every count, written in the current transaction
+PENDING_COUNT_SCOPES = "count_scopes"
+PENDING_COUNT_TABLES = "count_tables"
+# tables whose counts can be cached, by the column their counts are scoped to: writing a row only invalidates the
+# counts of its scope, such as one user's posts, and the unscoped counts of the table
+COUNT_SCOPES: dict[str, str | None] = {"post": "created_by_user_id", "rate_limit": "tier_id", "user": None}
+
+# Reads the generation of the table in KEYS[1], appends it to the count key in ARGV[1] and reads the field ARGV[2]
+# of the resulting hash, so a cached count costs a single round trip. Bumping the generation drops every count of
+# the table at once, for writes whose scope isn't known.
+COUNT_GET_SCRIPT = """
+local key = ARGV[1] .. ':g' .. (redis.call('GET', KEYS[1]) or '0')
+return {key, redis.call('HGET', key, ARGV[2])}
+"""
+_count_get_script: Any = None
+
+row_counts = registry.counter("row_counts_total", "Total counts of paginated responses, by strategy.", ("strategy",))
+
+
+class CountStrategy(StrEnum):
+    EXACT = "exact"
+    CACHED = "cached"
+    ESTIMATED = "estimated"
+
+
+def count_key(table: str, scope: Any = None) -> str:
+    return f"{COUNT_KEY_PREFIX}:{table}" if scope is None else f"{COUNT_KEY_PREFIX}:{table}:{scope}"
+
+
+def generation_key(table: str) -> str:
+    return f"{COUNT_KEY_PREFIX}:generation:{table}"
+
+
+def _generation_of(generation: bytes | str | None) -> str:
+    return generation.decode() if isinstance(generation, bytes) else generation or "0"
+
+
+async def _cached_count(crud: FastCRUD, db: AsyncSession, **kwargs: Any) -> int:
+    global _count_get_script
+
+    table = crud.model.__tablename__
+    scope_column = COUNT_SCOPES[table]
+    key = count_key(table, kwargs.get(scope_column) if scope_column is not None else None)
+    # every filter combination of a scope is a field of the same hash, so they are all dropped together
+    field = json.dumps(kwargs, sort_keys=True, default=str)
+
+    if cache.client is not None:
+        try:
+            if _count_get_script is None or _count_get_script.registered_client is not cache.client:
+                _count_get_script = cache.client.register_script(COUNT_GET_SCRIPT)
+            # the key of the generation read before counting, so a count racing a bump is never read
+            key, cached = await _count_get_script(keys=[generation_key(table)], args=[key, field])
+            key = key.decode()
+            if cached is not None:
+                row_counts.inc("cached_hit")
+                return int(cached)
+        except Exception as e:
+            logger.warning(f"Could not read cached count: {e}")
+
+    count = await crud.count(db, **kwargs)
+    if cache.client is not None:
+        try:
+            async with cache.client.pipeline(transaction=False) as pipe:
+                pipe.hset(key, field, count)
+                pipe.expire(key, settings.COUNT_CACHE_EXPIRATION)
+                await pipe.execute()
+        except Exception as e:
+            logger.warning(f"Could not cache count: {e}")
+
+    row_counts.inc("cached_miss")
+    return count
+
+
+async def _estimated_count(crud: FastCRUD, db: AsyncSession, **kwargs: Any) -> int:
+    if db.get_bind().dialect.name == "postgresql":
+        # the planner's row estimate, as of the last VACUUM or ANALYZE, ignoring the filters
+        estimate = await db.scalar(
+            text("SELECT reltuples::bigint FROM pg_class WHERE oid = to_regclass(:table)"),
+            {"table": f'"{crud.model.__tablename__}"'},
+        )
+        # -1 until the table is first analyzed
+        if estimate is not None and estimate >= 0:
+            row_counts.inc("estimated")
+            return int(estimate)
+
+    row_counts.inc("exact")
+    return await crud.count(db, **kwargs)
+
+
+async def count_rows(crud: FastCRUD, db: AsyncSession, strategy: CountStrategy, **kwargs: Any) -> int:
+    """Count the rows of `crud`'s model matching `kwargs` for the `total_count` of a paginated response.
+
+    Parameters
+    ----------
+    crud: FastCRUD
+        CRUD of the model to count.
+    db: AsyncSession
+        The database session.
+    strategy: CountStrategy
+        `EXACT` runs a `COUNT(*)` every time. `CACHED` keeps the count in Redis until a row of its scope (see
+        `COUNT_SCOPES`) is written, or `COUNT_CACHE_EXPIRATION` seconds. `ESTIMATED` reads the planner's estimate
+        of the whole table from `pg_class`, ignoring `kwargs`, and counts exactly on other databases or before the
+        table was first analyzed.
+    **kwargs: Any
+        Filters, as accepted by FastCRUD.
+    """
+    if strategy == CountStrategy.CACHED:
+        return await _cached_count(crud, db, **kwargs)
+    if strategy == CountStrategy.ESTIMATED:
+        return await _estimated_count(crud, db, **kwargs)
+
+    row_counts.inc("exact")
+    return await crud.count(db, **kwargs)
+
+
+async def invalidate_counts(scopes: Iterable[tuple[str, Any]], tables: Iterable[str] = ()) -> None:
+    """Drop the cached counts of each `(table, scope)` in `scopes`, and every cached count of `tables`.
+
+    A None scope is the unscoped count of its table.
+    """
+    tables = set(tables)
+    scopes = [(table, scope) for table, scope in scopes if table not in tables]
+    if cache.client is None or not (scopes or tables):
+        return
+
+    try:
+        generations = await cache.client.mget([generation_key(table) for table, _ in scopes]) if scopes else []
+        async with cache.client.pipeline(transaction=False) as pipe:
+            for table in tables:
+                pipe.incr(generation_key(table))
+            for (table, scope), generation in zip(scopes, generations):
+                pipe.delete(f"{count_key(table, scope)}:g{_generation_of(generation)}")
+            await pipe.execute()
+    except Exception as e:
+        logger.warning(f"Could not invalidate cached counts: {e}")
+
+
+_tasks: set[asyncio.Task] = set()
+
+
+def _invalidate_soon(scopes: set[tuple[str, Any]], tables: set[str]) -> None:
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        # a synchronous session, outside of the app: the counts expire on their own
+        return
+
+    task = loop.create_task(invalidate_counts(scopes, tables))
+    _tasks.add(task)
+    task.add_done_callback(_tasks.discard)
+
+
+def _table_scopes(table: str, scopes: Iterable[Any]) -> set[tuple[str, Any]]:
+    return {(table, None)} | {(table, scope) for scope in scopes if scope is not None}
+
+
+def _criteria(clause: ColumnElement[Any]) -> Iterator[ColumnElement[Any]]:
+    # only the terms of a conjunction restrict every row, so those of an OR are not looked into
+    if isinstance(clause, BooleanClauseList) and clause.operator is operators.and_:
+        for term in clause.clauses:
+            yield from _criteria(term)
+    else:
+        yield clause
+
+
+def _where_scopes(statement: Update | Delete, table: str, scope_column: str) -> list[Any] | None:
+    """The scopes the WHERE clause of `statement` restricts it to, or None when it doesn't restrict its scope."""
+    if statement.whereclause is None:
+        return None
+
+    for criterion in _criteria(statement.whereclause):
+        if not (isinstance(criterion, BinaryExpression) and isinstance(criterion.right, BindParameter)):
+            continue
+        column = criterion.left
+        if (
+            getattr(getattr(column, "table", None), "name", None) != table
+            or getattr(column, "key", None) != scope_column
+        ):
+            continue
+        if criterion.operator is operators.eq:
+            return [criterion.right.effective_value]
+        if criterion.operator is operators.in_op:
+            return list(criterion.right.effective_value or [])
+    return None
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_flushed_rows(session: Session, _: Any) -> None:
+    scopes = session.info.setdefault(PENDING_COUNT_SCOPES, set())
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        table = getattr(obj, "__tablename__", None)
+        if table not in COUNT_SCOPES:
+            continue
+
+        scope_column = COUNT_SCOPES[table]
+        if scope_column is None:
+            scopes.add((table, None))
+            continue
+
+        # a row moved to another scope changes the counts of both
+        history = inspect(obj).attrs[scope_column].history
+        scopes |= _table_scopes(table, [getattr(obj, scope_column), *history.deleted])
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _collect_written_rows(state: ORMExecuteState) -> None:
+    if not (state.is_insert or state.is_update or state.is_delete) or state.bind_mapper is None:
+        return
+
+    table = getattr(state.bind_mapper.class_, "__tablename__", None)
+    if table not in COUNT_SCOPES:
+        return
+
+    scopes = state.session.info.setdefault(PENDING_COUNT_SCOPES, set())
+    scope_column = COUNT_SCOPES[table]
+    parameters = state.parameters
+    if scope_column is None:
+        scopes.add((table, None))
+    elif state.is_insert:
+        rows = [parameters] if isinstance(parameters, Mapping) else list(parameters or [{}])
+        scopes |= _table_scopes(table, [row.get(scope_column) for row in rows])
+    elif isinstance(state.statement, Update | Delete):
+        # the scopes are read from the WHERE clause rather than from the rows, so a write costs no extra query;
+        # a write whose scope isn't restricted there, such as one by id, drops every count of the table
+        where_scopes = _where_scopes(state.statement, table, scope_column)
+        if where_scopes is None:
+            state.session.info.setdefault(PENDING_COUNT_TABLES, set()).add(table)
+            return
+
+        scopes |= _table_scopes(table, where_scopes)
+        if isinstance(state.statement, Update):
+            # and the scope the rows are moved to, set by the statement or by its parameters
+            values = {**state.statement.compile().params, **(parameters if isinstance(parameters, Mapping) else {})}
+            scopes |= _table_scopes(table, [values.get(scope_column)])
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed_counts(session: Session) -> None:
+    scopes = session.info.pop(PENDING_COUNT_SCOPES, None) or set()
+    tables = session.info.pop(PENDING_COUNT_TABLES, None) or set()
+    if scopes or tables:
+        _invalidate_soon(scopes, tables)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_rolled_back_counts(session: Session) -> None:
+    session.info.pop(PENDING_COUNT_SCOPES, None)
+    session.info.pop(PENDING_COUNT_TABLES, None)
@@ -0,0 +1,177 @@
+import math
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+
+from redis.asyncio import Redis
+from redis.commands.core import AsyncScript
+
+from ...core.config import settings
+from ...core.exceptions.http_exceptions import RateLimitException, ServiceUnavailableException
+from ...core.logger import logging
+from .metrics import registry
+
+logger = logging.getLogger(__name__)
+
+# KEYS[1] counts the failed logins of a username or an address, KEYS[2] locks it out. Past `max_failures`, each
+# further failure doubles the lockout, up to `max_lockout`.
+FAILURE_SCRIPT = """
+local failures = redis.call('INCR', KEYS[1])
+redis.call('PEXPIRE', KEYS[1], ARGV[1])
+local excess = failures - tonumber(ARGV[2])
+if excess < 0 then
+    return 0
+end
+local lockout = math.floor(math.min(tonumber(ARGV[3]) * 2 ^ excess, tonumber(ARGV[4])))
+redis.call('SET', KEYS[2], 1, 'PX', lockout)
+return lockout
+"""
+
+login_attempts_rejected = registry.counter(
+    "login_attempts_rejected_total", "Login attempts turned away before checking the password.", ("reason",)
+)
+
+
+class LoginThrottle:
+    """Admission control in front of the password check of `/login`.
+
+    Failed logins are counted in Redis per username and per client address. Once either count passes its limit, the
+    username or the address is locked out for `lockout_seconds`, doubling with each further failure. Locked out
+    attempts, and attempts past `max_concurrent` password checks in flight in this process, are rejected before
+    the user is queried or bcrypt runs, so a credential stuffing burst costs one Redis round trip per attempt
+    rather than a hash.
+
+    Parameters
+    ----------
+    max_failures_per_username: int
+        Failures of a username, within the window, before it is locked out.
+    max_failures_per_ip: int
+        Failures from an address, within the window, before it is locked out.
+    failure_window: int
+        Seconds after its last failure a count is forgotten.
+    lockout_seconds: float
+        First lockout, doubled by each further failure.
+    max_lockout_seconds: float
+        Longest lockout.
+    max_concurrent: int
+        Password checks in flight in this process.
+    """
+
+    def __init__(
+        self,
+        max_failures_per_username: int = 5,
+        max_failures_per_ip: int = 20,
+        failure_window: int = 3600,
+        lockout_seconds: float = 1.0,
+        max_lockout_seconds: float = 900.0,
+        max_concurrent: int = 16,
+    ) -> None:
+        self.max_failures_per_username = max_failures_per_username
+        self.max_failures_per_ip = max_failures_per_ip
+        self.failure_window = failure_window
+        self.lockout_seconds = lockout_seconds
+        self.max_lockout_seconds = max_lockout_seconds
+        self.max_concurrent = max_concurrent
+        self.in_flight = 0
+        self.client: Redis | None = None
+        self.script: AsyncScript | None = None
+
+    def initialize(self, client: Redis) -> None:
+        self.client = client
+        self.script = client.register_script(FAILURE_SCRIPT)
+
+    @staticmethod
+    def username_keys(username: str) -> tuple[str, str]:
+        """The failure count and lockout keys of a username, emails being case insensitive."""
+        username = username.lower()
+        return f"login:failures:username:{username}", f"login:lockout:username:{username}"
+
+    @staticmethod
+    def ip_keys(ip: str) -> tuple[str, str]:
+        return f"login:failures:ip:{ip}", f"login:lockout:ip:{ip}"
+
+    async def locked_for(self, username: str, ip: str) -> float:
+        """Seconds until both the username and the address may try again, 0 when neither is locked out."""
+        if self.client is None:
+            return 0
+
+        try:
+            async with self.client.pipeline(transaction=False) as pipe:
+                pipe.pttl(self.username_keys(username)[1])
+                pipe.pttl(self.ip_keys(ip)[1])
+                ttls = await pipe.execute()
+        except Exception as e:
+            logger.warning(f"Could not check login lockouts, letting the attempt through: {e}")
+            return 0
+
+        # PTTL is negative for keys without a lockout
+        return max(0, *(int(ttl) for ttl in ttls)) / 1000
+
+    @asynccontextmanager
+    async def attempt(self, username: str, ip: str) -> AsyncIterator[None]:
+        """Admit one login attempt for the duration of the block, or raise before any work is done.
+
+        Raises
+        ------
+        RateLimitException
+            The username or the address is locked out, with the lockout left in `Retry-After`.
+        ServiceUnavailableException
+            `max_concurrent` password checks are already in flight.
+        """
+        if self.in_flight >= self.max_concurrent:
+            login_attempts_rejected.inc("concurrency")
+            raise ServiceUnavailableException("Too many login attempts in progress.", headers={"Retry-After": "1"})
+
+        retry_after = await self.locked_for(username, ip)
+        if retry_after > 0:
+            login_attempts_rejected.inc("lockout")
+            raise RateLimitException(
+                "Too many failed login attempts.", headers={"Retry-After": str(max(1, math.ceil(retry_after)))}
+            )
+
+        self.in_flight += 1
+        try:
+            yield
+        finally:
+            self.in_flight -= 1
+
+    async def failed(self, username: str, ip: str) -> None:
+        if self.script is None:
+            return
+
+        counts = (
+            (self.username_keys(username), self.max_failures_per_username),
+            (self.ip_keys(ip), self.max_failures_per_ip),
+        )
+        try:
+            for keys, max_failures in counts:
+                await self.script(
+                    keys=list(keys),
+                    args=[
+                        self.failure_window * 1000,
+                        max_failures,
+                        int(self.lockout_seconds * 1000),
+                        int(self.max_lockout_seconds * 1000),
+                    ],
+                )
+        except Exception as e:
+            logger.warning(f"Could not count failed login: {e}")
+
+    async def succeeded(self, username: str) -> None:
+        """Forget the username's failures, but not the address': a credential stuffing run succeeds now and then."""
+        if self.client is None:
+            return
+
+        try:
+            await self.client.delete(self.username_keys(username)[0])
+        except Exception as e:
+            logger.warning(f"Could not reset failed logins: {e}")
+
+
+login_throttle = LoginThrottle(
+    max_failures_per_username=settings.LOGIN_MAX_FAILURES_PER_USERNAME,
+    max_failures_per_ip=settings.LOGIN_MAX_FAILURES_PER_IP,
+    failure_window=settings.LOGIN_FAILURE_WINDOW_SECONDS,
+    lockout_seconds=settings.LOGIN_LOCKOUT_SECONDS,
+    max_lockout_seconds=settings.LOGIN_MAX_LOCKOUT_SECONDS,
+    max_concurrent=settings.LOGIN_MAX_CONCURRENT_CHECKS,
+)
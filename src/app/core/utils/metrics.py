@@ -0,0 +1,211 @@
+import bisect
+import random
+import threading
+from collections.abc import Iterable
+
+DEFAULT_BUCKETS: tuple[float, ...] = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+BYTES_BUCKETS: tuple[float, ...] = (64, 256, 1024, 4096, 16384, 65536, 262144, 1048576)
+
+
+def _format_labels(label_names: tuple[str, ...], label_values: tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(label_names, label_values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+class Counter:
+    """Monotonic counter keyed by a tuple of label values.
+
+    Increments are plain dictionary updates so they are cheap enough to run on every request.
+    """
+
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, label_names: tuple[str, ...] = ()) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.label_names = label_names
+        self.values: dict[tuple[str, ...], float] = {}
+
+    def inc(self, *label_values: str, amount: float = 1) -> None:
+        self.values[label_values] = self.values.get(label_values, 0) + amount
+
+    def get(self, *label_values: str) -> float:
+        return self.values.get(label_values, 0)
+
+    def samples(self) -> Iterable[str]:
+        for label_values, value in self.values.items():
+            yield f"{self.name}{_format_labels(self.label_names, label_values)} {value}"
+
+    def reset(self) -> None:
+        self.values.clear()
+
+
+class Histogram:
+    """Fixed-bucket histogram keyed by a tuple of label values.
+
+    Each observation costs one binary search over the bucket bounds and two additions.
+    """
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        label_names: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.label_names = label_names
+        self.buckets = buckets
+        self.values: dict[tuple[str, ...], list[float]] = {}
+
+    def observe(self, value: float, *label_values: str) -> None:
+        series = self.values.get(label_values)
+        if series is None:
+            # one slot per bucket, one for +Inf, then sum and count
+            series = [0.0] * (len(self.buckets) + 3)
+            self.values[label_values] = series
+
+        series[bisect.bisect_left(self.buckets, value)] += 1
+        series[-2] += value
+        series[-1] += 1
+
+    def count(self, *label_values: str) -> int:
+        series = self.values.get(label_values)
+        return int(series[-1]) if series else 0
+
+    def sum(self, *label_values: str) -> float:
+        series = self.values.get(label_values)
+        return series[-2] if series else 0.0
+
+    def samples(self) -> Iterable[str]:
+        for label_values, series in self.values.items():
+            cumulative = 0.0
+            for bound, bucket_count in zip((*self.buckets, float("inf")), series):
+                cumulative += bucket_count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                labels = _format_labels(self.label_names, label_values, extra=f'le="{le}"')
+                yield f"{self.name}_bucket{labels} {cumulative}"
+
+            labels = _format_labels(self.label_names, label_values)
+            yield f"{self.name}_sum{labels} {series[-2]}"
+            yield f"{self.name}_count{labels} {series[-1]}"
+
+    def reset(self) -> None:
+        self.values.clear()
+
+
+class MetricsRegistry:
+    """Process-local registry that renders its metrics in the Prometheus text exposition format."""
+
+    def __init__(self) -> None:
+        self.metrics: dict[str, Counter | Histogram] = {}
+
+    def counter(self, name: str, documentation: str, label_names: tuple[str, ...] = ()) -> Counter:
+        metric = self.metrics.get(name)
+        if metric is None:
+            metric = Counter(name, documentation, label_names)
+            self.metrics[name] = metric
+        assert isinstance(metric, Counter)
+        return metric
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        label_names: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        metric = self.metrics.get(name)
+        if metric is None:
+            metric = Histogram(name, documentation, label_names, buckets)
+            self.metrics[name] = metric
+        assert isinstance(metric, Histogram)
+        return metric
+
+    def render(self) -> str:
+        lines: list[str] = []
+        for metric in self.metrics.values():
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+    def reset(self) -> None:
+        for metric in self.metrics.values():
+            metric.reset()
+
+
+class HotKeyTracker:
+    """Sampled approximate top-k tracker using the Space-Saving algorithm.
+
+    Only a `sample_rate` fraction of accesses is recorded and at most `capacity` keys are kept, so memory stays
+    bounded regardless of keyspace cardinality. Counts are estimates scaled back by the sample rate.
+
+    Parameters
+    ----------
+    capacity: int
+        Maximum number of keys tracked at once.
+    sample_rate: float
+        Fraction of accesses that are recorded, between 0 and 1.
+    """
+
+    def __init__(self, capacity: int = 128, sample_rate: float = 0.01) -> None:
+        self.capacity = capacity
+        self.sample_rate = sample_rate
+        self.counts: dict[tuple[str, str], list[int]] = {}
+        self._lock = threading.Lock()
+
+    def record(self, key_prefix: str, key: str, hit: bool) -> None:
+        if self.sample_rate <= 0 or random.random() >= self.sample_rate:
+            return
+
+        with self._lock:
+            entry = self.counts.get((key_prefix, key))
+            if entry is None:
+                if len(self.counts) >= self.capacity:
+                    evicted = min(self.counts, key=lambda k: self.counts[k][0])
+                    floor = self.counts.pop(evicted)[0]
+                else:
+                    floor = 0
+                # [estimated count, hits, overestimation inherited from the evicted key]
+                entry = [floor, 0, floor]
+                self.counts[(key_prefix, key)] = entry
+
+            entry[0] += 1
+            if hit:
+                entry[1] += 1
+
+    def top(self, limit: int = 20) -> list[dict[str, str | float]]:
+        with self._lock:
+            ranked = sorted(self.counts.items(), key=lambda item: item[1][0], reverse=True)[:limit]
+
+        scale = 1 / self.sample_rate if self.sample_rate > 0 else 0
+        report: list[dict[str, str | float]] = []
+        for (key_prefix, key), (count, hits, error) in ranked:
+            sampled = count - error
+            report.append(
+                {
+                    "key_prefix": key_prefix,
+                    "key": key,
+                    "estimated_requests": round(count * scale),
+                    "max_overestimation": round(error * scale),
+                    "hit_ratio": round(hits / sampled, 3) if sampled > 0 else 0.0,
+                }
+            )
+        return report
+
+    def reset(self) -> None:
+        with self._lock:
+            self.counts.clear()
+
+
+registry = MetricsRegistry()
@@ -0,0 +1,89 @@
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import Any, Generic, TypeVar
+
+from fastcrud import FastCRUD
+from pydantic import BaseModel
+from sqlalchemy import literal, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..exceptions.http_exceptions import BadRequestException
+
+SchemaType = TypeVar("SchemaType", bound=BaseModel)
+
+
+class CursorPaginatedListResponse(BaseModel, Generic[SchemaType]):
+    data: list[SchemaType]
+    items_per_page: int
+    has_more: bool
+    next_cursor: str | None = None
+
+
+def encode_cursor(created_at: datetime, id: int) -> str:
+    """Opaque cursor pointing right after the row created at `created_at` with `id`."""
+    return base64.urlsafe_b64encode(json.dumps([created_at.isoformat(), id]).encode()).decode()
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, int]:
+    try:
+        created_at, id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return datetime.fromisoformat(created_at), int(id)
+    except (binascii.Error, ValueError, TypeError) as e:
+        raise BadRequestException("Invalid cursor.") from e
+
+
+async def keyset_paginated_response(
+    crud: FastCRUD,
+    db: AsyncSession,
+    cursor: str | None,
+    items_per_page: int,
+    schema_to_select: type[BaseModel] | None = None,
+    **kwargs: Any,
+) -> dict[str, Any]:
+    """Page through the rows matching `kwargs`, newest first, seeking past `cursor` instead of counting an offset.
+
+    Rows are ordered by `(created_at, id)`, which the model must have and should index after its filter columns, so
+    every page costs an index seek however deep it is, and rows inserted meanwhile don't shift the pages.
+
+    Parameters
+    ----------
+    crud: FastCRUD
+        CRUD of the model to page through.
+    db: AsyncSession
+        The database session.
+    cursor: str | None
+        The `next_cursor` of the previous page, or empty (or None) for the first page.
+    items_per_page: int
+        Rows per page.
+    schema_to_select: type[BaseModel] | None
+        Schema of the returned rows, all columns by default.
+    **kwargs: Any
+        Filters, as accepted by FastCRUD.
+
+    Returns
+    -------
+    dict[str, Any]
+        A `CursorPaginatedListResponse`, whose `next_cursor` is None on the last page.
+    """
+    model = crud.model
+    stmt = await crud.select(schema_to_select=schema_to_select, **kwargs)
+    # the cursor columns, unless the schema already selects them
+    stmt = stmt.add_columns(model.created_at.label("_cursor_created_at"), model.id.label("_cursor_id"))
+    if cursor:
+        created_at, id = decode_cursor(cursor)
+        stmt = stmt.where(tuple_(model.created_at, model.id) < tuple_(literal(created_at), literal(id)))
+    stmt = stmt.order_by(model.created_at.desc(), model.id.desc()).limit(items_per_page + 1)
+
+    rows = [dict(row) for row in (await db.execute(stmt)).mappings()]
+    has_more = len(rows) > items_per_page
+    rows = rows[:items_per_page]
+
+    next_cursor = None
+    if has_more:
+        next_cursor = encode_cursor(rows[-1]["_cursor_created_at"], rows[-1]["_cursor_id"])
+    for row in rows:
+        del row["_cursor_created_at"], row["_cursor_id"]
+
+    return {"data": rows, "items_per_page": items_per_page, "has_more": has_more, "next_cursor": next_cursor}
@@ -0,0 +1,136 @@
+import asyncio
+import time
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+
+import bcrypt
+
+from ..config import settings
+from ..exceptions.http_exceptions import ServiceUnavailableException
+from .metrics import registry
+
+HASH_BUCKETS: tuple[float, ...] = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+# bcrypt's own bounds on the cost factor, each round doubling the work
+MIN_ROUNDS = 4
+MAX_ROUNDS = 31
+
+password_hash_seconds = registry.histogram(
+    "password_hash_seconds", "Time spent hashing or checking a password.", ("operation",), HASH_BUCKETS
+)
+password_hash_wait_seconds = registry.histogram(
+    "password_hash_wait_seconds", "Time a password operation waited for a hashing thread.", ("operation",), HASH_BUCKETS
+)
+password_hash_rejected = registry.counter(
+    "password_hash_rejected_total", "Password operations rejected because the hashing queue was full.", ("operation",)
+)
+
+
+class PasswordHashingPool:
+    """Runs bcrypt on a bounded thread pool, off the event loop.
+
+    bcrypt releases the GIL while it hashes, so the loop keeps serving other requests meanwhile. At most `workers`
+    operations run at once and at most `max_queued` more wait for a thread; past that, new operations are rejected
+    with a 503 straight away, so a burst of logins can't build an unbounded backlog of CPU work.
+
+    Parameters
+    ----------
+    workers: int
+        Threads hashing concurrently, at most the number of cores that may be spent on bcrypt.
+    max_queued: int
+        Operations allowed to wait for a thread.
+    rounds: int
+        bcrypt cost factor of new hashes, as picked by `calibrate_rounds`.
+    """
+
+    def __init__(self, workers: int = 4, max_queued: int = 64, rounds: int = 12) -> None:
+        self.workers = workers
+        self.max_queued = max_queued
+        self.rounds = rounds
+        self.pending = 0
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="password-hash")
+
+    async def run(self, operation: str, func: Callable[..., Any], *args: Any) -> Any:
+        if self.pending >= self.workers + self.max_queued:
+            password_hash_rejected.inc(operation)
+            raise ServiceUnavailableException("Too many password checks in progress.", headers={"Retry-After": "1"})
+
+        def timed() -> tuple[float, float, Any]:
+            started = time.perf_counter()
+            result = func(*args)
+            return started, time.perf_counter() - started, result
+
+        self.pending += 1
+        queued = time.perf_counter()
+        try:
+            started, duration, result = await asyncio.get_running_loop().run_in_executor(self.executor, timed)
+        finally:
+            self.pending -= 1
+
+        # observed from the loop, metrics aren't shared with the hashing threads
+        password_hash_wait_seconds.observe(started - queued, operation)
+        password_hash_seconds.observe(duration, operation)
+        return result
+
+    def hash_sync(self, password: str) -> str:
+        return bcrypt.hashpw(password.encode(), bcrypt.gensalt(rounds=self.rounds)).decode()
+
+    async def hash(self, password: str) -> str:
+        return str(await self.run("hash", self.hash_sync, password))
+
+    async def check(self, password: str, hashed_password: str) -> bool:
+        return bool(await self.run("check", bcrypt.checkpw, password.encode(), hashed_password.encode()))
+
+    def needs_rehash(self, hashed_password: str) -> bool:
+        """Whether `hashed_password` was made at a lower cost than new hashes are."""
+        # bcrypt hashes read $<version>$<rounds>$<salt and digest>
+        try:
+            return int(hashed_password.split("$")[2]) < self.rounds
+        except (IndexError, ValueError):
+            return False
+
+    def shutdown(self) -> None:
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+def calibrate_rounds(target_seconds: float, minimum: int = 10, samples: int = 3) -> tuple[int, dict[int, float]]:
+    """Pick the highest bcrypt cost factor whose hash takes at most `target_seconds` on this host.
+
+    Parameters
+    ----------
+    target_seconds: float
+        Latency budget of a single hash.
+    minimum: int
+        Lowest cost factor returned, even if it exceeds the budget.
+    samples: int
+        Hashes timed per cost factor, the fastest is kept.
+
+    Returns
+    -------
+    tuple[int, dict[int, float]]
+        The cost factor, and the seconds measured for each cost factor tried.
+    """
+    timings: dict[int, float] = {}
+    rounds = MIN_ROUNDS
+    while rounds <= MAX_ROUNDS:
+        salt = bcrypt.gensalt(rounds=rounds)
+        best = float("inf")
+        for _ in range(samples):
+            started = time.perf_counter()
+            bcrypt.hashpw(b"calibration", salt)
+            best = min(best, time.perf_counter() - started)
+        timings[rounds] = best
+        # the next round doubles the work, so stop before timing one that is bound to overrun
+        if best * 2 > target_seconds:
+            break
+        rounds += 1
+
+    within_budget = [rounds for rounds, seconds in timings.items() if seconds <= target_seconds]
+    return max([minimum, *within_budget]), timings
+
+
+password_hashing_pool = PasswordHashingPool(
+    workers=settings.PASSWORD_HASH_WORKERS,
+    max_queued=settings.PASSWORD_HASH_MAX_QUEUED,
+    rounds=settings.PASSWORD_HASH_ROUNDS,
+)
@@ -0,0 +1,165 @@
+import asyncio
+import json
+import time
+from collections import OrderedDict
+from collections.abc import Iterable
+from typing import Any
+
+from sqlalchemy import event, select
+from sqlalchemy.orm import ORMExecuteState, Session
+
+from ...core.config import settings
+from ...core.logger import logging
+from ...models.user import User
+from . import cache, pubsub
+from .metrics import registry
+
+logger = logging.getLogger(__name__)
+
+PRINCIPAL_CHANNEL = "auth:principals"
+PRINCIPAL_KEY_PREFIX = "principal"
+# session.info key collecting the subjects of the users written in the current transaction
+PENDING_SUBJECTS = "principal_subjects"
+
+principal_lookups = registry.counter(
+    "principal_cache_lookups_total", "Authenticated user lookups, by where they were answered.", ("source",)
+)
+
+
+class PrincipalCache:
+    """Short-lived copy of the authenticated user, keyed by token subject, so `get_current_user` skips the database.
+
+    Principals are held in-process and in the cache Redis for `ttl` seconds. Writing a user through any session
+    (the API, the admin panel or a worker) drops the cached principals of its username and email when the
+    transaction commits, in this process right away and in the others through a message on `PRINCIPAL_CHANNEL`.
+    The TTL only bounds how stale a principal can get when it was read concurrently with a write.
+
+    Parameters
+    ----------
+    ttl: int
+        Seconds a principal is served from the cache.
+    max_entries: int
+        Principals kept in-process, the least recently used are evicted first.
+    """
+
+    def __init__(self, ttl: int = 30, max_entries: int = 10000) -> None:
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.local: OrderedDict[str, tuple[float, dict[str, Any]]] = OrderedDict()
+        self._tasks: set[asyncio.Task] = set()
+
+    @staticmethod
+    def key(subject: str) -> str:
+        return f"{PRINCIPAL_KEY_PREFIX}:{subject}"
+
+    def _remember(self, subject: str, principal: dict[str, Any], expires_at: float) -> None:
+        self.local[subject] = (expires_at, principal)
+        self.local.move_to_end(subject)
+        if len(self.local) > self.max_entries:
+            self.local.popitem(last=False)
+
+    async def get(self, subject: str) -> dict[str, Any] | None:
+        now = time.time()
+        entry = self.local.get(subject)
+        if entry is not None:
+            if entry[0] > now:
+                principal_lookups.inc("local")
+                return entry[1]
+            del self.local[subject]
+
+        if cache.client is not None:
+            try:
+                cached = await cache.client.get(self.key(subject))
+            except Exception as e:
+                logger.warning(f"Could not read cached principal: {e}")
+                cached = None
+
+            if cached is not None:
+                data = json.loads(cached)
+                principal: dict[str, Any] = data["principal"]
+                self._remember(subject, principal, data["expires_at"])
+                principal_lookups.inc("redis")
+                return principal
+
+        principal_lookups.inc("miss")
+        return None
+
+    async def set(self, subject: str, principal: dict[str, Any]) -> None:
+        expires_at = time.time() + self.ttl
+        self._remember(subject, principal, expires_at)
+        if cache.client is not None:
+            try:
+                data = json.dumps({"expires_at": expires_at, "principal": principal})
+                await cache.client.set(self.key(subject), data, ex=self.ttl)
+            except Exception as e:
+                logger.warning(f"Could not cache principal: {e}")
+
+    def forget(self, subjects: Iterable[str]) -> None:
+        for subject in subjects:
+            self.local.pop(subject, None)
+
+    async def invalidate(self, subjects: Iterable[str]) -> None:
+        """Drop the principals of `subjects` in Redis and in every process."""
+        subjects = list(subjects)
+        self.forget(subjects)
+        if cache.client is not None:
+            try:
+                await cache.client.delete(*[self.key(subject) for subject in subjects])
+            except Exception as e:
+                logger.warning(f"Could not invalidate cached principals: {e}")
+
+        await pubsub.publish(PRINCIPAL_CHANNEL, "\n".join(subjects))
+
+    async def drop(self, message: str | None = None) -> None:
+        # messages may have been missed while the listener was disconnected
+        if message is None:
+            self.local.clear()
+            return
+
+        self.forget(message.split("\n"))
+
+    def invalidate_soon(self, subjects: Iterable[str]) -> None:
+        """Drop the principals of `subjects` in this process now, and everywhere else from a background task."""
+        subjects = list(subjects)
+        self.forget(subjects)
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # a synchronous session, outside of the app: the other processes' entries expire after the TTL
+            return
+
+        task = loop.create_task(self.invalidate(subjects))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+
+principal_cache = PrincipalCache(ttl=settings.PRINCIPAL_CACHE_TTL, max_entries=settings.PRINCIPAL_CACHE_MAX_ENTRIES)
+pubsub.subscribe(PRINCIPAL_CHANNEL, principal_cache.drop)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _collect_user_writes(state: ORMExecuteState) -> None:
+    if not (state.is_update or state.is_delete) or state.bind_mapper is None or state.bind_mapper.class_ is not User:
+        return
+
+    # the subjects are read before the write, so a renamed user's previous username is invalidated
+    query = select(User.username, User.email)
+    whereclause = state.statement.whereclause  # type: ignore[attr-defined]
+    if whereclause is not None:
+        query = query.where(whereclause)
+
+    subjects = state.session.info.setdefault(PENDING_SUBJECTS, set())
+    for username, email in state.session.execute(query):
+        subjects.update((username, email))
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed_user_writes(session: Session) -> None:
+    subjects = session.info.pop(PENDING_SUBJECTS, None)
+    if subjects:
+        principal_cache.invalidate_soon(subjects)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_rolled_back_user_writes(session: Session) -> None:
+    session.info.pop(PENDING_SUBJECTS, None)
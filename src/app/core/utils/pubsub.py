@@ -0,0 +1,91 @@
+import asyncio
+from collections.abc import Awaitable, Callable
+
+from redis.asyncio import Redis
+
+from ..logger import logging
+
+logger = logging.getLogger(__name__)
+
+Handler = Callable[[str | None], Awaitable[None]]
+
+client: Redis | None = None
+handlers: dict[str, list[Handler]] = {}
+_listener: asyncio.Task | None = None
+
+
+def subscribe(channel: str, handler: Handler) -> None:
+    """Register `handler` to be awaited with every message published on `channel`.
+
+    Handlers are also awaited with None whenever the listener (re)connects, since messages published while it
+    was disconnected are lost; they should then resynchronise their state from the source of truth.
+    """
+    handlers.setdefault(channel, []).append(handler)
+
+
+async def publish(channel: str, message: str = "") -> None:
+    """Broadcast `message` to every process subscribed to `channel`, including this one.
+
+    Without a listener running, local handlers are awaited directly so the current process stays consistent.
+    """
+    if client is None or _listener is None:
+        await _dispatch(channel, message)
+        return
+
+    await client.publish(channel, message)
+
+
+async def _dispatch(channel: str, message: str | None) -> None:
+    for handler in handlers.get(channel, []):
+        try:
+            await handler(message)
+        except Exception as e:
+            logger.exception(f"Error handling message on channel {channel}: {e}")
+
+
+async def _listen() -> None:
+    assert client is not None
+    while True:
+        try:
+            async with client.pubsub(ignore_subscribe_messages=True) as pubsub:
+                await pubsub.subscribe(*handlers)
+                for channel in handlers:
+                    await _dispatch(channel, None)
+
+                async for message in pubsub.listen():
+                    channel = message["channel"].decode()
+                    data = message["data"]
+                    await _dispatch(channel, data.decode() if isinstance(data, bytes) else str(data))
+
+        except asyncio.CancelledError:
+            raise
+
+        except Exception as e:
+            logger.warning(f"Pub/sub listener disconnected, retrying: {e}")
+            await asyncio.sleep(1)
+
+
+async def start_listener(redis_url: str) -> None:
+    global client, _listener
+
+    if _listener is not None or not handlers:
+        return
+
+    client = Redis.from_url(redis_url)
+    _listener = asyncio.create_task(_listen())
+
+
+async def stop_listener() -> None:
+    global client, _listener
+
+    if _listener is not None:
+        _listener.cancel()
+        try:
+            await _listener
+        except asyncio.CancelledError:
+            pass
+        _listener = None
+
+    if client is not None:
+        await client.aclose()  # type: ignore
+        client = None
@@ -1,19 +1,269 @@
-from datetime import UTC, datetime
-from typing import Optional
+import asyncio
+import math
+import time
+from dataclasses import dataclass
+from typing import Any, Optional
 
 from redis.asyncio import ConnectionPool, Redis
-from sqlalchemy.ext.asyncio import AsyncSession
 
 from ...core.logger import logging
-from ...schemas.rate_limit import sanitize_path
+from ...schemas.rate_limit import RateLimitAlgorithm, sanitize_path
+from .metrics import registry
 
 logger = logging.getLogger(__name__)
 
+rate_limit_checks = registry.counter(
+    "rate_limit_checks_total", "Rate limit checks, by whether they were decided locally or in Redis.", ("source",)
+)
+
+# Every script takes the limit, the period in milliseconds and the current time in milliseconds, and returns
+# {allowed, remaining, reset_after_ms, retry_after_ms}. Running the check as one script makes it atomic and a
+# single round trip, and a counter can never be left without a TTL.
+FIXED_WINDOW_SCRIPT = """
+local limit = tonumber(ARGV[1])
+local period = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+local reset_after = period - now % period
+local count = redis.call('INCR', KEYS[1])
+if count == 1 then
+    redis.call('PEXPIRE', KEYS[1], reset_after)
+end
+if count > limit then
+    return {0, 0, reset_after, reset_after}
+end
+return {1, limit - count, reset_after, 0}
+"""
+
+# Weights the previous window by how much of it still overlaps the sliding window. KEYS[1] is the current
+# window counter and KEYS[2] the previous one. Rejected requests are not counted.
+SLIDING_WINDOW_SCRIPT = """
+local limit = tonumber(ARGV[1])
+local period = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+local elapsed = now % period
+local current = tonumber(redis.call('GET', KEYS[1]) or '0')
+local previous = tonumber(redis.call('GET', KEYS[2]) or '0')
+local weight = (period - elapsed) / period
+if previous * weight + current + 1 > limit then
+    local retry_after = period - elapsed
+    if previous > 0 and limit - current - 1 >= 0 then
+        retry_after = math.ceil(period * (1 - (limit - current - 1) / previous)) - elapsed
+    end
+    return {0, 0, period - elapsed, math.max(retry_after, 1)}
+end
+current = redis.call('INCR', KEYS[1])
+if current == 1 then
+    redis.call('PEXPIRE', KEYS[1], 2 * period)
+end
+return {1, math.floor(limit - previous * weight - current), period - elapsed, 0}
+"""
+
+# Generic cell rate algorithm: KEYS[1] holds the theoretical arrival time of the next request. Requests are
+# spaced by period / limit with a burst of up to `limit`, which is equivalent to a token bucket refilled
+# continuously.
+GCRA_SCRIPT = """
+local limit = tonumber(ARGV[1])
+local period = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+local interval = period / limit
+local tat = tonumber(redis.call('GET', KEYS[1]) or now)
+if tat < now then
+    tat = now
+end
+local new_tat = tat + interval
+local allow_at = new_tat - period
+if now < allow_at then
+    return {0, 0, math.ceil(tat - now), math.ceil(allow_at - now)}
+end
+redis.call('SET', KEYS[1], string.format('%.3f', new_tat), 'PX', math.ceil(new_tat - now))
+return {1, math.floor((period - (new_tat - now)) / interval), math.ceil(new_tat - now), 0}
+"""
+
+# Hands back ARGV[4] unused tokens of a local lease, then reserves up to ARGV[3] more from the fixed window counter
+# in KEYS[1] without going over the limit. ARGV[5] is the current time in milliseconds. Returns
+# {granted, count, reset_after_ms}, the time left until the end of the window.
+LEASE_SCRIPT = """
+local limit = tonumber(ARGV[1])
+local period = tonumber(ARGV[2])
+local requested = tonumber(ARGV[3])
+local returned = tonumber(ARGV[4])
+local reset_after = period - tonumber(ARGV[5]) % period
+local count = tonumber(redis.call('GET', KEYS[1]) or '0')
+if returned > 0 and count > 0 then
+    count = redis.call('DECRBY', KEYS[1], math.min(returned, count))
+end
+local granted = math.max(0, math.min(requested, limit - count))
+if granted > 0 then
+    count = redis.call('INCRBY', KEYS[1], granted)
+end
+if redis.call('PTTL', KEYS[1]) == -1 then
+    redis.call('PEXPIRE', KEYS[1], reset_after)
+end
+return {granted, count, reset_after}
+"""
+
+SCRIPTS = {
+    RateLimitAlgorithm.FIXED_WINDOW: FIXED_WINDOW_SCRIPT,
+    RateLimitAlgorithm.SLIDING_WINDOW: SLIDING_WINDOW_SCRIPT,
+    RateLimitAlgorithm.GCRA: GCRA_SCRIPT,
+}
+
+
+@dataclass(frozen=True, slots=True)
+class RateLimitResult:
+    allowed: bool
+    limit: int
+    remaining: int
+    reset_after: float
+    retry_after: float
+
+    def headers(self) -> dict[str, str]:
+        headers = {
+            "X-RateLimit-Limit": str(self.limit),
+            "X-RateLimit-Remaining": str(self.remaining),
+            "X-RateLimit-Reset": str(math.ceil(self.reset_after)),
+        }
+        if not self.allowed:
+            headers["Retry-After"] = str(max(1, math.ceil(self.retry_after)))
+        return headers
+
+
+@dataclass(slots=True)
+class _Lease:
+    key: str
+    limit: int
+    period_ms: int
+    tokens: int = 0
+    remaining: int = 0
+    expires_at: float = 0.0
+    exhausted_at: float | None = None
+    used: bool = False
+
+
+class RateLimitLease:
+    """Approximate fixed window limiting from quota leased to this process.
+
+    Instead of one round trip per request, a worker reserves a share of a window's quota in Redis (a lease of
+    `ceil(limit * fraction)` tokens) and hands it out from memory, going back to Redis only when the lease runs out.
+    Every `sync_interval` seconds, the tokens of leases that were not used since the previous sync are handed back
+    in a single pipeline so other workers can use them.
+
+    Since tokens are reserved before being handed out, a window never admits more than `limit` requests. The error
+    is on the other side: with `n` workers, up to `(n - 1) * ceil(limit * fraction)` requests can be rejected while
+    other workers still hold unused tokens, for at most `sync_interval` seconds. Limits below `min_limit` are not
+    worth leasing and are always checked exactly.
+
+    Parameters
+    ----------
+    client: Redis
+        The rate limiter Redis client.
+    fraction: float
+        Share of a window's limit leased at once, which bounds the error.
+    sync_interval: float
+        Seconds between reconciliations with Redis.
+    min_limit: int
+        Smallest limit for which quota is leased.
+    """
+
+    def __init__(
+        self, client: Redis, fraction: float = 0.05, sync_interval: float = 0.25, min_limit: int = 100
+    ) -> None:
+        self.client = client
+        self.script = client.register_script(LEASE_SCRIPT)
+        self.fraction = fraction
+        self.sync_interval = sync_interval
+        self.min_limit = min_limit
+        self.leases: dict[str, _Lease] = {}
+        self._task: asyncio.Task | None = None
+
+    def applies_to(self, limit: int) -> bool:
+        return limit >= self.min_limit
+
+    async def check(self, key: str, limit: int, period_ms: int, now_ms: int | None = None) -> RateLimitResult:
+        now = time.monotonic()
+        lease = self.leases.get(key)
+        if lease is None or now >= lease.expires_at:
+            lease = self.leases[key] = _Lease(key=key, limit=limit, period_ms=period_ms)
+
+        if lease.tokens == 0 and (lease.exhausted_at is None or now - lease.exhausted_at >= self.sync_interval):
+            # out of tokens: lease more, or learn the window is exhausted and reject locally for a sync interval
+            size = max(1, math.ceil(limit * self.fraction))
+            if now_ms is None:
+                now_ms = int(time.time() * 1000)
+            granted, count, reset_after_ms = await self.script(keys=[key], args=[limit, period_ms, size, 0, now_ms])
+            rate_limit_checks.inc("redis")
+            lease.tokens += int(granted)
+            lease.remaining = limit - int(count)
+            # the lease ends with the window it was taken from
+            lease.expires_at = now + int(reset_after_ms) / 1000
+            lease.exhausted_at = None if granted else now
+        else:
+            rate_limit_checks.inc("local")
+
+        reset_after = max(0.0, lease.expires_at - now)
+        if lease.tokens == 0:
+            return RateLimitResult(False, limit, 0, reset_after, min(reset_after, self.sync_interval))
+
+        lease.tokens -= 1
+        lease.used = True
+        return RateLimitResult(True, limit, lease.remaining + lease.tokens, reset_after, 0)
+
+    async def sync(self, release_all: bool = False) -> None:
+        """Drop leases of past windows and hand back, in one pipeline, the tokens of leases left idle."""
+        now = time.monotonic()
+        for key in [key for key, lease in self.leases.items() if now >= lease.expires_at]:
+            del self.leases[key]
+
+        idle = [lease for lease in self.leases.values() if lease.tokens > 0 and (release_all or not lease.used)]
+        if idle:
+            now_ms = int(time.time() * 1000)
+            async with self.client.pipeline(transaction=False) as pipe:
+                for lease in idle:
+                    await self.script(
+                        keys=[lease.key], args=[lease.limit, lease.period_ms, 0, lease.tokens, now_ms], client=pipe
+                    )
+                results = await pipe.execute()
+
+            for lease, (_, count, _) in zip(idle, results):
+                lease.tokens = 0
+                lease.remaining = lease.limit - int(count)
+
+        for lease in self.leases.values():
+            lease.used = False
+
+    async def _sync_forever(self) -> None:
+        while True:
+            await asyncio.sleep(self.sync_interval)
+            try:
+                await self.sync()
+            except Exception as e:
+                logger.warning(f"Error reconciling rate limit leases: {e}")
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._sync_forever())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+        try:
+            await self.sync(release_all=True)
+        except Exception as e:
+            logger.warning(f"Error releasing rate limit leases: {e}")
+
 
 class RateLimiter:
     _instance: Optional["RateLimiter"] = None
-    pool: Optional[ConnectionPool] = None
-    client: Optional[Redis] = None
+    pool: ConnectionPool | None = None
+    client: Redis | None = None
+    scripts: dict[RateLimitAlgorithm, Any] = {}
+    lease: RateLimitLease | None = None
 
     def __new__(cls) -> "RateLimiter":
         if cls._instance is None:
@@ -26,6 +276,9 @@ class RateLimiter:
         if instance.pool is None:
             instance.pool = ConnectionPool.from_url(redis_url)
             instance.client = Redis(connection_pool=instance.pool)
+            instance.scripts = {
+                algorithm: instance.client.register_script(script) for algorithm, script in SCRIPTS.items()
+            }
 
     @classmethod
     def get_client(cls) -> Redis:
@@ -35,27 +288,93 @@ class RateLimiter:
             raise Exception("Redis client is not initialized.")
         return instance.client
 
-    async def is_rate_limited(self, db: AsyncSession, user_id: int, path: str, limit: int, period: int) -> bool:
-        client = self.get_client()
-        current_timestamp = int(datetime.now(UTC).timestamp())
-        window_start = current_timestamp - (current_timestamp % period)
+    @classmethod
+    def start_leasing(cls, fraction: float, sync_interval: float, min_limit: int) -> None:
+        """Serve fixed window limits of at least `min_limit` from local leases, see `RateLimitLease`."""
+        instance = cls()
+        if instance.lease is None:
+            instance.lease = RateLimitLease(instance.get_client(), fraction, sync_interval, min_limit)
+            instance.lease.start()
+
+    @classmethod
+    async def stop_leasing(cls) -> None:
+        instance = cls()
+        if instance.lease is not None:
+            await instance.lease.stop()
+            instance.lease = None
+
+    async def check(
+        self,
+        user_id: int | str,
+        path: str,
+        limit: int,
+        period: int,
+        algorithm: RateLimitAlgorithm = RateLimitAlgorithm.FIXED_WINDOW,
+    ) -> RateLimitResult:
+        """Count a request against a policy in a single round trip.
+
+        Parameters
+        ----------
+        user_id: int | str
+            The user ID, or client address for anonymous requests.
+        path: str
+            The request path, sanitized before being used in the key.
+        limit: int
+            Requests allowed per period.
+        period: int
+            The period in seconds.
+        algorithm: RateLimitAlgorithm
+            Fixed window, sliding window counter or GCRA.
 
-        sanitized_path = sanitize_path(path)
-        key = f"ratelimit:{user_id}:{sanitized_path}:{window_start}"
+        Returns
+        -------
+        RateLimitResult
+            Whether the request is allowed, the remaining quota and when it resets.
+        """
+        self.get_client()
+        now_ms = int(time.time() * 1000)
+        period_ms = period * 1000
+        base_key = f"ratelimit:{user_id}:{sanitize_path(path)}"
+
+        if algorithm == RateLimitAlgorithm.GCRA:
+            keys = [f"{base_key}:gcra"]
+        else:
+            window_start = now_ms // period_ms * period
+            keys = [f"{base_key}:{window_start}"]
+            if algorithm == RateLimitAlgorithm.SLIDING_WINDOW:
+                keys.append(f"{base_key}:{window_start - period}")
 
         try:
-            current_count = await client.incr(key)
-            if current_count == 1:
-                await client.expire(key, period)
+            if algorithm == RateLimitAlgorithm.FIXED_WINDOW and self.lease is not None and self.lease.applies_to(limit):
+                return await self.lease.check(keys[0], limit, period_ms, now_ms)
 
-            if current_count > limit:
-                return True
+            allowed, remaining, reset_after_ms, retry_after_ms = await self.scripts[algorithm](
+                keys=keys, args=[limit, period_ms, now_ms]
+            )
+            rate_limit_checks.inc("redis")
 
         except Exception as e:
             logger.exception(f"Error checking rate limit for user {user_id} on path {path}: {e}")
             raise e
 
-        return False
+        return RateLimitResult(
+            allowed=bool(allowed),
+            limit=limit,
+            remaining=max(0, int(remaining)),
+            reset_after=int(reset_after_ms) / 1000,
+            retry_after=int(retry_after_ms) / 1000,
+        )
+
+    async def is_rate_limited(
+        self,
+        user_id: int | str,
+        path: str,
+        limit: int,
+        period: int,
+        algorithm: RateLimitAlgorithm = RateLimitAlgorithm.FIXED_WINDOW,
+    ) -> bool:
+        result = await self.check(user_id=user_id, path=path, limit=limit, period=period, algorithm=algorithm)
+        return not result.allowed
 
 
 rate_limiter = RateLimiter()
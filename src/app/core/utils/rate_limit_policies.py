@@ -0,0 +1,129 @@
+from collections import OrderedDict
+from dataclasses import dataclass
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ...core.config import settings
+from ...core.logger import logging
+from ...models.concurrency_limit import ConcurrencyLimit
+from ...models.rate_limit import RateLimit
+from ...models.tier import Tier
+from ...schemas.rate_limit import RateLimitAlgorithm
+from ..db.database import local_session
+from . import pubsub
+
+logger = logging.getLogger(__name__)
+
+POLICY_CHANNEL = "ratelimit:policies"
+MAX_SUBJECTS = 10000
+
+
+@dataclass(frozen=True, slots=True)
+class RateLimitPolicy:
+    limit: int
+    period: int
+    algorithm: RateLimitAlgorithm = RateLimitAlgorithm.FIXED_WINDOW
+
+
+DEFAULT_POLICY = RateLimitPolicy(
+    limit=settings.DEFAULT_RATE_LIMIT_LIMIT,
+    period=settings.DEFAULT_RATE_LIMIT_PERIOD,
+    algorithm=RateLimitAlgorithm(settings.DEFAULT_RATE_LIMIT_ALGORITHM),
+)
+
+
+@dataclass(frozen=True, slots=True)
+class ConcurrencyPolicy:
+    max_concurrent: int
+    queue_timeout: float = 0.0
+
+
+DEFAULT_CONCURRENCY_POLICY = ConcurrencyPolicy(
+    max_concurrent=settings.DEFAULT_CONCURRENCY_LIMIT, queue_timeout=settings.DEFAULT_CONCURRENCY_QUEUE_TIMEOUT
+)
+
+
+class RateLimitPolicyTable:
+    """In-process copy of every tier, rate limit and concurrency limit, indexed by `(tier_id, path)`.
+
+    Rate-limit checks read from it without touching the database. The table is loaded at startup and reloaded in
+    every worker when a tier or limit changes, through a message on `POLICY_CHANNEL`.
+    """
+
+    def __init__(self) -> None:
+        self.tiers: dict[int, str] = {}
+        self.policies: dict[tuple[int, str], RateLimitPolicy] = {}
+        self.concurrency: dict[tuple[int, str], ConcurrencyPolicy] = {}
+        # token subject -> (user id, tier id), learned from authenticated requests so the middleware can pick a
+        # user's policy from the token alone
+        self.subjects: OrderedDict[str, tuple[int, int | None]] = OrderedDict()
+
+    async def load(self, db: AsyncSession) -> None:
+        tiers = await db.execute(select(Tier.id, Tier.name))
+        rate_limits = await db.execute(
+            select(RateLimit.tier_id, RateLimit.path, RateLimit.limit, RateLimit.period, RateLimit.algorithm)
+        )
+        concurrency_limits = await db.execute(
+            select(
+                ConcurrencyLimit.tier_id,
+                ConcurrencyLimit.path,
+                ConcurrencyLimit.max_concurrent,
+                ConcurrencyLimit.queue_timeout,
+            )
+        )
+
+        # build new dicts and swap them in, so readers never see a half-loaded table
+        self.tiers = {row[0]: row[1] for row in tiers.all()}
+        self.policies = {
+            (tier_id, path): RateLimitPolicy(limit=limit, period=period, algorithm=RateLimitAlgorithm(algorithm))
+            for tier_id, path, limit, period, algorithm in rate_limits.all()
+        }
+        self.concurrency = {
+            (tier_id, path): ConcurrencyPolicy(max_concurrent=max_concurrent, queue_timeout=queue_timeout)
+            for tier_id, path, max_concurrent, queue_timeout in concurrency_limits.all()
+        }
+        logger.info(
+            f"Loaded {len(self.policies)} rate limit and {len(self.concurrency)} concurrency limit policies "
+            f"for {len(self.tiers)} tiers"
+        )
+
+    async def reload(self, message: str | None = None) -> None:
+        async with local_session() as db:
+            await self.load(db)
+
+    def tier_name(self, tier_id: int) -> str | None:
+        return self.tiers.get(tier_id)
+
+    def get(self, tier_id: int, path: str) -> RateLimitPolicy | None:
+        return self.policies.get((tier_id, path))
+
+    def resolve(self, tier_id: int | None, path: str) -> RateLimitPolicy:
+        """The policy of `tier_id` for `path`, falling back to the default policy."""
+        if tier_id is None:
+            return DEFAULT_POLICY
+        return self.policies.get((tier_id, path), DEFAULT_POLICY)
+
+    def resolve_concurrency(self, tier_id: int | None, path: str) -> ConcurrencyPolicy:
+        """The concurrency policy of `tier_id` for `path`, falling back to the default policy."""
+        if tier_id is None:
+            return DEFAULT_CONCURRENCY_POLICY
+        return self.concurrency.get((tier_id, path), DEFAULT_CONCURRENCY_POLICY)
+
+    def remember_subject(self, subject: str, user_id: int, tier_id: int | None) -> None:
+        self.subjects[subject] = (user_id, tier_id)
+        self.subjects.move_to_end(subject)
+        if len(self.subjects) > MAX_SUBJECTS:
+            self.subjects.popitem(last=False)
+
+    def subject(self, subject: str) -> tuple[int, int | None] | None:
+        return self.subjects.get(subject)
+
+
+policy_table = RateLimitPolicyTable()
+pubsub.subscribe(POLICY_CHANNEL, policy_table.reload)
+
+
+async def publish_policy_change() -> None:
+    """Reload the policy table in every worker after a tier or rate limit was written."""
+    await pubsub.publish(POLICY_CHANNEL)
@@ -0,0 +1,165 @@
+import hashlib
+import math
+import time
+from collections.abc import Iterator
+from datetime import datetime
+from typing import Any
+
+from redis.asyncio import Redis
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ...core.config import settings
+from ...core.logger import logging
+from ..db.crud_token_blacklist import crud_token_blacklist
+from ..db.database import local_session
+from ..db.token_blacklist import TokenBlacklist
+from . import pubsub
+from .metrics import registry
+
+logger = logging.getLogger(__name__)
+
+REVOCATION_CHANNEL = "auth:revocations"
+# sorted set of revoked token ids, scored by the token's expiry timestamp
+REVOKED_KEY = "auth:revoked"
+
+revocation_checks = registry.counter(
+    "token_revocation_checks_total", "Token revocation checks, by where they were answered.", ("source",)
+)
+
+
+def token_id(token: str, payload: dict[str, Any]) -> str:
+    """The `jti` claim of a token, or a digest of the token for those issued before tokens carried one."""
+    return str(payload.get("jti") or hashlib.sha256(token.encode()).hexdigest())
+
+
+class BloomFilter:
+    """Set membership with no false negatives and a false positive rate of `error_rate` up to `capacity` items.
+
+    Parameters
+    ----------
+    capacity: int
+        Number of items the filter is sized for.
+    error_rate: float
+        False positive rate once `capacity` items were added.
+    """
+
+    def __init__(self, capacity: int, error_rate: float) -> None:
+        self.size = max(8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, item: str) -> Iterator[int]:
+        # double hashing, every position derived from the two halves of a single digest
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], "little")
+        second = int.from_bytes(digest[8:], "little") | 1
+        for i in range(self.hashes):
+            yield (first + i * second) % self.size
+
+    def add(self, item: str) -> None:
+        for position in self._positions(item):
+            self.bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, item: str) -> bool:
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(item))
+
+
+class TokenRevocationCache:
+    """Answers whether a token was revoked, without a database query for the tokens that weren't.
+
+    Revoked token ids (see `token_id`) are held in an in-process bloom filter, and in a Redis sorted set scored by
+    the token's expiry so entries drop out once the token could no longer be used anyway. A token missing from the
+    bloom filter was never revoked, which is the answer for almost every request and costs no round trip. A hit is
+    confirmed in Redis, and only falls through to the `token_blacklist` table (which stays the durable record) for
+    bloom filter false positives or when Redis is unreachable.
+
+    Revocations are added to the bloom filter of every worker through a message on `REVOCATION_CHANNEL`, and the
+    filter is rebuilt from the database on startup and whenever the pub/sub listener reconnects. Until it is first
+    loaded, every check goes to the database.
+
+    Parameters
+    ----------
+    capacity: int
+        Revoked, unexpired tokens the bloom filter is sized for. It is sized for more when more are loaded.
+    error_rate: float
+        Bloom filter false positive rate, the fraction of valid tokens checked in Redis.
+    """
+
+    def __init__(self, capacity: int = 100000, error_rate: float = 0.001) -> None:
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.bloom: BloomFilter | None = None
+        self.client: Redis | None = None
+
+    def initialize(self, client: Redis) -> None:
+        self.client = client
+
+    async def load(self, db: AsyncSession) -> None:
+        rows = (
+            await db.execute(
+                select(TokenBlacklist.jti, TokenBlacklist.expires_at).where(TokenBlacklist.expires_at > datetime.now())
+            )
+        ).all()
+        revoked = {jti: expires_at.timestamp() for jti, expires_at in rows}
+
+        bloom = BloomFilter(max(self.capacity, 2 * len(revoked)), self.error_rate)
+        for revoked_id in revoked:
+            bloom.add(revoked_id)
+        self.bloom = bloom
+
+        if self.client is not None and revoked:
+            try:
+                await self.client.zadd(REVOKED_KEY, revoked)
+            except Exception as e:
+                logger.warning(f"Could not restore revoked tokens in Redis: {e}")
+
+        logger.info(f"Loaded {len(revoked)} revoked tokens")
+
+    async def reload(self, message: str | None = None) -> None:
+        if message:
+            if self.bloom is not None:
+                self.bloom.add(message)
+            return
+
+        async with local_session() as db:
+            await self.load(db)
+
+    async def revoke(self, jti: str, expires_at: float) -> None:
+        """Record a token id, already written to `token_blacklist`, as revoked until `expires_at` (a timestamp)."""
+        if self.bloom is not None:
+            self.bloom.add(jti)
+
+        if self.client is not None:
+            try:
+                async with self.client.pipeline(transaction=False) as pipe:
+                    pipe.zadd(REVOKED_KEY, {jti: expires_at})
+                    pipe.zremrangebyscore(REVOKED_KEY, "-inf", time.time())
+                    await pipe.execute()
+            except Exception as e:
+                logger.warning(f"Could not store revoked token in Redis: {e}")
+
+        await pubsub.publish(REVOCATION_CHANNEL, jti)
+
+    async def is_revoked(self, jti: str, db: AsyncSession) -> bool:
+        if self.bloom is not None and jti not in self.bloom:
+            revocation_checks.inc("bloom")
+            return False
+
+        if self.client is not None:
+            try:
+                expires_at = await self.client.zscore(REVOKED_KEY, jti)
+                if expires_at is not None and expires_at > time.time():
+                    revocation_checks.inc("redis")
+                    return True
+            except Exception as e:
+                logger.warning(f"Could not check revoked tokens in Redis, checking the database: {e}")
+
+        revocation_checks.inc("database")
+        return await crud_token_blacklist.exists(db, jti=jti)
+
+
+token_revocations = TokenRevocationCache(
+    capacity=settings.TOKEN_REVOCATION_BLOOM_CAPACITY, error_rate=settings.TOKEN_REVOCATION_BLOOM_ERROR_RATE
+)
+pubsub.subscribe(REVOCATION_CHANNEL, token_revocations.reload)
@@ -1,8 +1,29 @@
 import asyncio
 import logging
+from datetime import datetime
+from typing import Any, cast
 
+import redis.asyncio as redis
 import uvloop
 from arq.worker import Worker
+from fastcrud.paginated import compute_offset, paginated_response
+from sqlalchemy import delete, func, select
+
+from ...api.v1.posts import (
+    POST_CACHE_EXPIRATION,
+    POST_CACHE_KEY_PREFIX,
+    POSTS_CACHE_EXPIRATION,
+    POSTS_CACHE_KEY_PREFIX,
+    POSTS_CACHE_NAMESPACES,
+)
+from ...crud.crud_posts import crud_posts
+from ...models.post import Post
+from ...models.user import User
+from ...schemas.post import PostRead
+from ..config import settings
+from ..db.database import local_session
+from ..db.token_blacklist import TokenBlacklist
+from ..utils import cache
 
 asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
 
@@ -15,10 +36,109 @@ async def sample_background_task(ctx: Worker, name: str) -> str:
     return f"Task {name} is complete!"
 
 
+async def warm_cache(ctx: Worker, max_users: int | None = None, pages: int | None = None) -> dict[str, int]:
+    """Pre-populate the post caches of the most active users.
+
+    Users are visited one at a time on a single session with a pause between them, so warming never holds more
+    than one database connection and its query rate is bounded by `CACHE_WARMING_DELAY_SECONDS`.
+    """
+    max_users = max_users if max_users is not None else settings.CACHE_WARMING_MAX_USERS
+    pages = pages if pages is not None else settings.CACHE_WARMING_PAGES
+    items_per_page = settings.CACHE_WARMING_ITEMS_PER_PAGE
+
+    warmed = {"users": 0, "pages": 0, "posts": 0}
+    async with local_session() as db:
+        most_active = await db.execute(
+            select(User.id, User.username)
+            .join(Post, Post.created_by_user_id == User.id)
+            .where(User.is_deleted.is_(False), Post.is_deleted.is_(False))
+            .group_by(User.id, User.username)
+            .order_by(func.count(Post.id).desc())
+            .limit(max_users)
+        )
+
+        for user_id, username in most_active.all():
+            for page in range(1, pages + 1):
+                posts_data = cast(
+                    dict[str, Any],
+                    await crud_posts.get_multi(
+                        db=db,
+                        offset=compute_offset(page, items_per_page),
+                        limit=items_per_page,
+                        schema_to_select=PostRead,
+                        return_as_model=False,
+                        created_by_user_id=user_id,
+                        is_deleted=False,
+                    ),
+                )
+                # the arguments `read_posts` gets for a page number, without a cursor
+                kwargs: dict[str, Any] = {
+                    "username": username,
+                    "page": page,
+                    "items_per_page": items_per_page,
+                    "cursor": None,
+                }
+                response = paginated_response(crud_data=posts_data, page=page, items_per_page=items_per_page)
+                await cache.set_cache_entry(
+                    POSTS_CACHE_KEY_PREFIX,
+                    await cache.resolve_cache_key(POSTS_CACHE_KEY_PREFIX, username, kwargs, POSTS_CACHE_NAMESPACES),
+                    response,
+                    POSTS_CACHE_EXPIRATION,
+                )
+                warmed["pages"] += 1
+
+                for post in posts_data["data"]:
+                    post_key = await cache.resolve_cache_key(
+                        POST_CACHE_KEY_PREFIX, post["id"], kwargs, POSTS_CACHE_NAMESPACES
+                    )
+                    await cache.set_cache_entry(POST_CACHE_KEY_PREFIX, post_key, post, POST_CACHE_EXPIRATION)
+                    warmed["posts"] += 1
+
+                if not response["has_more"]:
+                    break
+
+            warmed["users"] += 1
+            await asyncio.sleep(settings.CACHE_WARMING_DELAY_SECONDS)
+
+    logging.info(f"Cache warmed: {warmed}")
+    return warmed
+
+
+async def purge_token_blacklist(ctx: Worker) -> int:
+    """Delete blacklisted tokens that expired, which could no longer be used anyway.
+
+    Rows are deleted in batches of `TOKEN_BLACKLIST_PURGE_BATCH_SIZE`, each in its own transaction, so the purge
+    never holds locks on a large part of the table.
+    """
+    batch_size = settings.TOKEN_BLACKLIST_PURGE_BATCH_SIZE
+
+    purged = 0
+    async with local_session() as db:
+        while True:
+            expired = (
+                select(TokenBlacklist.id).where(TokenBlacklist.expires_at < datetime.now()).limit(batch_size)
+            ).scalar_subquery()
+            result = await db.execute(delete(TokenBlacklist).where(TokenBlacklist.id.in_(expired)))
+            await db.commit()
+
+            purged += result.rowcount
+            if result.rowcount < batch_size:
+                break
+
+            await asyncio.sleep(0)
+
+    logging.info(f"Purged {purged} expired blacklisted tokens")
+    return purged
+
+
 # -------- base functions --------
 async def startup(ctx: Worker) -> None:
+    cache.pool = redis.ConnectionPool.from_url(settings.REDIS_CACHE_URL)
+    cache.client = redis.Redis.from_pool(cache.pool)  # type: ignore
     logging.info("Worker Started")
 
 
 async def shutdown(ctx: Worker) -> None:
+    if cache.client is not None:
+        await cache.client.aclose()  # type: ignore
     logging.info("Worker end")
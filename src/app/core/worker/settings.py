@@ -1,14 +1,20 @@
+from typing import cast
+
+from arq import cron
 from arq.connections import RedisSettings
+from arq.typing import WorkerCoroutine
 
 from ...core.config import settings
-from .functions import sample_background_task, shutdown, startup
+from .functions import purge_token_blacklist, sample_background_task, shutdown, startup, warm_cache
 
 REDIS_QUEUE_HOST = settings.REDIS_QUEUE_HOST
 REDIS_QUEUE_PORT = settings.REDIS_QUEUE_PORT
 
 
 class WorkerSettings:
-    functions = [sample_background_task]
+    functions = [sample_background_task, warm_cache]
+    # arq calls cron jobs with the worker context alone, which its WorkerCoroutine protocol can't express
+    cron_jobs = [cron(cast(WorkerCoroutine, purge_token_blacklist), minute=0)]
     redis_settings = RedisSettings(host=REDIS_QUEUE_HOST, port=REDIS_QUEUE_PORT)
     on_startup = startup
     on_shutdown = shutdown
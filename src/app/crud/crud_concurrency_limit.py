@@ -0,0 +1,20 @@
+from fastcrud import FastCRUD
+
+from ..models.concurrency_limit import ConcurrencyLimit
+from ..schemas.concurrency_limit import (
+    ConcurrencyLimitCreateInternal,
+    ConcurrencyLimitDelete,
+    ConcurrencyLimitRead,
+    ConcurrencyLimitUpdate,
+    ConcurrencyLimitUpdateInternal,
+)
+
+CRUDConcurrencyLimit = FastCRUD[
+    ConcurrencyLimit,
+    ConcurrencyLimitCreateInternal,
+    ConcurrencyLimitUpdate,
+    ConcurrencyLimitUpdateInternal,
+    ConcurrencyLimitDelete,
+    ConcurrencyLimitRead,
+]
+crud_concurrency_limits = CRUDConcurrencyLimit(ConcurrencyLimit)
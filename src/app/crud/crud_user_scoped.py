@@ -0,0 +1,176 @@
+from typing import Any, cast
+
+from pydantic import BaseModel
+from sqlalchemy import Label, RowMapping, and_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..core.utils.principal_cache import principal_cache
+from ..models.post import Post
+from ..models.rate_limit import RateLimit
+from ..models.tier import Tier
+from ..models.user import User
+from ..schemas.post import PostRead
+from ..schemas.tier import TierRead
+from ..schemas.user import UserPrincipal, UserRead
+from .crud_posts import crud_posts
+from .crud_tier import crud_tiers
+from .crud_users import crud_users
+
+# queries of the resources under /{username}/..., in one statement: a cached username costs no query, and an
+# uncached one is resolved by joining the user with what was asked for
+RATE_LIMIT_COLUMNS = tuple(RateLimit.__table__.columns.keys())
+
+
+def _labelled(model: Any, fields: Any, prefix: str) -> list[Label]:
+    # "__" keeps the joined columns apart from the user's, whose "tier_id" would read as the tier's "id"
+    return [getattr(model, field).label(f"{prefix}__{field}") for field in fields]
+
+
+def _unlabelled(row: RowMapping, fields: Any, prefix: str) -> dict[str, Any] | None:
+    # a left join without a match leaves every joined column null
+    if row[f"{prefix}__id"] is None:
+        return None
+    return {field: row[f"{prefix}__{field}"] for field in fields}
+
+
+def _fields(row: RowMapping, schema: type[BaseModel]) -> dict[str, Any]:
+    return {field: row[field] for field in schema.model_fields}
+
+
+async def resolve_user(db: AsyncSession, username: str) -> dict[str, Any] | None:
+    """The `UserPrincipal` of the undeleted user called `username`, from the principal cache when possible."""
+    user = await principal_cache.get(username)
+    if user is not None:
+        return user
+
+    user = cast(
+        dict[str, Any] | None,
+        await crud_users.get(db=db, username=username, is_deleted=False, schema_to_select=UserPrincipal),
+    )
+    if user is not None:
+        await principal_cache.set(username, user)
+    return user
+
+
+async def get_user_post(
+    db: AsyncSession, username: str, id: int
+) -> tuple[dict[str, Any] | None, dict[str, Any] | None]:
+    """The principal of the undeleted user called `username`, and their undeleted post `id` as a `PostRead`.
+
+    Either is None when it wasn't found.
+    """
+    user = await principal_cache.get(username)
+    if user is not None:
+        post = await crud_posts.get(
+            db=db, id=id, created_by_user_id=user["id"], is_deleted=False, schema_to_select=PostRead
+        )
+        return user, cast(dict[str, Any] | None, post)
+
+    stmt = await crud_users.select(schema_to_select=UserPrincipal, username=username, is_deleted=False)
+    stmt = stmt.outerjoin(
+        Post, and_(Post.created_by_user_id == User.id, Post.id == id, Post.is_deleted.is_(False))
+    ).add_columns(*_labelled(Post, PostRead.model_fields, "post"))
+    row = (await db.execute(stmt)).mappings().first()
+    if row is None:
+        return None, None
+
+    user = _fields(row, UserPrincipal)
+    await principal_cache.set(username, user)
+    return user, _unlabelled(row, PostRead.model_fields, "post")
+
+
+async def get_user_posts(
+    db: AsyncSession, username: str, offset: int, limit: int
+) -> tuple[dict[str, Any] | None, list[dict[str, Any]]]:
+    """The principal of the undeleted user called `username`, and a page of their undeleted posts as `PostRead`s.
+
+    The user is None when they weren't found. A page past the last post of an uncached user takes a second query,
+    to tell it apart from a missing user.
+    """
+    user = await principal_cache.get(username)
+    if user is not None:
+        page = await crud_posts.get_multi(
+            db=db,
+            offset=offset,
+            limit=limit,
+            schema_to_select=PostRead,
+            return_total_count=False,
+            created_by_user_id=user["id"],
+            is_deleted=False,
+        )
+        return user, cast(list[dict[str, Any]], page["data"])
+
+    stmt = await crud_users.select(schema_to_select=UserPrincipal, username=username, is_deleted=False)
+    stmt = (
+        stmt.outerjoin(Post, and_(Post.created_by_user_id == User.id, Post.is_deleted.is_(False)))
+        .add_columns(*_labelled(Post, PostRead.model_fields, "post"))
+        .offset(offset)
+        .limit(limit)
+    )
+    rows = (await db.execute(stmt)).mappings().all()
+    if not rows:
+        return await resolve_user(db, username), []
+
+    user = _fields(rows[0], UserPrincipal)
+    await principal_cache.set(username, user)
+    posts = [_unlabelled(row, PostRead.model_fields, "post") for row in rows]
+    return user, [post for post in posts if post is not None]
+
+
+async def get_user_tier(db: AsyncSession, username: str) -> tuple[dict[str, Any] | None, dict[str, Any] | None]:
+    """The user called `username` as a `UserRead`, deleted or not, and their tier as a `TierRead`.
+
+    Either is None when it wasn't found, or the user has no tier.
+    """
+    user = await principal_cache.get(username)
+    if user is not None:
+        user = {field: user[field] for field in UserRead.model_fields}
+        if user["tier_id"] is None:
+            return user, None
+        tier = await crud_tiers.get(db=db, id=user["tier_id"], schema_to_select=TierRead)
+        return user, cast(dict[str, Any] | None, tier)
+
+    stmt = await crud_users.select(schema_to_select=UserRead, username=username)
+    stmt = stmt.outerjoin(Tier, Tier.id == User.tier_id).add_columns(*_labelled(Tier, TierRead.model_fields, "tier"))
+    row = (await db.execute(stmt)).mappings().first()
+    if row is None:
+        return None, None
+
+    return _fields(row, UserRead), _unlabelled(row, TierRead.model_fields, "tier")
+
+
+async def get_user_rate_limits(
+    db: AsyncSession, username: str
+) -> tuple[dict[str, Any] | None, dict[str, Any] | None, list[dict[str, Any]]]:
+    """The user called `username` as a `UserRead`, deleted or not, their tier as a `TierRead`, and its rate limits.
+
+    The user or the tier is None when it wasn't found, or the user has no tier.
+    """
+    rate_limit_columns = _labelled(RateLimit, RATE_LIMIT_COLUMNS, "rate_limit")
+    tier: dict[str, Any] | None
+    user = await principal_cache.get(username)
+    if user is not None:
+        user = {field: user[field] for field in UserRead.model_fields}
+        if user["tier_id"] is None:
+            return user, None, []
+
+        stmt = await crud_tiers.select(schema_to_select=TierRead, id=user["tier_id"])
+        stmt = stmt.outerjoin(RateLimit, RateLimit.tier_id == Tier.id).add_columns(*rate_limit_columns)
+        rows = (await db.execute(stmt)).mappings().all()
+        if not rows:
+            return user, None, []
+        tier = _fields(rows[0], TierRead)
+    else:
+        stmt = await crud_users.select(schema_to_select=UserRead, username=username)
+        stmt = (
+            stmt.outerjoin(Tier, Tier.id == User.tier_id)
+            .outerjoin(RateLimit, RateLimit.tier_id == Tier.id)
+            .add_columns(*_labelled(Tier, TierRead.model_fields, "tier"), *rate_limit_columns)
+        )
+        rows = (await db.execute(stmt)).mappings().all()
+        if not rows:
+            return None, None, []
+        user, tier = _fields(rows[0], UserRead), _unlabelled(rows[0], TierRead.model_fields, "tier")
+
+    rate_limits = [_unlabelled(row, RATE_LIMIT_COLUMNS, "rate_limit") for row in rows]
+    return user, tier, [rate_limit for rate_limit in rate_limits if rate_limit is not None]
@@ -1,7 +1,7 @@
 from fastcrud import FastCRUD
 
 from ..models.user import User
-from ..schemas.user import UserCreateInternal, UserDelete, UserRead, UserUpdate, UserUpdateInternal
+from ..schemas.user import UserCreateInternal, UserDelete, UserPrincipal, UserRead, UserUpdate, UserUpdateInternal
 
-CRUDUser = FastCRUD[User, UserCreateInternal, UserUpdate, UserUpdateInternal, UserDelete, UserRead]
+CRUDUser = FastCRUD[User, UserCreateInternal, UserUpdate, UserUpdateInternal, UserDelete, UserRead | UserPrincipal]
 crud_users = CRUDUser(User)
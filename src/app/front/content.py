@@ -0,0 +1,96 @@
+import hashlib
+import os
+import time
+from dataclasses import dataclass, field
+from typing import Any
+
+import anyio
+import markdown
+
+from ..core.config import settings
+
+RESOURCES_PATH = "./src/app/resources"
+CONTENT_PATH = "app/content/"
+
+MARKDOWN_EXTENSIONS = ["meta", "tables"]
+
+
+@dataclass
+class RenderedPage:
+    html: str
+    metadata: dict[str, Any]
+    mtime_ns: int
+    size: int
+    digest: str
+    checked_at: float = field(default_factory=time.monotonic)
+
+
+def _render_file(path: str, cached: RenderedPage | None) -> RenderedPage | None:
+    """Render `path` unless it is unchanged since `cached` was built. Runs in a worker thread."""
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+
+    if cached is not None and cached.mtime_ns == stat.st_mtime_ns and cached.size == stat.st_size:
+        cached.checked_at = time.monotonic()
+        return cached
+
+    with open(path, "rb") as f:
+        raw = f.read()
+
+    digest = hashlib.blake2b(raw, digest_size=16).hexdigest()
+    if cached is not None and cached.digest == digest:
+        # touched but not edited, keep the rendered html
+        return RenderedPage(cached.html, cached.metadata, stat.st_mtime_ns, stat.st_size, digest)
+
+    md = markdown.Markdown(extensions=MARKDOWN_EXTENSIONS)
+    html = md.convert(raw.decode())
+    return RenderedPage(html, md.Meta, stat.st_mtime_ns, stat.st_size, digest)  # type: ignore[attr-defined]
+
+
+class MarkdownRenderCache:
+    """In-process cache of rendered markdown pages.
+
+    Pages are rendered once and served from memory. At most once every `recheck_interval` seconds per page, the
+    file is stat'ed in a worker thread and re-rendered only if its mtime or size changed and its content hash
+    differs, so the event loop never blocks on file I/O or markdown conversion.
+
+    Parameters
+    ----------
+    recheck_interval: float
+        Seconds during which a rendered page is served without looking at the file again.
+    """
+
+    def __init__(self, recheck_interval: float = 2.0) -> None:
+        self.recheck_interval = recheck_interval
+        self.pages: dict[str, RenderedPage] = {}
+
+    async def get(self, path: str) -> RenderedPage | None:
+        cached = self.pages.get(path)
+        if cached is not None and time.monotonic() - cached.checked_at < self.recheck_interval:
+            return cached
+
+        page = await anyio.to_thread.run_sync(_render_file, path, cached)
+        if page is None:
+            self.pages.pop(path, None)
+        else:
+            self.pages[path] = page
+
+        return page
+
+    async def prerender(self, *directories: str) -> int:
+        """Render every markdown file found in `directories`, returning how many pages were rendered."""
+        rendered = 0
+        for directory in directories:
+            if not os.path.isdir(directory):
+                continue
+
+            for name in sorted(os.listdir(directory)):
+                if name.endswith(".md") and await self.get(os.path.join(directory, name)) is not None:
+                    rendered += 1
+
+        return rendered
+
+
+page_cache = MarkdownRenderCache(recheck_interval=settings.CONTENT_RECHECK_INTERVAL)
@@ -1,12 +1,13 @@
 
 import time
 import os
-import markdown
 
 from fastapi import APIRouter, Request, HTTPException
 from fastapi.responses import HTMLResponse
 from fastapi.templating import Jinja2Templates
 
+from ..content import CONTENT_PATH, page_cache
+
 templates = Jinja2Templates(directory="src/app/front/templates")
 
 router = APIRouter()
@@ -18,18 +19,14 @@ async def page(view: str, request: Request) -> HTMLResponse:
     """
     start_time = time.time()
 
-    content_path = "app/content/"
-
-    if os.path.exists(os.path.join(content_path, f"{view}.md")):
-        content = open(os.path.join(content_path, f"{view}.md")).read()
-        md = markdown.Markdown(extensions=["meta", "tables"])
-        content = md.convert(content)
+    rendered = await page_cache.get(os.path.join(CONTENT_PATH, f"{view}.md"))
+    if rendered is not None:
         response = templates.TemplateResponse(
             request=request,
             name="public/page.html",
             context={
-                "content": content,
-                "metadata": md.Meta,
+                "content": rendered.html,
+                "metadata": rendered.metadata,
                 "elapsed_time_seconds": f"{time.time() - start_time:2.3f}",
             },
         )
@@ -1,11 +1,12 @@
 import time
 import os
-import markdown
 
 from fastapi import APIRouter, Request, HTTPException
 from fastapi.responses import HTMLResponse
 from fastapi.templating import Jinja2Templates
 
+from ..content import RESOURCES_PATH, page_cache
+
 templates = Jinja2Templates(directory="src/app/front/templates")
 
 router = APIRouter()
@@ -17,16 +18,14 @@ async def main(request: Request) -> HTMLResponse:
     """
     start_time = time.time()
 
-    if os.path.exists(os.path.join("./src/app/resources", f"main.md")):
-        content = open(os.path.join("./src/app/resources", f"main.md")).read()
-        md = markdown.Markdown(extensions=["meta", "tables"])
-        content = md.convert(content)
+    rendered = await page_cache.get(os.path.join(RESOURCES_PATH, "main.md"))
+    if rendered is not None:
         response = templates.TemplateResponse(
             request=request,
             name="public/page.html",
             context={
-                "content": content,
-                "metadata": md.Meta,
+                "content": rendered.html,
+                "metadata": rendered.metadata,
                 "active_page":'main',
                 "elapsed_time_seconds": f"{time.time() - start_time:2.3f}",
             },
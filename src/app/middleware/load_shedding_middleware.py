@@ -0,0 +1,65 @@
+from starlette.responses import JSONResponse
+from starlette.routing import BaseRoute, Match
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from ..api.dependencies import bulk_request
+from ..core.security import get_token_subject
+from ..core.utils.admission import AdmissionController, admission_controller, shed_requests
+from .rate_limit_middleware import bearer_token, depends_on
+
+
+class LoadSheddingMiddleware:
+    """Pure ASGI middleware counting in-flight requests and shedding low-priority traffic under pressure.
+
+    Requests without a validly signed bearer token are anonymous and shed first, so a made-up `Authorization`
+    header doesn't exempt a request from shedding. Requests to routes depending on `bulk_request`
+    are shed next. Shed requests get a 503 with `Retry-After` before any routing or dependency runs. Traffic is
+    only classified while the controller reports pressure, so the normal path costs two integer updates.
+
+    Parameters
+    ----------
+    app: ASGIApp
+        The next ASGI application in the chain.
+    controller: AdmissionController, optional
+        The admission controller. Defaults to the process-wide one.
+    """
+
+    def __init__(self, app: ASGIApp, controller: AdmissionController = admission_controller) -> None:
+        self.app = app
+        self.controller = controller
+        self.bulk_routes: list[BaseRoute] | None = None
+
+    def _is_bulk(self, scope: Scope) -> bool:
+        if self.bulk_routes is None:
+            self.bulk_routes = [
+                route
+                for route in scope["app"].routes
+                if hasattr(route, "dependant") and depends_on(route.dependant, bulk_request)
+            ]
+        return any(route.matches(scope)[0] == Match.FULL for route in self.bulk_routes)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        if self.controller.pressure() >= 1:
+            token = bearer_token(scope)
+            # the signature alone, with no blacklist lookup: revoked tokens are rare and still rejected by the route
+            anonymous = token is None or get_token_subject(token) is None
+            bulk = self._is_bulk(scope)
+            if not self.controller.admits(anonymous=anonymous, bulk=bulk):
+                shed_requests.inc("anonymous" if anonymous else "bulk")
+                response = JSONResponse(
+                    {"detail": "Server is overloaded, please retry later."},
+                    status_code=503,
+                    headers={"Retry-After": str(self.controller.retry_after())},
+                )
+                await response(scope, receive, send)
+                return
+
+        self.controller.in_flight += 1
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.controller.in_flight -= 1
@@ -0,0 +1,118 @@
+from collections.abc import Iterable
+
+from fastapi.dependencies.models import Dependant
+from starlette.responses import JSONResponse
+from starlette.routing import BaseRoute, Match
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from ..api.dependencies import rate_limiter_dependency
+from ..core.logger import logging
+from ..core.security import get_token_subject
+from ..core.utils.rate_limit import rate_limiter
+from ..core.utils.rate_limit_policies import policy_table
+from ..schemas.rate_limit import route_key
+
+logger = logging.getLogger(__name__)
+
+
+def depends_on(dependant: Dependant, call: object) -> bool:
+    return any(sub.call is call or depends_on(sub, call) for sub in dependant.dependencies)
+
+
+def compile_rate_limited_routes(routes: Iterable[BaseRoute]) -> list[tuple[BaseRoute, str]]:
+    """Pair every route depending on `rate_limiter_dependency` with its rate limit key (its sanitized template).
+
+    Built once at startup, so admission only has to match the request against the limited routes.
+    """
+    return [
+        (route, route_key(route, ""))
+        for route in routes
+        if isinstance(getattr(route, "dependant", None), Dependant)
+        and depends_on(route.dependant, rate_limiter_dependency)  # type: ignore[attr-defined]
+    ]
+
+
+def bearer_token(scope: Scope) -> str | None:
+    for name, value in scope["headers"]:
+        if name == b"authorization":
+            scheme, _, token = value.decode("latin-1").partition(" ")
+            return token if scheme.lower() == "bearer" and token else None
+    return None
+
+
+class RateLimitMiddleware:
+    """Pure ASGI middleware rejecting over-limit requests before any routing, dependency or body parsing.
+
+    Requests to routes depending on `rate_limiter_dependency` are counted here, against the same keys the dependency
+    uses: the matched route template, and the user id for a bearer token whose subject was already seen by the
+    dependency or the client address for anonymous requests. A token without a valid signature counts as anonymous,
+    so a made-up `Authorization` header can't skip the limit. The subject is read from the token signature alone,
+    with no database session, blacklist lookup or user query, and the policy comes from the in-process
+    `policy_table`.
+
+    The result is stored in the request state so the dependency does not count the request again. Requests the
+    middleware can't attribute (an unseen but validly signed subject, or Redis being unavailable) are left for the
+    dependency to count.
+
+    Parameters
+    ----------
+    app: ASGIApp
+        The next ASGI application in the chain.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+        self.routes: list[tuple[BaseRoute, str]] | None = None
+
+    def _limited_routes(self, scope: Scope) -> list[tuple[BaseRoute, str]]:
+        if self.routes is None:
+            app = scope["app"]
+            self.routes = getattr(app.state, "rate_limited_routes", None) or compile_rate_limited_routes(app.routes)
+        return self.routes
+
+    def _match(self, scope: Scope) -> str | None:
+        for route, key in self._limited_routes(scope):
+            if route.matches(scope)[0] == Match.FULL:
+                return key
+        return None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or rate_limiter.client is None:
+            await self.app(scope, receive, send)
+            return
+
+        path = self._match(scope)
+        if path is None:
+            await self.app(scope, receive, send)
+            return
+
+        tier_id: int | None = None
+        token = bearer_token(scope)
+        subject = get_token_subject(token) if token is not None else None
+        user_id: int | str
+        if subject is not None:
+            known = policy_table.subject(subject)
+            if known is None:
+                await self.app(scope, receive, send)
+                return
+            user_id, tier_id = known
+        else:
+            user_id = scope["client"][0] if scope.get("client") else "unknown"
+
+        policy = policy_table.resolve(tier_id, path)
+        try:
+            result = await rate_limiter.check(
+                user_id=user_id, path=path, limit=policy.limit, period=policy.period, algorithm=policy.algorithm
+            )
+        except Exception as e:
+            logger.warning(f"Rate limit middleware could not check {path}, deferring to the dependency: {e}")
+            await self.app(scope, receive, send)
+            return
+
+        if not result.allowed:
+            response = JSONResponse({"detail": "Rate limit exceeded."}, status_code=429, headers=result.headers())
+            await response(scope, receive, send)
+            return
+
+        scope.setdefault("state", {})["rate_limit"] = result
+        await self.app(scope, receive, send)
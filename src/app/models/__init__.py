@@ -1,3 +1,4 @@
+from .concurrency_limit import ConcurrencyLimit
 from .post import Post
 from .rate_limit import RateLimit
 from .tier import Tier
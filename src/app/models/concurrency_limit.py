@@ -0,0 +1,20 @@
+from datetime import UTC, datetime
+
+from sqlalchemy import DateTime, Float, ForeignKey, Integer, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from ..core.db.database import Base
+
+
+class ConcurrencyLimit(Base):
+    __tablename__ = "concurrency_limit"
+
+    id: Mapped[int] = mapped_column("id", autoincrement=True, nullable=False, unique=True, primary_key=True, init=False)
+    tier_id: Mapped[int] = mapped_column(ForeignKey("tier.id"), index=True)
+    name: Mapped[str] = mapped_column(String, nullable=False, unique=True)
+    path: Mapped[str] = mapped_column(String, nullable=False)
+    max_concurrent: Mapped[int] = mapped_column(Integer, nullable=False)
+    queue_timeout: Mapped[float] = mapped_column(Float, default=0.0, server_default="0")
+
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default_factory=lambda: datetime.now(UTC))
+    updated_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), default=None)
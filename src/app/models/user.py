@@ -1,7 +1,7 @@
 import uuid as uuid_pkg
 from datetime import UTC, datetime
 
-from sqlalchemy import DateTime, ForeignKey, String
+from sqlalchemy import DateTime, ForeignKey, Index, String
 from sqlalchemy.orm import Mapped, mapped_column
 
 from ..core.db.database import Base
@@ -9,6 +9,8 @@ from ..core.db.database import Base
 
 class User(Base):
     __tablename__ = "user"
+    # keyset pagination seeks on (created_at, id)
+    __table_args__ = (Index("ix_user_created_at_id", "created_at", "id"),)
 
     id: Mapped[int] = mapped_column("id", autoincrement=True, nullable=False, unique=True, primary_key=True, init=False)
 
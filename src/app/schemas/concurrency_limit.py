@@ -0,0 +1,57 @@
+from datetime import datetime
+from typing import Annotated
+
+from pydantic import BaseModel, ConfigDict, Field, field_validator
+
+from ..core.schemas import TimestampSchema
+from .rate_limit import sanitize_path
+
+
+class ConcurrencyLimitBase(BaseModel):
+    path: Annotated[str, Field(examples=["api_v1_tasks_task"])]
+    max_concurrent: Annotated[int, Field(gt=0, examples=[2])]
+    queue_timeout: Annotated[float, Field(default=0.0, ge=0, examples=[5.0])]
+
+    @field_validator("path")
+    def validate_and_sanitize_path(cls, v: str) -> str:
+        return sanitize_path(v)
+
+
+class ConcurrencyLimit(TimestampSchema, ConcurrencyLimitBase):
+    tier_id: int
+    name: Annotated[str | None, Field(default=None, examples=["tasks:2"])]
+
+
+class ConcurrencyLimitRead(ConcurrencyLimitBase):
+    id: int
+    tier_id: int
+    name: str
+
+
+class ConcurrencyLimitCreate(ConcurrencyLimitBase):
+    model_config = ConfigDict(extra="forbid")
+
+    name: Annotated[str | None, Field(default=None, examples=["api_v1_tasks_task:2"])]
+
+
+class ConcurrencyLimitCreateInternal(ConcurrencyLimitCreate):
+    tier_id: int
+
+
+class ConcurrencyLimitUpdate(BaseModel):
+    path: str | None = Field(default=None)
+    max_concurrent: int | None = Field(default=None, gt=0)
+    queue_timeout: float | None = Field(default=None, ge=0)
+    name: str | None = None
+
+    @field_validator("path")
+    def validate_and_sanitize_path(cls, v: str) -> str:
+        return sanitize_path(v) if v is not None else None
+
+
+class ConcurrencyLimitUpdateInternal(ConcurrencyLimitUpdate):
+    updated_at: datetime
+
+
+class ConcurrencyLimitDelete(BaseModel):
+    pass
@@ -1,4 +1,5 @@
 from datetime import datetime
+from enum import Enum
 from typing import Annotated
 
 from pydantic import BaseModel, ConfigDict, Field, field_validator
@@ -10,10 +11,23 @@ def sanitize_path(path: str) -> str:
     return path.strip("/").replace("/", "_")
 
 
+def route_key(route: object, path: str) -> str:
+    """Rate limit key of a request: the sanitized template of its matched route (e.g. `api_v1_user_{username}`),
+    or of the concrete `path` when no route matched."""
+    return sanitize_path(getattr(route, "path_format", path))
+
+
+class RateLimitAlgorithm(str, Enum):
+    FIXED_WINDOW = "fixed_window"
+    SLIDING_WINDOW = "sliding_window"
+    GCRA = "gcra"
+
+
 class RateLimitBase(BaseModel):
     path: Annotated[str, Field(examples=["users"])]
-    limit: Annotated[int, Field(examples=[5])]
-    period: Annotated[int, Field(examples=[60])]
+    limit: Annotated[int, Field(gt=0, examples=[5])]
+    period: Annotated[int, Field(gt=0, examples=[60])]
+    algorithm: Annotated[RateLimitAlgorithm, Field(default=RateLimitAlgorithm.FIXED_WINDOW, examples=["gcra"])]
 
     @field_validator("path")
     def validate_and_sanitize_path(cls, v: str) -> str:
@@ -43,8 +57,9 @@ class RateLimitCreateInternal(RateLimitCreate):
 
 class RateLimitUpdate(BaseModel):
     path: str | None = Field(default=None)
-    limit: int | None = None
-    period: int | None = None
+    limit: int | None = Field(default=None, gt=0)
+    period: int | None = Field(default=None, gt=0)
+    algorithm: RateLimitAlgorithm | None = None
     name: str | None = None
 
     @field_validator("path")
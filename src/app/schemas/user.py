@@ -29,6 +29,17 @@ class UserRead(BaseModel):
     tier_id: int | None
 
 
+# the fields of the authenticated user that endpoints use, as cached by `get_current_user`
+class UserPrincipal(BaseModel):
+    id: int
+    name: str
+    username: str
+    email: str
+    profile_image_url: str
+    is_superuser: bool
+    tier_id: int | None
+
+
 class UserCreate(UserBase):
     model_config = ConfigDict(extra="forbid")
 
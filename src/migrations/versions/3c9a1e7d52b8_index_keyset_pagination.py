@@ -0,0 +1,32 @@
+"""index keyset pagination
+
+Revision ID: 3c9a1e7d52b8
+Revises: feb238a545fc
+Create Date: 2026-10-19 15:40:12.804113
+
+"""
+
+from collections.abc import Sequence
+from typing import Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "3c9a1e7d52b8"
+down_revision: Union[str, None] = "feb238a545fc"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_post_created_by_user_id_created_at_id", "post", ["created_by_user_id", "created_at", "id"], unique=False
+    )
+    op.create_index("ix_user_created_at_id", "user", ["created_at", "id"], unique=False)
+    op.create_index("ix_rate_limit_tier_id_created_at_id", "rate_limit", ["tier_id", "created_at", "id"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_rate_limit_tier_id_created_at_id", table_name="rate_limit")
+    op.drop_index("ix_user_created_at_id", table_name="user")
+    op.drop_index("ix_post_created_by_user_id_created_at_id", table_name="post")
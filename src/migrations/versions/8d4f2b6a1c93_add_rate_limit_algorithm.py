@@ -0,0 +1,27 @@
+"""add rate limit algorithm
+
+Revision ID: 8d4f2b6a1c93
+Revises:
+Create Date: 2026-10-19 08:41:26.306251
+
+"""
+
+from collections.abc import Sequence
+from typing import Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "8d4f2b6a1c93"
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("rate_limit", sa.Column("algorithm", sa.String(20), nullable=False, server_default="fixed_window"))
+
+
+def downgrade() -> None:
+    op.drop_column("rate_limit", "algorithm")
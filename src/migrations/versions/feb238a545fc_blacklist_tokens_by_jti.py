@@ -0,0 +1,44 @@
+"""blacklist tokens by jti
+
+Revision ID: feb238a545fc
+Revises: 8d4f2b6a1c93
+Create Date: 2026-10-19 10:12:37.518204
+
+"""
+
+from collections.abc import Sequence
+from typing import Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "feb238a545fc"
+down_revision: Union[str, None] = "8d4f2b6a1c93"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute("DELETE FROM token_blacklist WHERE expires_at < LOCALTIMESTAMP")
+
+    # tokens issued before the jti claim are identified by their SHA-256 digest, as `token_id` does
+    op.add_column("token_blacklist", sa.Column("jti", sa.String(length=64), nullable=True))
+    op.execute("UPDATE token_blacklist SET jti = encode(sha256(convert_to(token, 'UTF8')), 'hex')")
+    op.alter_column("token_blacklist", "jti", nullable=False)
+
+    op.drop_index("ix_token_blacklist_token", table_name="token_blacklist")
+    op.drop_column("token_blacklist", "token")
+    op.create_index(op.f("ix_token_blacklist_jti"), "token_blacklist", ["jti"], unique=True)
+    op.create_index(op.f("ix_token_blacklist_expires_at"), "token_blacklist", ["expires_at"], unique=False)
+
+
+def downgrade() -> None:
+    # the full tokens can't be recovered from their ids, so the revocations are lost
+    op.execute("DELETE FROM token_blacklist")
+
+    op.drop_index(op.f("ix_token_blacklist_expires_at"), table_name="token_blacklist")
+    op.drop_index(op.f("ix_token_blacklist_jti"), table_name="token_blacklist")
+    op.drop_column("token_blacklist", "jti")
+    op.add_column("token_blacklist", sa.Column("token", sa.String(), nullable=False))
+    op.create_index("ix_token_blacklist_token", "token_blacklist", ["token"], unique=True)
@@ -0,0 +1,29 @@
+import typer
+
+from ..app.core.config import settings
+from ..app.core.utils.password_hashing import calibrate_rounds
+
+app = typer.Typer(pretty_exceptions_show_locals=False)
+
+
+@app.command()
+def main(
+    target_ms: float = typer.Option(250.0, help="Latency budget of a single password hash, in milliseconds."),
+    minimum: int = typer.Option(10, help="Lowest cost factor to recommend, whatever the budget."),
+    samples: int = typer.Option(3, help="Hashes timed per cost factor."),
+) -> None:
+    """Time bcrypt on this host and recommend the PASSWORD_HASH_ROUNDS fitting the latency budget."""
+    rounds, timings = calibrate_rounds(target_ms / 1000, minimum=minimum, samples=samples)
+
+    for cost, seconds in timings.items():
+        marker = "<" if cost == rounds else " "
+        typer.echo(f"{marker} rounds={cost:<3} {seconds * 1000:10.1f} ms")
+
+    typer.echo(f"\nPASSWORD_HASH_ROUNDS={rounds}  (currently {settings.PASSWORD_HASH_ROUNDS})")
+    if rounds not in timings or timings[rounds] > target_ms / 1000:
+        typer.echo(f"Even the minimum cost exceeds {target_ms:g} ms on this host.", err=True)
+    typer.echo("Hashes made at a lower cost are upgraded the next time their user logs in.")
+
+
+if __name__ == "__main__":
+    app()
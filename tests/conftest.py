@@ -1,17 +1,21 @@
-from collections.abc import Callable, Generator
+from collections.abc import AsyncGenerator, Callable, Generator
 from typing import Any
 from unittest.mock import AsyncMock, Mock
 
+import fakeredis
 import pytest
+import pytest_asyncio
 from faker import Faker
 from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
-from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import MetaData, PrimaryKeyConstraint, create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.orm.session import Session
 
 from src.app.core.config import settings
+from src.app.core.db.database import Base
 from src.app.main import app
+from src.app.models import Post, User
 
 DATABASE_URI = settings.POSTGRES_URI
 DATABASE_PREFIX = settings.POSTGRES_SYNC_PREFIX
@@ -38,6 +42,53 @@ def db() -> Generator[Session, Any, None]:
     session.close()
 
 
+@pytest_asyncio.fixture
+async def sqlite_sessions(tmp_path) -> AsyncGenerator[async_sessionmaker[AsyncSession], None]:
+    """Sessions of a throwaway SQLite database with the app's tables, for tests running real queries."""
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'test.db'}")
+    # SQLite only numbers an integer primary key on its own, so the copies created here leave `uuid` out of it
+    metadata = MetaData()
+    for name in ("tier", "rate_limit", "user", "post", "token_blacklist"):
+        table = Base.metadata.tables[name].to_metadata(metadata)
+        if "uuid" in table.c:
+            table.c.uuid.primary_key = False
+            table.append_constraint(PrimaryKeyConstraint(table.c.id))
+    async with engine.begin() as conn:
+        await conn.run_sync(metadata.create_all)
+
+    yield async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    await engine.dispose()
+
+
+@pytest_asyncio.fixture
+async def sqlite_db(sqlite_sessions) -> AsyncGenerator[AsyncSession, None]:
+    """A session of the `sqlite_sessions` database."""
+    async with sqlite_sessions() as session:
+        yield session
+
+
+def make_user(id: int, username: str | None = None, tier_id: int | None = None) -> User:
+    """A user with a fixed id, called "user{id}" unless given a username."""
+    username = username or f"user{id}"
+    user = User(name="Alice", username=username, email=f"{username}@example.com", hashed_password="x")
+    user.id, user.tier_id = id, tier_id
+    return user
+
+
+def make_post(id: int, user_id: int, **kwargs: Any) -> Post:
+    """A post of `user_id` with a fixed id, titled "Post {id}"."""
+    post = Post(created_by_user_id=user_id, title=f"Post {id}", text="x", **kwargs)
+    post.id = id
+    return post
+
+
+def mock_request(method: str = "GET") -> Mock:
+    """A request mock for calling endpoints directly."""
+    request = Mock()
+    request.method = method
+    return request
+
+
 def override_dependency(dependency: Callable[..., Any], mocked_response: Any) -> None:
     app.dependency_overrides[dependency] = lambda: mocked_response
 
@@ -58,6 +109,12 @@ def mock_redis():
     return mock_redis
 
 
+@pytest.fixture
+def fake_redis():
+    """In-memory Redis with Lua scripting, for code relying on server-side scripts."""
+    return fakeredis.FakeAsyncRedis()
+
+
 @pytest.fixture
 def sample_user_data():
     """Generate sample user data for tests."""
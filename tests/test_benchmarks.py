@@ -0,0 +1,56 @@
+"""Tests for the microbenchmark harness."""
+
+import pytest
+
+from benchmarks.harness import Result, find_regressions, load_baselines, measure, save_baselines
+
+
+def _result(name="op", us_per_op=10.0, peak_bytes_per_op=1000.0):
+    return Result(name=name, us_per_op=us_per_op, peak_bytes_per_op=peak_bytes_per_op, retained_blocks_per_op=0.0)
+
+
+class TestHarness:
+    """Test measuring, storing and comparing benchmark results."""
+
+    @pytest.mark.asyncio
+    async def test_measure(self):
+        """Every run calls the operation, and allocations are reported per call."""
+        calls = 0
+
+        async def operation():
+            nonlocal calls
+            calls += 1
+            return [0] * 1000
+
+        result = await measure("op", operation, iterations=10, repeats=3, warmup=5)
+
+        assert calls == 5 + 10 * 3 + 1
+        assert result.name == "op"
+        assert result.us_per_op > 0
+        assert result.peak_bytes_per_op >= 8000
+
+    def test_baselines_round_trip(self, tmp_path):
+        """Saved baselines load back by name, and a missing file has none."""
+        path = tmp_path / "baselines.json"
+        assert load_baselines(path) == {}
+
+        save_baselines(path, [_result()])
+
+        assert load_baselines(path)["op"]["us_per_op"] == 10.0
+
+    def test_find_regressions(self):
+        """Only results worse than their baseline by more than the threshold are flagged."""
+        baselines = {
+            "slower": {"us_per_op": 10.0, "peak_bytes_per_op": 1000.0},
+            "noisy": {"us_per_op": 10.0, "peak_bytes_per_op": 1000.0},
+        }
+        results = [
+            _result("slower", us_per_op=13.0, peak_bytes_per_op=2000.0),
+            _result("noisy", us_per_op=12.0),
+            _result("new", us_per_op=100.0),
+        ]
+
+        regressions = find_regressions(results, baselines, threshold=0.25)
+
+        assert [(r.name, r.metric) for r in regressions] == [("slower", "us_per_op"), ("slower", "peak_bytes_per_op")]
+        assert regressions[0].ratio == pytest.approx(1.3)
@@ -0,0 +1,151 @@
+"""Unit tests for the bulk endpoints."""
+
+from unittest.mock import AsyncMock, Mock, patch
+
+import pytest
+import pytest_asyncio
+from fastapi import FastAPI
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import event
+
+from src.app.api.dependencies import get_current_user
+from src.app.api.v1 import posts as posts_module
+from src.app.api.v1.posts import read_posts, read_posts_by_ids, write_posts
+from src.app.api.v1.users import read_users_by_ids, write_users
+from src.app.core.db.database import async_get_db
+from src.app.core.exceptions.http_exceptions import NotFoundException
+from src.app.core.utils import cache as cache_module
+from src.app.core.utils import counts
+from src.app.core.utils.counts import CountStrategy, count_rows
+from src.app.core.utils.principal_cache import PrincipalCache
+from src.app.crud import crud_user_scoped
+from src.app.crud.crud_posts import crud_posts
+from tests.conftest import make_post, make_user, mock_request
+
+CURRENT_USER = {"id": 1, "username": "user1", "tier_id": None}
+
+
+@pytest_asyncio.fixture
+async def db(sqlite_db, fake_redis):
+    sqlite_db.add_all([make_user(1), make_user(2), make_post(1, 2)])
+    await sqlite_db.commit()
+
+    with patch.object(cache_module, "client", fake_redis):
+        with patch.object(crud_user_scoped, "principal_cache", PrincipalCache(ttl=30)):
+            yield sqlite_db
+
+
+@pytest.fixture
+def queries(db):
+    queries = []
+    event.listen(db.bind.sync_engine, "before_cursor_execute", lambda *args: queries.append(args[2]))
+    return queries
+
+
+def _posts(count: int) -> list[dict]:
+    return [{"title": f"Post {i}", "text": "x"} for i in range(count)]
+
+
+class TestBulkPosts:
+    """Test creating and reading posts in bulk."""
+
+    @pytest.mark.asyncio
+    async def test_creates_valid_posts_and_reports_the_others(self, db):
+        """Valid posts are created in order, and each invalid one is reported by index."""
+        items = [*_posts(2), {"title": "x", "text": "x"}, {"title": "Post", "text": "x", "author": "bob"}, *_posts(1)]
+
+        result = await write_posts(Mock(), username="user1", posts=items, current_user=CURRENT_USER, db=db)
+
+        assert [post["title"] for post in result["data"]] == ["Post 0", "Post 1", "Post 0"]
+        assert all(post["created_by_user_id"] == 1 for post in result["data"])
+        assert [error["index"] for error in result["errors"]] == [2, 3]
+        assert result["errors"][0]["errors"][0]["loc"] == ["title"]
+
+    @pytest.mark.asyncio
+    async def test_inserts_in_one_statement(self, db, queries):
+        """Hundreds of posts take one INSERT, and invalidate the user's cached count."""
+        assert await count_rows(crud_posts, db, CountStrategy.CACHED, created_by_user_id=1, is_deleted=False) == 0
+        queries.clear()
+
+        result = await write_posts(Mock(), username="user1", posts=_posts(300), current_user=CURRENT_USER, db=db)
+        for task in list(counts._tasks):
+            await task
+
+        assert len(result["data"]) == 300
+        assert sum(query.startswith("INSERT") for query in queries) == 1
+        assert await count_rows(crud_posts, db, CountStrategy.CACHED, created_by_user_id=1, is_deleted=False) == 300
+
+    @pytest.mark.asyncio
+    async def test_reads_the_users_posts_in_one_query(self, db, queries):
+        """Posts are returned in the order asked, and others' or unknown posts are reported missing."""
+        created = await write_posts(Mock(), username="user1", posts=_posts(3), current_user=CURRENT_USER, db=db)
+        ids = [post["id"] for post in created["data"]]
+        queries.clear()
+
+        result = await read_posts_by_ids(Mock(), username="user1", ids=[ids[2], 1, ids[0], 999, ids[2]], db=db)
+
+        assert [post["id"] for post in result["data"]] == [ids[2], ids[0]]
+        assert result["missing"] == [1, 999]
+        assert len(queries) == 1
+
+    @pytest.mark.asyncio
+    async def test_request_limits(self, db):
+        """Ids are read from the query string, and batches over the limit are rejected."""
+        app = FastAPI()
+        app.include_router(posts_module.router)
+        app.dependency_overrides[async_get_db] = lambda: db
+        app.dependency_overrides[get_current_user] = lambda: CURRENT_USER
+
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+            response = await client.get("/user2/posts/bulk", params={"ids": [1, 2]})
+            assert response.json() == {"data": [response.json()["data"][0]], "missing": [2]}
+
+            response = await client.post("/user1/posts/bulk", json=_posts(501))
+            assert response.status_code == 422
+
+
+class TestBulkUsers:
+    """Test creating and reading users in bulk."""
+
+    @pytest.mark.asyncio
+    async def test_rejects_taken_and_repeated_usernames_and_emails(self, db):
+        """Usernames and emails taken by existing users or earlier items are reported, the others created."""
+        items = [
+            {"name": "Bob", "username": "bob", "email": "bob@example.com", "password": "Str1ngst!"},
+            {"name": "Bob", "username": "user1", "email": "new@example.com", "password": "Str1ngst!"},
+            {"name": "Bob", "username": "bobby", "email": "bob@example.com", "password": "Str1ngst!"},
+            {"name": "Bob", "username": "Not Valid", "email": "other@example.com", "password": "Str1ngst!"},
+            {"name": "Carol", "username": "carol", "email": "carol@example.com", "password": "Str1ngst!"},
+        ]
+        hashed = AsyncMock(side_effect=lambda passwords: [f"hashed-{password}" for password in passwords])
+
+        with patch("src.app.api.v1.users.hash_passwords", hashed):
+            result = await write_users(Mock(), users=items, db=db)
+
+        assert [user["username"] for user in result["data"]] == ["bob", "carol"]
+        assert [(error["index"], error["errors"][0]["loc"]) for error in result["errors"]] == [
+            (1, ["username"]),
+            (2, ["email"]),
+            (3, ["username"]),
+        ]
+        hashed.assert_called_once_with(["Str1ngst!", "Str1ngst!"])
+
+        result = await read_users_by_ids(Mock(), ids=[result["data"][1]["id"], 1, 999], db=db)
+        assert [user["username"] for user in result["data"]] == ["carol", "user1"]
+        assert result["missing"] == [999]
+
+    @pytest.mark.asyncio
+    async def test_created_users_are_no_longer_cached_as_missing(self, db, fake_redis):
+        """Creating users drops the markers cached while they didn't exist, without scanning Redis."""
+        request = mock_request()
+        with pytest.raises(NotFoundException, match="User not found"):
+            await read_posts(request, username="dave", db=db, page=1, items_per_page=10, cursor=None)
+
+        items = [{"name": "Dave", "username": "dave", "email": "dave@example.com", "password": "Str1ngst!"}]
+        hashed = AsyncMock(side_effect=lambda passwords: ["hashed" for _ in passwords])
+        with patch("src.app.api.v1.users.hash_passwords", hashed), patch.object(fake_redis, "scan") as scan:
+            await write_users(Mock(), users=items, db=db)
+
+        scan.assert_not_called()
+        page = await read_posts(request, username="dave", db=db, page=1, items_per_page=10, cursor=None)
+        assert page["data"] == []
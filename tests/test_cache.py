@@ -0,0 +1,211 @@
+"""Unit tests for the cache decorator and its instrumentation."""
+
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from src.app.core.exceptions.http_exceptions import NotFoundException
+from src.app.core.utils import cache as cache_module
+from src.app.core.utils.cache import cache
+from src.app.core.utils.metrics import HotKeyTracker, registry
+from tests.conftest import mock_request
+
+
+@pytest.fixture(autouse=True)
+def reset_metrics():
+    registry.reset()
+    cache_module.hot_keys.reset()
+    yield
+    registry.reset()
+
+
+class TestCacheMetrics:
+    """Test per-prefix cache metrics."""
+
+    @pytest.mark.asyncio
+    async def test_miss_then_hit_is_counted_by_template(self, mock_redis):
+        """Lookups are labelled by the key prefix template, not the concrete key."""
+
+        @cache(key_prefix="{username}_post_cache", resource_id_name="id")
+        async def endpoint(request, username: str, id: int):
+            return {"id": id}
+
+        with patch.object(cache_module, "client", mock_redis):
+            await endpoint(mock_request(), username="alice", id=1)
+            mock_redis.get = AsyncMock(return_value=b'{"id": 1}')
+            await endpoint(mock_request(), username="bob", id=1)
+
+        assert cache_module.cache_lookups.get("{username}_post_cache", "miss") == 1
+        assert cache_module.cache_lookups.get("{username}_post_cache", "hit") == 1
+        assert cache_module.cache_redis_seconds.count("{username}_post_cache", "get") == 2
+        assert cache_module.cache_value_bytes.count("{username}_post_cache", "write") == 1
+        mock_redis.set.assert_called_once_with("alice_post_cache:1", '{"id": 1}', ex=3600)
+
+    @pytest.mark.asyncio
+    async def test_invalidation_fan_out(self, mock_redis):
+        """Invalidations record how many keys were removed."""
+        mock_redis.delete = AsyncMock(return_value=1)
+        mock_redis.scan = AsyncMock(return_value=(0, [b"alice_posts:page_1", b"alice_posts:page_2"]))
+
+        @cache("{username}_post_cache", resource_id_name="id", pattern_to_invalidate_extra=["{username}_posts:*"])
+        async def endpoint(request, username: str, id: int):
+            return {"message": "ok"}
+
+        with patch.object(cache_module, "client", mock_redis):
+            await endpoint(mock_request("PATCH"), username="alice", id=1)
+
+        assert cache_module.cache_invalidated_keys.sum("{username}_post_cache") == 2
+
+    def test_render_prometheus_text(self):
+        """The registry renders counters and histograms in the exposition format."""
+        cache_module.cache_lookups.inc("{username}_posts", "hit")
+        cache_module.cache_redis_seconds.observe(0.002, "{username}_posts", "get")
+
+        text = registry.render()
+
+        assert 'cache_lookups_total{key_prefix="{username}_posts",result="hit"} 1' in text
+        assert 'cache_redis_seconds_bucket{key_prefix="{username}_posts",operation="get",le="+Inf"} 1.0' in text
+
+
+class TestHotKeyTracker:
+    """Test the sampled hot key tracker."""
+
+    def test_top_keys_are_ranked(self):
+        """The most frequent keys are reported first."""
+        tracker = HotKeyTracker(capacity=4, sample_rate=1.0)
+        for _ in range(10):
+            tracker.record("p", "hot", hit=True)
+        tracker.record("p", "cold", hit=False)
+
+        top = tracker.top(1)
+
+        assert top[0]["key"] == "hot"
+        assert top[0]["estimated_requests"] == 10
+        assert top[0]["hit_ratio"] == 1.0
+
+    def test_capacity_is_bounded(self):
+        """Tracking more keys than the capacity evicts the least frequent one."""
+        tracker = HotKeyTracker(capacity=2, sample_rate=1.0)
+        for key in ("a", "b", "c", "d"):
+            tracker.record("p", key, hit=False)
+
+        assert len(tracker.counts) == 2
+
+
+class TestCacheEntries:
+    """Test populating cache entries outside the decorator."""
+
+    @pytest.mark.asyncio
+    async def test_warmed_entry_is_read_by_decorator(self, mock_redis):
+        """An entry stored with `set_cache_entry` is served by the decorated endpoint."""
+        key_prefix = "{username}_posts:page_{page}:items_per_page:{items_per_page}"
+        kwargs = {"username": "alice", "page": 1, "items_per_page": 10}
+        func = AsyncMock()
+
+        @cache(key_prefix=key_prefix, resource_id_name="username")
+        async def endpoint(request, username: str, page: int, items_per_page: int):
+            return await func()
+
+        with patch.object(cache_module, "client", mock_redis):
+            cache_key = cache_module.build_cache_key(key_prefix, "alice", kwargs)
+            await cache_module.set_cache_entry(key_prefix, cache_key, {"data": []}, 60)
+            stored_key, stored_value = mock_redis.set.call_args.args
+
+            mock_redis.get = AsyncMock(side_effect=lambda key: stored_value.encode() if key == stored_key else None)
+            result = await endpoint(mock_request(), **kwargs)
+
+        assert cache_key == "alice_posts:page_1:items_per_page:10:alice"
+        assert result == {"data": []}
+        func.assert_not_called()
+
+
+class TestNegativeCaching:
+    """Test "not found" markers."""
+
+    @pytest.mark.asyncio
+    async def test_not_found_is_remembered(self, mock_redis):
+        """A 404 stores a marker and the next request is answered from it without calling the endpoint."""
+        store: dict[str, bytes] = {}
+        mock_redis.get = AsyncMock(side_effect=lambda key: store.get(key))
+        mock_redis.set = AsyncMock(side_effect=lambda key, value, ex=None: store.__setitem__(key, value))
+        func = AsyncMock(side_effect=NotFoundException("Post not found"))
+
+        @cache(key_prefix="{username}_post_cache", resource_id_name="id", not_found_expiration=30)
+        async def endpoint(request, username: str, id: int):
+            return await func()
+
+        with patch.object(cache_module, "client", mock_redis):
+            for _ in range(2):
+                with pytest.raises(NotFoundException, match="Post not found"):
+                    await endpoint(mock_request(), username="alice", id=404)
+
+        func.assert_awaited_once()
+        assert mock_redis.set.call_args.kwargs == {"ex": 30}
+        assert cache_module.cache_lookups.get("{username}_post_cache", "not_found") == 1
+
+    @pytest.mark.asyncio
+    async def test_not_found_is_not_stored_by_default(self, mock_redis):
+        """Without `not_found_expiration` a 404 leaves the cache untouched."""
+
+        @cache(key_prefix="{username}_post_cache", resource_id_name="id")
+        async def endpoint(request, username: str, id: int):
+            raise NotFoundException("Post not found")
+
+        with patch.object(cache_module, "client", mock_redis):
+            with pytest.raises(NotFoundException):
+                await endpoint(mock_request(), username="alice", id=404)
+
+        mock_redis.set.assert_not_called()
+
+
+class TestNamespaces:
+    """Test generation-counter namespaces."""
+
+    @pytest.mark.asyncio
+    async def test_bump_invalidates_namespace(self, fake_redis):
+        """Bumping a namespace makes entries cached under the previous generation unreachable."""
+        func = AsyncMock(side_effect=[{"version": 1}, {"version": 2}])
+
+        @cache(key_prefix="{username}_post_cache", resource_id_name="id", namespaces=["user:{username}"])
+        async def endpoint(request, username: str, id: int):
+            return await func()
+
+        with patch.object(cache_module, "client", fake_redis):
+            assert await endpoint(mock_request(), username="alice", id=1) == {"version": 1}
+            assert await endpoint(mock_request(), username="alice", id=1) == {"version": 1}
+
+            await cache_module.bump_namespaces("user:alice")
+
+            assert await endpoint(mock_request(), username="alice", id=1) == {"version": 2}
+            assert await fake_redis.get("cache:generation:user:alice") == b"1"
+
+        assert func.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_invalidation_deletes_current_generation(self, fake_redis):
+        """Non-GET decorators with the same namespaces delete the current namespaced key."""
+
+        @cache(key_prefix="{username}_post_cache", resource_id_name="id", namespaces=["user:{username}"])
+        async def read(request, username: str, id: int):
+            return {"id": id}
+
+        @cache(
+            "{username}_post_cache",
+            resource_id_name="id",
+            namespaces=["user:{username}"],
+            namespaces_to_bump=["post_schema"],
+        )
+        async def update(request, username: str, id: int):
+            return {"message": "ok"}
+
+        with patch.object(cache_module, "client", fake_redis):
+            await read(mock_request(), username="alice", id=1)
+            cache_key = await cache_module.resolve_cache_key(
+                "{username}_post_cache", 1, {"username": "alice"}, ["user:{username}"]
+            )
+            assert await fake_redis.exists(cache_key)
+
+            await update(mock_request("PATCH"), username="alice", id=1)
+
+            assert not await fake_redis.exists(cache_key)
+            assert await fake_redis.get("cache:generation:post_schema") == b"1"
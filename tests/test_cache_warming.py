@@ -0,0 +1,67 @@
+"""Unit tests for the cache warming job."""
+
+from unittest.mock import Mock, patch
+
+import pytest
+import pytest_asyncio
+
+from src.app.api.v1.posts import read_post, read_posts
+from src.app.core.utils import cache as cache_module
+from src.app.core.worker import functions as worker_functions
+from src.app.core.worker.functions import warm_cache
+from tests.conftest import make_post, make_user, mock_request
+
+
+@pytest_asyncio.fixture
+async def sessions(sqlite_sessions, fake_redis):
+    async with sqlite_sessions() as session:
+        session.add_all([make_user(1), make_user(2)])
+        session.add_all([make_post(post_id, user_id) for post_id, user_id in ((1, 1), (2, 1), (3, 1), (4, 2))])
+        await session.commit()
+
+    with (
+        patch.object(cache_module, "client", fake_redis),
+        patch.object(worker_functions, "local_session", sqlite_sessions),
+        patch.object(worker_functions.settings, "CACHE_WARMING_DELAY_SECONDS", 0),
+        patch.object(worker_functions.settings, "CACHE_WARMING_ITEMS_PER_PAGE", 2),
+    ):
+        yield sqlite_sessions
+
+
+class TestWarmCache:
+    """Test that warmed entries are the ones the endpoints read."""
+
+    @pytest.mark.asyncio
+    async def test_warms_the_first_page_read_posts_serves(self, sessions):
+        """The warmed page is served by `read_posts` without touching the database."""
+        warmed = await warm_cache({}, max_users=1, pages=1)
+        assert warmed == {"users": 1, "pages": 1, "posts": 2}
+
+        db = Mock()
+        page = await read_posts(mock_request(), username="user1", db=db, page=1, items_per_page=2, cursor=None)
+
+        assert [post["id"] for post in page["data"]] == [1, 2]
+        assert page["has_more"] is True
+        db.execute.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_warms_the_posts_read_post_serves(self, sessions):
+        """Each warmed post is served by `read_post` as a `PostRead`, without touching the database."""
+        await warm_cache({}, max_users=1, pages=1)
+
+        db = Mock()
+        post = await read_post(mock_request(), username="user1", id=2, db=db)
+
+        assert post["title"] == "Post 2"
+        assert "is_deleted" not in post
+        db.execute.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_visits_the_most_active_users_up_to_their_last_page(self, sessions):
+        """Users are warmed by post count, and warming a user stops at their last page."""
+        warmed = await warm_cache({}, max_users=2, pages=5)
+
+        assert warmed == {"users": 2, "pages": 3, "posts": 4}
+        page = await read_posts(mock_request(), username="user1", db=Mock(), page=2, items_per_page=2, cursor=None)
+        assert [post["id"] for post in page["data"]] == [3]
+        assert page["has_more"] is False
@@ -0,0 +1,108 @@
+"""Unit tests for the concurrency limiter."""
+
+import asyncio
+import time
+from unittest.mock import Mock, patch
+
+import pytest
+
+from src.app.api.dependencies import concurrency_limiter_dependency
+from src.app.core.exceptions.http_exceptions import RateLimitException
+from src.app.core.utils.concurrency_limit import ConcurrencyLimiter
+from src.app.core.utils.rate_limit_policies import ConcurrencyPolicy, RateLimitPolicyTable
+
+KEY = "concurrency:1:api_v1_tasks_task"
+
+
+@pytest.fixture
+def limiter(fake_redis):
+    limiter = ConcurrencyLimiter(lease_seconds=60, poll_interval=0.01)
+    limiter.initialize(fake_redis)
+    return limiter
+
+
+class TestConcurrencyLimiter:
+    """Test the Redis semaphore and its local fast path."""
+
+    @pytest.mark.asyncio
+    async def test_slots_are_bounded(self, limiter, fake_redis):
+        """Only `max_concurrent` slots can be held at once, and releasing one frees it."""
+        policy = ConcurrencyPolicy(max_concurrent=2)
+
+        first = await limiter.acquire(KEY, policy)
+        second = await limiter.acquire(KEY, policy)
+        assert first and second
+        assert await limiter.acquire(KEY, policy) is None
+        assert await fake_redis.zcard(KEY) == 2
+
+        await limiter.release(KEY, first)
+        assert await limiter.acquire(KEY, policy) is not None
+        assert 0 < await fake_redis.pttl(KEY) <= 60000
+
+    @pytest.mark.asyncio
+    async def test_local_fast_path(self, limiter):
+        """Once this process holds every slot, requests are turned away without a Redis round trip."""
+        policy = ConcurrencyPolicy(max_concurrent=1)
+        await limiter.acquire(KEY, policy)
+
+        with patch.object(limiter, "script") as script:
+            assert await limiter.acquire(KEY, policy) is None
+            script.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_slots_held_elsewhere(self, limiter, fake_redis):
+        """Slots held by other processes count, until their lease expires."""
+        now_ms = int(time.time() * 1000)
+        await fake_redis.zadd(KEY, {"other-worker": now_ms + 60000, "crashed-worker": now_ms - 1})
+
+        assert await limiter.acquire(KEY, ConcurrencyPolicy(max_concurrent=2)) is not None
+        assert await limiter.acquire(KEY, ConcurrencyPolicy(max_concurrent=2)) is None
+
+    @pytest.mark.asyncio
+    async def test_queued_until_released(self, limiter):
+        """A request queued with a deadline gets the slot as soon as it is released."""
+        token = await limiter.acquire(KEY, ConcurrencyPolicy(max_concurrent=1))
+        waiter = asyncio.create_task(limiter.acquire(KEY, ConcurrencyPolicy(max_concurrent=1, queue_timeout=1)))
+        await asyncio.sleep(0.02)
+        assert not waiter.done()
+
+        await limiter.release(KEY, token)
+        assert await waiter is not None
+
+    @pytest.mark.asyncio
+    async def test_queue_deadline(self, limiter):
+        """A queued request gives up at its deadline."""
+        await limiter.acquire(KEY, ConcurrencyPolicy(max_concurrent=1))
+
+        start = time.monotonic()
+        assert await limiter.acquire(KEY, ConcurrencyPolicy(max_concurrent=1, queue_timeout=0.05)) is None
+        assert time.monotonic() - start >= 0.05
+
+
+class TestConcurrencyLimiterDependency:
+    """Test the slot held around a request."""
+
+    @pytest.mark.asyncio
+    async def test_slot_held_for_the_request(self, limiter, current_user_dict):
+        """The slot is taken before the endpoint runs and released after, and a saturated route gets a 429."""
+        current_user_dict["tier_id"] = 1
+        table = RateLimitPolicyTable()
+        table.concurrency = {(1, "api_v1_tasks_task"): ConcurrencyPolicy(max_concurrent=1)}
+        request = Mock()
+        request.url.path = "/api/v1/tasks/task"
+        request.scope = {}
+
+        with patch("src.app.api.dependencies.concurrency_limiter", limiter):
+            with patch("src.app.api.dependencies.policy_table", table):
+                held = concurrency_limiter_dependency(request, current_user_dict)
+                await held.__anext__()
+                key = limiter.key(current_user_dict["id"], "api_v1_tasks_task")
+                assert limiter.in_flight[key] == 1
+
+                with pytest.raises(RateLimitException) as exc_info:
+                    await concurrency_limiter_dependency(request, current_user_dict).__anext__()
+                assert exc_info.value.headers["Retry-After"] == "1"
+
+                with pytest.raises(StopAsyncIteration):
+                    await held.__anext__()
+                assert key not in limiter.in_flight
@@ -0,0 +1,58 @@
+"""Unit tests for the markdown page render cache."""
+
+import os
+
+import pytest
+
+from src.app.front.content import MarkdownRenderCache
+
+
+class TestMarkdownRenderCache:
+    """Test rendering and invalidation of content pages."""
+
+    @pytest.mark.asyncio
+    async def test_page_is_rendered_once(self, tmp_path):
+        """A page is converted once and then served from memory."""
+        path = tmp_path / "main.md"
+        path.write_text("title: Home\n\n# Hello")
+        page_cache = MarkdownRenderCache(recheck_interval=0)
+
+        first = await page_cache.get(str(path))
+        second = await page_cache.get(str(path))
+
+        assert first is second
+        assert "<h1>Hello</h1>" in first.html
+        assert first.metadata == {"title": ["Home"]}
+
+    @pytest.mark.asyncio
+    async def test_edited_page_is_rerendered(self, tmp_path):
+        """Changing the file contents invalidates the rendered page."""
+        path = tmp_path / "main.md"
+        path.write_text("# Before")
+        page_cache = MarkdownRenderCache(recheck_interval=0)
+        await page_cache.get(str(path))
+
+        path.write_text("# After edit")
+        stat = os.stat(path)
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+        page = await page_cache.get(str(path))
+
+        assert "<h1>After edit</h1>" in page.html
+
+    @pytest.mark.asyncio
+    async def test_missing_page(self, tmp_path):
+        """Missing files are reported as None."""
+        page_cache = MarkdownRenderCache()
+
+        assert await page_cache.get(str(tmp_path / "missing.md")) is None
+
+    @pytest.mark.asyncio
+    async def test_prerender(self, tmp_path):
+        """Prerendering renders every markdown file of a directory."""
+        (tmp_path / "a.md").write_text("# A")
+        (tmp_path / "b.md").write_text("# B")
+        (tmp_path / "notes.txt").write_text("ignored")
+        page_cache = MarkdownRenderCache()
+
+        assert await page_cache.prerender(str(tmp_path), str(tmp_path / "missing")) == 2
+        assert len(page_cache.pages) == 2
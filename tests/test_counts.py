@@ -0,0 +1,110 @@
+"""Unit tests for the total counts of paginated responses."""
+
+from unittest.mock import patch
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import event
+
+from src.app.core.utils import cache as cache_module
+from src.app.core.utils import counts
+from src.app.core.utils.counts import CountStrategy, count_rows
+from src.app.crud.crud_posts import crud_posts
+from src.app.crud.crud_users import crud_users
+from tests.conftest import make_post, make_user
+
+
+@pytest_asyncio.fixture
+async def db(sqlite_db, fake_redis):
+    sqlite_db.add_all([make_user(1), make_user(2), make_post(1, 1), make_post(2, 1), make_post(3, 2)])
+    await sqlite_db.commit()
+
+    with patch.object(cache_module, "client", fake_redis):
+        yield sqlite_db
+
+
+async def _settle():
+    for task in list(counts._tasks):
+        await task
+
+
+async def _posts_of(db, user_id):
+    return await count_rows(crud_posts, db, CountStrategy.CACHED, created_by_user_id=user_id, is_deleted=False)
+
+
+async def _cached(db, user_id):
+    """Whether the post count of `user_id` is served without a query."""
+    with patch.object(crud_posts, "count") as count:
+        await _posts_of(db, user_id)
+    return not count.called
+
+
+class TestCountRows:
+    """Test the count strategies."""
+
+    @pytest.mark.asyncio
+    async def test_cached_counts_skip_the_database(self, db):
+        """A cached count is served from Redis until it is invalidated."""
+        await _settle()
+        assert await _posts_of(db, 1) == 2
+
+        with patch.object(crud_posts, "count") as count:
+            assert await _posts_of(db, 1) == 2
+
+        count.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_writes_invalidate_their_scope_on_commit(self, db):
+        """Writing a user's post drops the counts of that user, and keeps the others'."""
+        await _settle()
+        assert await _posts_of(db, 1) == 2
+        assert await _posts_of(db, 2) == 1
+
+        db.add(make_post(4, 1))
+        await db.commit()
+        await _settle()
+
+        assert not await _cached(db, 1)
+        assert await _cached(db, 2)
+        assert await _posts_of(db, 1) == 3
+
+        await crud_posts.update(db=db, object={"is_deleted": True}, id=4, created_by_user_id=1)
+        await _settle()
+
+        assert not await _cached(db, 1)
+        assert await _cached(db, 2)
+        assert await _posts_of(db, 1) == 2
+
+    @pytest.mark.asyncio
+    async def test_writes_of_unknown_scope_invalidate_the_table(self, db):
+        """A write the statement doesn't scope drops every count of the table, without querying the rows."""
+        await _settle()
+        assert await _posts_of(db, 1) == 2
+        assert await _posts_of(db, 2) == 1
+
+        queries = []
+        event.listen(db.bind.sync_engine, "before_cursor_execute", lambda *args: queries.append(args[2]))
+        await crud_posts.update(db=db, object={"created_by_user_id": 2}, id=2)
+        await _settle()
+
+        assert [query.split()[0] for query in queries] == ["SELECT", "UPDATE"]
+        assert await _posts_of(db, 1) == 1
+        assert await _posts_of(db, 2) == 2
+
+    @pytest.mark.asyncio
+    async def test_rolled_back_writes_keep_the_counts(self, db):
+        """Counts are only invalidated by committed writes."""
+        await _settle()
+        assert await _posts_of(db, 1) == 2
+
+        db.add(make_post(4, 1))
+        await db.flush()
+        await db.rollback()
+        await _settle()
+
+        assert await _cached(db, 1)
+
+    @pytest.mark.asyncio
+    async def test_estimates_fall_back_to_exact_counts(self, db):
+        """Outside of PostgreSQL the estimated strategy counts the rows."""
+        assert await count_rows(crud_users, db, CountStrategy.ESTIMATED, is_deleted=False) == 2
@@ -0,0 +1,52 @@
+"""Unit tests for engine pooling and read replica routing."""
+
+from unittest.mock import patch
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from src.app.core.config import settings
+from src.app.core.db import database
+from src.app.core.db.database import TimedQueuePool, async_get_read_db, create_pooled_engine
+
+
+async def _database_name() -> str:
+    async for db in async_get_read_db():
+        return (await db.execute(text("SELECT name FROM source"))).scalar_one()
+
+
+class TestDatabase:
+    """Test the engines sessions are taken from."""
+
+    def test_pool_follows_settings(self, tmp_path):
+        """Engines are pooled as configured."""
+        engine = create_pooled_engine(f"sqlite+aiosqlite:///{tmp_path / 'primary.db'}")
+
+        assert isinstance(engine.pool, TimedQueuePool)
+        assert engine.pool.size() == settings.DATABASE_POOL_SIZE
+        assert engine.pool._max_overflow == settings.DATABASE_MAX_OVERFLOW
+        assert engine.pool._timeout == settings.DATABASE_POOL_TIMEOUT
+        assert engine.pool._recycle == settings.DATABASE_POOL_RECYCLE
+        assert engine.pool._pre_ping == settings.DATABASE_POOL_PRE_PING
+
+    @pytest.mark.asyncio
+    async def test_reads_spread_across_replicas(self, tmp_path):
+        """Read sessions are opened on each replica in turn."""
+        engines = []
+        for name in ("first", "second"):
+            engine = create_pooled_engine(f"sqlite+aiosqlite:///{tmp_path / name}.db")
+            async with engine.begin() as conn:
+                await conn.execute(text("CREATE TABLE source (name TEXT)"))
+                await conn.execute(text("INSERT INTO source VALUES (:name)"), {"name": name})
+            engines.append(engine)
+
+        sessions = [async_sessionmaker(bind=engine, class_=AsyncSession) for engine in engines]
+        with patch.object(database, "read_sessions", sessions):
+            names = [await _database_name() for _ in range(4)]
+
+        for engine in engines:
+            await engine.dispose()
+        assert sorted(names) == ["first", "first", "second", "second"]
+        assert names[0] != names[1]
+
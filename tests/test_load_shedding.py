@@ -0,0 +1,120 @@
+"""Unit tests for adaptive load shedding."""
+
+import asyncio
+import time
+
+import pytest
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+from jose import jwt
+
+from src.app.api.dependencies import bulk_request
+from src.app.core.config import settings
+from src.app.core.utils.admission import AdmissionController
+from src.app.middleware.load_shedding_middleware import LoadSheddingMiddleware
+
+TOKEN = jwt.encode(
+    {"sub": "userson", "token_type": "access"}, settings.SECRET_KEY.get_secret_value(), algorithm=settings.ALGORITHM
+)
+AUTHENTICATED = {"Authorization": f"Bearer {TOKEN}"}
+
+
+@pytest.fixture
+def controller():
+    return AdmissionController(max_loop_lag=0.1, max_db_wait=0.2, max_in_flight=10, severe_pressure=2.0, smoothing=1)
+
+
+@pytest.fixture
+def client(controller):
+    app = FastAPI()
+    app.add_middleware(LoadSheddingMiddleware, controller=controller)
+
+    @app.get("/items")
+    async def read_item() -> dict:
+        return {"in_flight": controller.in_flight}
+
+    @app.get("/items/all", dependencies=[Depends(bulk_request)])
+    async def read_items() -> dict:
+        return {}
+
+    return TestClient(app)
+
+
+class TestAdmissionController:
+    """Test how pressure maps to admission."""
+
+    def test_pressure_is_the_worst_signal(self, controller):
+        """Each signal is compared to its own threshold."""
+        controller.record_loop_lag(0.05)
+        controller.record_db_wait(0.3)
+        controller.in_flight = 5
+
+        assert controller.pressure() == pytest.approx(1.5)
+
+    @pytest.mark.parametrize(
+        "pressure, anonymous, bulk, admitted",
+        [
+            (0.9, True, True, True),
+            (1.0, True, False, False),
+            (1.0, False, True, True),
+            (2.0, False, True, False),
+            (10.0, False, False, True),
+        ],
+    )
+    def test_shedding_order(self, controller, pressure, anonymous, bulk, admitted):
+        """Anonymous traffic is shed first, then bulk; authenticated interactive traffic never."""
+        controller.record_loop_lag(pressure * controller.max_loop_lag)
+
+        assert controller.admits(anonymous=anonymous, bulk=bulk) is admitted
+
+    @pytest.mark.asyncio
+    async def test_loop_lag_probe(self):
+        """A blocked event loop shows up as lag, and the DB wait decays without new checkouts."""
+        controller = AdmissionController(smoothing=1, probe_interval=0.01)
+        controller.record_db_wait(1.0)
+        controller.start()
+        await asyncio.sleep(0)
+        time.sleep(0.05)
+        await asyncio.sleep(0.001)
+        assert controller.loop_lag >= 0.03
+
+        await asyncio.sleep(0.05)
+        await controller.stop()
+        assert controller.loop_lag < 0.03
+        assert controller.db_wait == 0
+
+
+class TestLoadSheddingMiddleware:
+    """Test shedding in the ASGI middleware."""
+
+    def test_admits_and_counts_in_flight(self, client, controller):
+        """Without pressure every request is admitted and counted while in flight."""
+        response = client.get("/items")
+
+        assert response.status_code == 200
+        assert response.json() == {"in_flight": 1}
+        assert controller.in_flight == 0
+
+    def test_sheds_anonymous_first(self, client, controller):
+        """Anonymous requests get a 503 with Retry-After, authenticated ones still go through."""
+        controller.record_loop_lag(0.15)
+
+        anonymous = client.get("/items")
+        assert anonymous.status_code == 503
+        assert anonymous.headers["Retry-After"] == "2"
+        assert client.get("/items/all", headers=AUTHENTICATED).status_code == 200
+
+    def test_sheds_bulk_under_severe_pressure(self, client, controller):
+        """Under severe pressure bulk requests are shed too, interactive ones are not."""
+        controller.record_db_wait(1.0)
+
+        assert client.get("/items/all", headers=AUTHENTICATED).status_code == 503
+        assert client.get("/items", headers=AUTHENTICATED).status_code == 200
+
+    def test_sheds_unsigned_tokens_as_anonymous(self, client, controller):
+        """A bearer token that doesn't carry a valid signature doesn't exempt a request from shedding."""
+        controller.record_loop_lag(0.15)
+
+        assert client.get("/items", headers={"Authorization": "Bearer junk"}).status_code == 503
+        assert client.get("/items", headers={"Authorization": f"Bearer {TOKEN[:-2]}xx"}).status_code == 503
+        assert client.get("/items", headers=AUTHENTICATED).status_code == 200
@@ -0,0 +1,104 @@
+"""Unit tests for the login throttle."""
+
+from unittest.mock import AsyncMock, Mock, patch
+
+import pytest
+from fastapi import Response
+from fastapi.security import OAuth2PasswordRequestForm
+
+from src.app.api.v1 import login as login_module
+from src.app.api.v1.login import login_for_access_token
+from src.app.core.exceptions.http_exceptions import (
+    RateLimitException,
+    ServiceUnavailableException,
+    UnauthorizedException,
+)
+from src.app.core.utils.login_throttle import LoginThrottle
+
+
+@pytest.fixture
+def throttle(fake_redis):
+    throttle = LoginThrottle(
+        max_failures_per_username=3,
+        max_failures_per_ip=5,
+        lockout_seconds=10,
+        max_lockout_seconds=30,
+        max_concurrent=1,
+    )
+    throttle.initialize(fake_redis)
+    with patch.object(login_module, "login_throttle", throttle):
+        yield throttle
+
+
+def _login(username: str = "alice", ip: str = "10.0.0.1"):
+    form = OAuth2PasswordRequestForm(username=username, password="wrong")
+    return login_for_access_token(Mock(client=Mock(host=ip)), Response(), form, db=Mock())
+
+
+class TestLoginThrottle:
+    """Test which attempts reach the password check."""
+
+    @pytest.mark.asyncio
+    async def test_locked_out_attempts_skip_the_password_check(self, throttle):
+        """Past the username's failures, attempts are rejected without authenticating."""
+        with patch.object(login_module, "authenticate_user", AsyncMock(return_value=False)) as authenticate:
+            for _ in range(3):
+                with pytest.raises(UnauthorizedException):
+                    await _login(username="Alice")
+
+            with pytest.raises(RateLimitException) as exc_info:
+                await _login(username="alice", ip="10.0.0.2")
+
+        assert authenticate.call_count == 3
+        assert exc_info.value.headers == {"Retry-After": "10"}
+
+    @pytest.mark.asyncio
+    async def test_lockout_doubles_up_to_the_maximum(self, throttle, fake_redis):
+        """Each further failure doubles the lockout, which never exceeds the maximum."""
+        lockout_key = throttle.username_keys("alice")[1]
+        lockouts = []
+        for _ in range(5):
+            await throttle.failed("alice", "10.0.0.1")
+            lockouts.append(await fake_redis.pttl(lockout_key))
+
+        assert lockouts[:2] == [-2, -2]
+        assert lockouts[2:] == [
+            pytest.approx(10000, abs=50),
+            pytest.approx(20000, abs=50),
+            pytest.approx(30000, abs=50),
+        ]
+
+    @pytest.mark.asyncio
+    async def test_addresses_are_locked_out_across_usernames(self, throttle):
+        """An address failing on many usernames is locked out, other addresses aren't."""
+        for i in range(5):
+            await throttle.failed(f"user{i}", "10.0.0.1")
+
+        assert await throttle.locked_for("someone", "10.0.0.1") > 0
+        assert await throttle.locked_for("someone", "10.0.0.2") == 0
+
+    @pytest.mark.asyncio
+    async def test_success_resets_the_username(self, throttle):
+        """A successful login forgets the username's failures."""
+        await throttle.failed("alice", "10.0.0.1")
+        await throttle.failed("alice", "10.0.0.1")
+        await throttle.succeeded("alice")
+        await throttle.failed("alice", "10.0.0.1")
+
+        assert await throttle.locked_for("alice", "10.0.0.2") == 0
+
+    @pytest.mark.asyncio
+    async def test_caps_concurrent_checks(self, throttle):
+        """Attempts past the concurrent checks in flight are rejected with a 503."""
+        async with throttle.attempt("alice", "10.0.0.1"):
+            with pytest.raises(ServiceUnavailableException):
+                async with throttle.attempt("bob", "10.0.0.2"):
+                    pass
+
+        assert throttle.in_flight == 0
+
+    @pytest.mark.asyncio
+    async def test_fails_open_without_redis(self, throttle, fake_redis):
+        """When Redis is unavailable, attempts are let through."""
+        with patch.object(fake_redis, "pipeline", side_effect=ConnectionError):
+            assert await throttle.locked_for("alice", "10.0.0.1") == 0
@@ -0,0 +1,65 @@
+"""Unit tests for keyset pagination."""
+
+from datetime import datetime, timedelta
+
+import pytest
+import pytest_asyncio
+
+from src.app.core.exceptions.http_exceptions import BadRequestException
+from src.app.core.utils.pagination import decode_cursor, encode_cursor, keyset_paginated_response
+from src.app.crud.crud_posts import crud_posts
+from src.app.schemas.post import PostRead
+from tests.conftest import make_post, make_user
+
+START = datetime(2025, 1, 1)
+
+
+@pytest_asyncio.fixture
+async def db(sqlite_db):
+    sqlite_db.add_all([make_user(1), make_user(2)])
+    # posts 4 and 5 share a timestamp, so only the id tells them apart
+    sqlite_db.add_all([make_post(i, 1, created_at=START + timedelta(minutes=min(i, 4))) for i in range(1, 8)])
+    sqlite_db.add(make_post(100, 2, created_at=START))
+    await sqlite_db.commit()
+    return sqlite_db
+
+
+async def _page(db, cursor):
+    return await keyset_paginated_response(
+        crud_posts, db, cursor, 3, schema_to_select=PostRead, created_by_user_id=1, is_deleted=False
+    )
+
+
+class TestKeysetPagination:
+    """Test paging with cursors."""
+
+    @pytest.mark.asyncio
+    async def test_pages_through_every_row_once(self, db):
+        """Pages are newest first, rows with the same timestamp are ordered by id, and the last has no cursor."""
+        ids, cursor = [], ""
+        while cursor is not None:
+            page = await _page(db, cursor)
+            ids += [post["id"] for post in page["data"]]
+            cursor = page["next_cursor"]
+            assert page["has_more"] == (cursor is not None)
+
+        assert ids == [7, 6, 5, 4, 3, 2, 1]
+        assert set(page["data"][0]) == set(PostRead.model_fields)
+
+    @pytest.mark.asyncio
+    async def test_inserts_do_not_shift_pages(self, db):
+        """Rows created after the first page was read don't push rows from it onto the next."""
+        first = await _page(db, "")
+        db.add(make_post(8, 1, created_at=START + timedelta(hours=1)))
+        await db.commit()
+
+        second = await _page(db, first["next_cursor"])
+
+        assert [post["id"] for post in second["data"]] == [4, 3, 2]
+
+    def test_cursor_round_trip(self):
+        """Cursors decode to what they encode, and anything else is a bad request."""
+        assert decode_cursor(encode_cursor(START, 5)) == (START, 5)
+
+        with pytest.raises(BadRequestException):
+            decode_cursor("not a cursor")
@@ -0,0 +1,133 @@
+"""Unit tests for the password hashing pool."""
+
+import asyncio
+import threading
+from unittest.mock import AsyncMock, patch
+
+import bcrypt
+import pytest
+
+from src.app.core import security
+from src.app.core.exceptions.http_exceptions import ServiceUnavailableException
+from src.app.core.security import authenticate_user, hash_password, rehash_password, verify_password
+from src.app.core.utils import password_hashing as password_hashing_module
+from src.app.core.utils.password_hashing import PasswordHashingPool, calibrate_rounds
+from src.app.crud.crud_users import crud_users
+from tests.conftest import make_user
+
+
+@pytest.fixture
+def pool():
+    pool = PasswordHashingPool(workers=1, max_queued=1)
+    yield pool
+    pool.shutdown()
+
+
+class TestPasswordHashingPool:
+    """Test bcrypt running off the event loop."""
+
+    @pytest.mark.asyncio
+    async def test_hash_and_check_round_trip(self):
+        """Hashes made on the pool verify, and wrong passwords don't."""
+        hashed = await hash_password("correct horse")
+
+        assert await verify_password("correct horse", hashed)
+        assert not await verify_password("battery staple", hashed)
+
+    @pytest.mark.asyncio
+    async def test_runs_off_the_event_loop(self, pool):
+        """The loop keeps running while a hash is in progress."""
+        release = threading.Event()
+        running = pool.run("check", release.wait)
+
+        task = asyncio.create_task(running)
+        await asyncio.sleep(0)
+        assert not task.done()
+        release.set()
+
+        assert await task is True
+
+    @pytest.mark.asyncio
+    async def test_rejects_when_the_queue_is_full(self, pool):
+        """Past the workers and the queue, operations fail fast with a 503."""
+        release = threading.Event()
+        tasks = [asyncio.create_task(pool.run("check", release.wait)) for _ in range(2)]
+        await asyncio.sleep(0)
+        rejected = password_hashing_module.password_hash_rejected.get("check")
+
+        with pytest.raises(ServiceUnavailableException) as exc_info:
+            await pool.run("check", release.wait)
+
+        release.set()
+        await asyncio.gather(*tasks)
+        assert exc_info.value.status_code == 503
+        assert exc_info.value.headers == {"Retry-After": "1"}
+        assert password_hashing_module.password_hash_rejected.get("check") == rejected + 1
+        assert pool.pending == 0
+
+    @pytest.mark.asyncio
+    async def test_observes_hash_and_wait_times(self, pool):
+        """Each operation records how long it hashed and how long it waited for a thread."""
+        with patch.object(password_hashing_module.password_hash_seconds, "observe") as hashed:
+            with patch.object(password_hashing_module.password_hash_wait_seconds, "observe") as waited:
+                await pool.hash("secret")
+
+        assert hashed.call_args.args[1] == "hash"
+        assert waited.call_args.args[1] == "hash"
+
+
+class TestCostCalibration:
+    """Test picking the bcrypt cost factor and upgrading older hashes."""
+
+    def test_calibration_fits_the_budget(self):
+        """The cost picked is the highest timed within the budget, and the next one overruns it."""
+        rounds, timings = calibrate_rounds(0.02, minimum=4, samples=1)
+
+        assert timings[rounds] <= 0.02
+        assert rounds + 1 not in timings or timings[rounds + 1] > 0.02
+        assert calibrate_rounds(0.0, minimum=6, samples=1)[0] == 6
+
+    def test_only_cheaper_hashes_need_rehashing(self):
+        """Hashes made at a lower cost than the configured one are upgraded, others aren't."""
+        pool = PasswordHashingPool(rounds=5)
+
+        assert pool.needs_rehash(bcrypt.hashpw(b"secret", bcrypt.gensalt(rounds=4)).decode())
+        assert not pool.needs_rehash(pool.hash_sync("secret"))
+        assert not pool.needs_rehash("not a bcrypt hash")
+
+    @pytest.mark.asyncio
+    async def test_successful_login_rehashes_in_the_background(self, mock_db):
+        """A login verified against an older hash schedules its upgrade, a failed one doesn't."""
+        hashed = bcrypt.hashpw(b"secret", bcrypt.gensalt(rounds=4)).decode()
+        user = {"id": 1, "username": "alice", "hashed_password": hashed}
+
+        with patch.object(security.password_hashing_pool, "rounds", 5):
+            with patch.object(crud_users, "get", AsyncMock(return_value=user)):
+                with patch.object(security, "rehash_password", AsyncMock()) as rehash:
+                    assert not await authenticate_user("alice", "wrong", db=mock_db)
+                    assert await authenticate_user("alice", "secret", db=mock_db) == user
+                    await asyncio.gather(*security._rehash_tasks)
+
+        rehash.assert_called_once_with(1, "secret", hashed)
+
+    @pytest.mark.asyncio
+    async def test_rehash_keeps_concurrent_password_changes(self, sqlite_sessions):
+        """The new hash replaces the one verified, but never a password changed in the meantime."""
+        hashed = bcrypt.hashpw(b"secret", bcrypt.gensalt(rounds=4)).decode()
+        async with sqlite_sessions() as db:
+            user = make_user(1, "alice")
+            user.hashed_password = hashed
+            db.add(user)
+            await db.commit()
+
+        with patch.object(security.password_hashing_pool, "rounds", 5):
+            with patch.object(security, "local_session", sqlite_sessions):
+                await rehash_password(1, "secret", hashed)
+                async with sqlite_sessions() as db:
+                    rehashed = (await crud_users.get(db=db, id=1))["hashed_password"]
+                await rehash_password(1, "secret", hashed)
+
+        assert rehashed.startswith("$2b$05$")
+        assert await verify_password("secret", rehashed)
+        async with sqlite_sessions() as db:
+            assert (await crud_users.get(db=db, id=1))["hashed_password"] == rehashed
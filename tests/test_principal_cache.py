@@ -0,0 +1,145 @@
+"""Unit tests for the authenticated principal cache."""
+
+from typing import Annotated
+from unittest.mock import AsyncMock, Mock, patch
+
+import pytest
+import pytest_asyncio
+from fastapi import Depends, FastAPI
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import event
+
+from src.app.api import dependencies
+from src.app.api.dependencies import authenticate, get_current_user, get_optional_user, rate_limiter_dependency
+from src.app.core.db.database import async_get_db
+from src.app.core.security import create_access_token
+from src.app.core.utils import cache as cache_module
+from src.app.core.utils import principal_cache as principal_cache_module
+from src.app.core.utils.principal_cache import PrincipalCache
+from src.app.core.utils.rate_limit import RateLimitResult
+from src.app.core.utils.token_revocation import TokenRevocationCache
+from src.app.crud.crud_users import crud_users
+from tests.conftest import make_user
+
+PRINCIPAL = {
+    "id": 1,
+    "name": "Alice",
+    "username": "alice",
+    "email": "alice@example.com",
+    "profile_image_url": "https://profileimageurl.com",
+    "is_superuser": False,
+    "tier_id": None,
+}
+
+
+@pytest.fixture
+def principals(fake_redis):
+    principals = PrincipalCache(ttl=30, max_entries=2)
+    with patch.object(cache_module, "client", fake_redis):
+        with patch.object(principal_cache_module, "principal_cache", principals):
+            yield principals
+
+
+@pytest_asyncio.fixture
+async def db(sqlite_db):
+    sqlite_db.add(make_user(1, "alice"))
+    await sqlite_db.commit()
+    return sqlite_db
+
+
+class TestPrincipalCache:
+    """Test the in-process and Redis layers."""
+
+    @pytest.mark.asyncio
+    async def test_served_from_redis_in_other_processes(self, principals):
+        """A principal cached by one process is read from Redis by another."""
+        await principals.set("alice", PRINCIPAL)
+        other = PrincipalCache(ttl=30)
+
+        assert await other.get("alice") == PRINCIPAL
+        assert "alice" in other.local
+
+    @pytest.mark.asyncio
+    async def test_expires_and_evicts(self, principals, fake_redis):
+        """Entries expire after the TTL, and the least recently used are evicted."""
+        await principals.set("alice", PRINCIPAL)
+        await principals.set("bob", PRINCIPAL)
+        await principals.set("carol", PRINCIPAL)
+        assert list(principals.local) == ["bob", "carol"]
+
+        await fake_redis.flushall()
+        with patch.object(principal_cache_module.time, "time", return_value=10**10):
+            assert await principals.get("bob") is None
+
+    @pytest.mark.asyncio
+    async def test_invalidation_reaches_every_layer(self, principals, fake_redis):
+        """Invalidated subjects are dropped locally, in Redis and in other processes."""
+        await principals.set("alice", PRINCIPAL)
+        other = PrincipalCache(ttl=30)
+        await other.get("alice")
+
+        await principals.invalidate(["alice"])
+        await other.drop("alice\nalice@example.com")
+
+        assert await fake_redis.get(principals.key("alice")) is None
+        assert "alice" not in principals.local
+        assert "alice" not in other.local
+
+
+class TestGetCurrentUser:
+    """Test that authenticated requests resolve the user once, and skip the query when it is cached."""
+
+    @pytest.mark.asyncio
+    async def test_cached_principal_skips_the_database(self, principals, mock_db):
+        """Only the first request for a subject loads the user."""
+        token_data = Mock(username_or_email="alice")
+        with patch("src.app.api.dependencies.verify_token", AsyncMock(return_value=token_data)):
+            with patch.object(crud_users, "get", AsyncMock(return_value=PRINCIPAL)) as get:
+                assert await authenticate("token", db=mock_db) == PRINCIPAL
+                assert await authenticate("token", db=mock_db) == PRINCIPAL
+
+        get.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_user_writes_invalidate_on_commit(self, principals, db):
+        """Updating a user through any session drops the principals of its username and email."""
+        await principals.set("alice", PRINCIPAL)
+        await principals.set("alice@example.com", PRINCIPAL)
+
+        await crud_users.update(db=db, object={"name": "Alicia"}, username="alice")
+        for task in list(principals._tasks):
+            await task
+
+        assert principals.local == {}
+        assert await principals.get("alice") is None
+
+    @pytest.mark.asyncio
+    async def test_auth_is_resolved_once_per_request(self, principals, db):
+        """Rate limiting, the optional and the current user share one token check and one user query."""
+        app = FastAPI()
+        app.dependency_overrides[async_get_db] = lambda: db
+
+        @app.get("/me", dependencies=[Depends(rate_limiter_dependency)])
+        async def read_me(
+            current_user: Annotated[dict, Depends(get_current_user)],
+            optional_user: Annotated[dict | None, Depends(get_optional_user)],
+        ) -> dict:
+            assert optional_user == current_user
+            return current_user
+
+        queries = []
+        event.listen(db.bind.sync_engine, "before_cursor_execute", lambda *args: queries.append(args[2]))
+        token = await create_access_token(data={"sub": "alice"})
+        allowed = RateLimitResult(allowed=True, limit=10, remaining=9, reset_after=60, retry_after=0)
+
+        # an unloaded bloom filter sends every revocation check to the database
+        with patch.object(dependencies.rate_limiter, "check", AsyncMock(return_value=allowed)):
+            with patch("src.app.core.security.token_revocations", TokenRevocationCache()):
+                async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+                    response = await client.get("/me", headers={"Authorization": f"Bearer {token}"})
+                    assert response.json()["username"] == "alice"
+                    assert len(queries) == 2
+
+                    queries.clear()
+                    await client.get("/me", headers={"Authorization": f"Bearer {token}"})
+                    assert len(queries) == 1
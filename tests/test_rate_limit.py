@@ -0,0 +1,359 @@
+"""Unit tests for rate limiting."""
+
+from unittest.mock import AsyncMock, Mock, patch
+
+import pytest
+from fastapi import Depends, FastAPI, Response
+from fastapi.routing import APIRoute
+from fastapi.testclient import TestClient
+from jose import jwt
+
+from src.app.api.dependencies import DEFAULT_ALGORITHM, DEFAULT_LIMIT, DEFAULT_PERIOD, rate_limiter_dependency
+from src.app.core.config import settings
+from src.app.core.db.database import async_get_db
+from src.app.core.exceptions.http_exceptions import RateLimitException
+from src.app.core.utils.rate_limit import SCRIPTS, RateLimiter, RateLimitLease, RateLimitResult, rate_limit_checks
+from src.app.core.utils.rate_limit_policies import ConcurrencyPolicy, RateLimitPolicy, RateLimitPolicyTable
+from src.app.middleware.rate_limit_middleware import RateLimitMiddleware, compile_rate_limited_routes
+from src.app.schemas.rate_limit import RateLimitAlgorithm
+
+
+def _request(path: str = "/api/v1/tasks/task") -> Mock:
+    request = Mock()
+    request.url.path = path
+    request.scope = {}
+    request.client.host = "127.0.0.1"
+    del request.app.state.initialization_complete
+    del request.state.rate_limit
+    return request
+
+
+@pytest.fixture
+def policies():
+    table = RateLimitPolicyTable()
+    table.tiers = {1: "free"}
+    table.policies = {(1, "api_v1_tasks_task"): RateLimitPolicy(limit=5, period=60)}
+    return table
+
+
+@pytest.fixture
+def limiter(fake_redis):
+    limiter = RateLimiter()
+    scripts = {algorithm: fake_redis.register_script(script) for algorithm, script in SCRIPTS.items()}
+    with patch.object(RateLimiter, "client", fake_redis):
+        with patch.object(RateLimiter, "scripts", scripts):
+            yield limiter
+
+
+class TestRateLimitPolicyTable:
+    """Test the in-process policy table."""
+
+    @pytest.mark.asyncio
+    async def test_load(self, mock_db):
+        """Tiers and rate limits are indexed by tier id and path."""
+        tiers = Mock()
+        tiers.all.return_value = [(1, "free")]
+        rate_limits = Mock()
+        rate_limits.all.return_value = [(1, "api_v1_tasks_task", 5, 60, "gcra")]
+        concurrency_limits = Mock()
+        concurrency_limits.all.return_value = [(1, "api_v1_tasks_task", 2, 5.0)]
+        mock_db.execute = AsyncMock(side_effect=[tiers, rate_limits, concurrency_limits])
+        table = RateLimitPolicyTable()
+
+        await table.load(mock_db)
+
+        assert table.tier_name(1) == "free"
+        assert table.get(1, "api_v1_tasks_task") == RateLimitPolicy(
+            limit=5, period=60, algorithm=RateLimitAlgorithm.GCRA
+        )
+        assert table.get(1, "api_v1_users") is None
+        assert table.resolve_concurrency(1, "api_v1_tasks_task") == ConcurrencyPolicy(
+            max_concurrent=2, queue_timeout=5.0
+        )
+
+
+class TestRateLimiterDependency:
+    """Test policy resolution in the rate limiter dependency."""
+
+    @pytest.mark.asyncio
+    async def test_tier_policy_applied_without_database(self, policies, current_user_dict):
+        """Authenticated users get their tier policy from the in-process table."""
+        current_user_dict["tier_id"] = 1
+
+        with patch("src.app.api.dependencies.policy_table", policies):
+            with patch("src.app.api.dependencies.rate_limiter") as mock_limiter:
+                mock_limiter.check = AsyncMock(return_value=RateLimitResult(True, 5, 4, 60, 0))
+                response = Response()
+
+                await rate_limiter_dependency(_request(), response, current_user_dict)
+
+                mock_limiter.check.assert_called_once_with(
+                    user_id=current_user_dict["id"],
+                    path="api_v1_tasks_task",
+                    limit=5,
+                    period=60,
+                    algorithm=RateLimitAlgorithm.FIXED_WINDOW,
+                )
+                assert response.headers["X-RateLimit-Remaining"] == "4"
+                assert "Retry-After" not in response.headers
+
+    @pytest.mark.asyncio
+    async def test_default_policy_for_anonymous(self, policies):
+        """Anonymous requests are limited by client address with the default policy."""
+        with patch("src.app.api.dependencies.policy_table", policies):
+            with patch("src.app.api.dependencies.rate_limiter") as mock_limiter:
+                mock_limiter.check = AsyncMock(return_value=RateLimitResult(False, DEFAULT_LIMIT, 0, 30, 2.5))
+
+                with pytest.raises(RateLimitException) as exc_info:
+                    await rate_limiter_dependency(_request(), Response(), None)
+
+                mock_limiter.check.assert_called_once_with(
+                    user_id="127.0.0.1",
+                    path="api_v1_tasks_task",
+                    limit=DEFAULT_LIMIT,
+                    period=DEFAULT_PERIOD,
+                    algorithm=DEFAULT_ALGORITHM,
+                )
+                assert exc_info.value.status_code == 429
+                assert exc_info.value.headers["Retry-After"] == "3"
+
+    @pytest.mark.asyncio
+    async def test_keyed_on_route_template(self, policies):
+        """Requests are keyed on the matched route template rather than the concrete path."""
+        request = _request("/api/v1/user/alice")
+        request.scope = {"route": APIRoute("/api/v1/user/{username}", endpoint=lambda username: None)}
+
+        with patch("src.app.api.dependencies.policy_table", policies):
+            with patch("src.app.api.dependencies.rate_limiter") as mock_limiter:
+                mock_limiter.check = AsyncMock(return_value=RateLimitResult(True, 5, 4, 60, 0))
+
+                await rate_limiter_dependency(request, Response(), None)
+
+        assert mock_limiter.check.call_args.kwargs["path"] == "api_v1_user_{username}"
+
+
+class TestRateLimiterScripts:
+    """Test the limiter scripts against an in-memory Redis."""
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("algorithm", list(RateLimitAlgorithm))
+    async def test_allows_limit_then_rejects(self, limiter, algorithm):
+        """Each algorithm allows exactly `limit` requests in a burst."""
+        results = [await limiter.check("1", "api_v1_tasks", limit=3, period=60, algorithm=algorithm) for _ in range(4)]
+
+        assert [result.allowed for result in results] == [True, True, True, False]
+        assert [result.remaining for result in results[:3]] == [2, 1, 0]
+        assert results[-1].retry_after > 0
+        assert "Retry-After" in results[-1].headers()
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("algorithm", list(RateLimitAlgorithm))
+    async def test_keys_expire(self, limiter, fake_redis, algorithm):
+        """No counter is ever left without a TTL."""
+        await limiter.check("1", "api_v1_tasks", limit=3, period=60, algorithm=algorithm)
+
+        keys = await fake_redis.keys("ratelimit:*")
+        assert keys
+        for key in keys:
+            assert await fake_redis.pttl(key) > 0
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("algorithm", [RateLimitAlgorithm.FIXED_WINDOW, RateLimitAlgorithm.SLIDING_WINDOW])
+    async def test_windows_reset_at_their_boundary(self, limiter, fake_redis, algorithm):
+        """Reset and Retry-After count down to the end of the window, not a full period from its first request."""
+        # 13.7 seconds into a 60 second window
+        with patch("src.app.core.utils.rate_limit.time.time", return_value=60 * 28_000_000 + 13.7):
+            results = [
+                await limiter.check("1", "api_v1_tasks", limit=2, period=60, algorithm=algorithm) for _ in range(3)
+            ]
+            ttls = [await fake_redis.pttl(key) for key in await fake_redis.keys("ratelimit:*")]
+
+        assert results[0].reset_after == pytest.approx(46.3)
+        assert results[-1].retry_after == pytest.approx(46.3)
+        assert results[-1].headers()["X-RateLimit-Reset"] == "47"
+        assert results[-1].headers()["Retry-After"] == "47"
+        if algorithm == RateLimitAlgorithm.FIXED_WINDOW:
+            assert ttls == [46300]
+
+    @pytest.mark.asyncio
+    async def test_subjects_are_isolated(self, limiter):
+        """Users and paths are counted separately."""
+        await limiter.check("1", "api_v1_tasks", limit=1, period=60)
+
+        assert (await limiter.check("2", "api_v1_tasks", limit=1, period=60)).allowed
+        assert (await limiter.check("1", "api_v1_users", limit=1, period=60)).allowed
+        assert await limiter.is_rate_limited("1", "api_v1_tasks", limit=1, period=60)
+
+
+class TestRateLimitLease:
+    """Test the locally leased fixed window mode."""
+
+    @pytest.fixture
+    def lease(self, fake_redis):
+        return RateLimitLease(fake_redis, fraction=0.1, sync_interval=60, min_limit=10)
+
+    @pytest.mark.asyncio
+    async def test_requests_served_from_lease(self, lease, fake_redis):
+        """Only one request in `1 / fraction` goes to Redis, which holds the leased tokens."""
+        before = rate_limit_checks.get("redis")
+
+        results = [await lease.check("ratelimit:1:api_v1_tasks:0", limit=100, period_ms=60000) for _ in range(25)]
+
+        assert all(result.allowed for result in results)
+        assert rate_limit_checks.get("redis") - before == 3
+        assert int(await fake_redis.get("ratelimit:1:api_v1_tasks:0")) == 30
+        assert results[-1].remaining == 75
+
+    @pytest.mark.asyncio
+    async def test_never_admits_more_than_limit(self, fake_redis):
+        """Several workers sharing a window admit exactly `limit` requests between them."""
+        workers = [RateLimitLease(fake_redis, fraction=0.3, sync_interval=0, min_limit=1) for _ in range(3)]
+
+        results = [
+            await worker.check("ratelimit:1:api_v1_tasks:0", limit=10, period_ms=60000)
+            for _ in range(10)
+            for worker in workers
+        ]
+
+        assert sum(result.allowed for result in results) == 10
+        assert all("Retry-After" in result.headers() for result in results if not result.allowed)
+
+    @pytest.mark.asyncio
+    async def test_sync_returns_idle_tokens(self, lease, fake_redis):
+        """Tokens of a lease left unused for a sync interval are handed back to Redis."""
+        await lease.check("ratelimit:1:api_v1_tasks:0", limit=100, period_ms=60000)
+
+        await lease.sync()
+        assert int(await fake_redis.get("ratelimit:1:api_v1_tasks:0")) == 10
+
+        await lease.sync()
+        assert int(await fake_redis.get("ratelimit:1:api_v1_tasks:0")) == 1
+        assert lease.leases["ratelimit:1:api_v1_tasks:0"].tokens == 0
+
+    @pytest.mark.asyncio
+    async def test_leases_end_with_their_window(self, lease):
+        """A lease taken partway through a window expires at the window boundary, not a full period later."""
+        # 13.7 seconds into a 60 second window
+        result = await lease.check(
+            "ratelimit:1:api_v1_tasks:0", limit=100, period_ms=60000, now_ms=60000 * 28_000_000 + 13700
+        )
+
+        assert result.reset_after == pytest.approx(46.3, abs=0.1)
+        assert result.headers()["X-RateLimit-Reset"] == "47"
+
+    @pytest.mark.asyncio
+    async def test_limiter_uses_lease_for_large_fixed_window_limits(self, limiter, lease):
+        """Small limits and other algorithms keep exact checks."""
+        with patch.object(RateLimiter, "lease", lease):
+            await limiter.check("1", "api_v1_tasks", limit=100, period=60)
+            await limiter.check("1", "api_v1_users", limit=5, period=60)
+            await limiter.check("1", "api_v1_posts", limit=100, period=60, algorithm=RateLimitAlgorithm.GCRA)
+
+        assert [key.split(":")[2] for key in lease.leases] == ["api_v1_tasks"]
+
+
+class TestRateLimitMiddleware:
+    """Test admission in the ASGI middleware."""
+
+    @pytest.fixture
+    def app(self):
+        app = FastAPI()
+        app.add_middleware(RateLimitMiddleware)
+        app.dependency_overrides[async_get_db] = lambda: Mock()
+
+        @app.post("/api/v1/tasks/task", dependencies=[Depends(rate_limiter_dependency)])
+        async def create_task(body: dict) -> dict:
+            return body
+
+        @app.get("/api/v1/user/{username}", dependencies=[Depends(rate_limiter_dependency)])
+        async def read_user(username: str) -> dict:
+            return {"username": username}
+
+        @app.get("/api/v1/health")
+        async def health() -> dict:
+            return {}
+
+        return app
+
+    def test_rejects_before_dependencies_and_body(self, app, policies):
+        """An over-limit request gets a 429 without resolving dependencies or parsing the body."""
+        with patch("src.app.middleware.rate_limit_middleware.policy_table", policies):
+            with patch("src.app.middleware.rate_limit_middleware.rate_limiter") as mock_limiter:
+                mock_limiter.check = AsyncMock(return_value=RateLimitResult(False, 5, 0, 30, 30))
+                with patch("src.app.api.dependencies.rate_limiter") as dependency_limiter:
+                    response = TestClient(app).post("/api/v1/tasks/task", content=b"not json")
+
+        assert response.status_code == 429
+        assert response.headers["Retry-After"] == "30"
+        dependency_limiter.check.assert_not_called()
+
+    def test_known_subject_counted_once(self, app, policies, current_user_dict):
+        """A token whose subject the dependency has seen is limited by user and tier, and counted only once."""
+        current_user_dict["tier_id"] = 1
+        policies.remember_subject(current_user_dict["username"], current_user_dict["id"], 1)
+        token = jwt.encode(
+            {"sub": current_user_dict["username"], "token_type": "access"},
+            settings.SECRET_KEY.get_secret_value(),
+            algorithm=settings.ALGORITHM,
+        )
+
+        with patch("src.app.middleware.rate_limit_middleware.policy_table", policies):
+            with patch("src.app.middleware.rate_limit_middleware.rate_limiter") as mock_limiter:
+                mock_limiter.check = AsyncMock(return_value=RateLimitResult(True, 5, 4, 60, 0))
+                with patch("src.app.api.dependencies.get_current_user", AsyncMock(return_value=current_user_dict)):
+                    with patch("src.app.api.dependencies.verify_token", AsyncMock(return_value=Mock())):
+                        with patch("src.app.api.dependencies.rate_limiter") as dependency_limiter:
+                            response = TestClient(app).post(
+                                "/api/v1/tasks/task", json={}, headers={"Authorization": f"Bearer {token}"}
+                            )
+
+        assert response.status_code == 200
+        assert response.headers["X-RateLimit-Remaining"] == "4"
+        mock_limiter.check.assert_called_once_with(
+            user_id=current_user_dict["id"],
+            path="api_v1_tasks_task",
+            limit=5,
+            period=60,
+            algorithm=RateLimitAlgorithm.FIXED_WINDOW,
+        )
+        dependency_limiter.check.assert_not_called()
+
+    def test_unsigned_tokens_limited_by_address(self, app, policies):
+        """A bearer token without a valid signature is limited like an anonymous request, before routing."""
+        with patch("src.app.middleware.rate_limit_middleware.policy_table", policies):
+            with patch("src.app.middleware.rate_limit_middleware.rate_limiter") as mock_limiter:
+                mock_limiter.check = AsyncMock(return_value=RateLimitResult(False, 5, 0, 30, 30))
+                with patch("src.app.api.dependencies.rate_limiter") as dependency_limiter:
+                    response = TestClient(app).post(
+                        "/api/v1/tasks/task", json={}, headers={"Authorization": "Bearer junk"}
+                    )
+
+        assert response.status_code == 429
+        assert mock_limiter.check.call_args.kwargs["user_id"] == "testclient"
+        dependency_limiter.check.assert_not_called()
+
+    def test_compiled_routes(self, app):
+        """Only routes depending on the rate limiter are compiled, keyed on their template."""
+        assert [key for _, key in compile_rate_limited_routes(app.routes)] == [
+            "api_v1_tasks_task",
+            "api_v1_user_{username}",
+        ]
+
+    def test_path_parameters_share_a_key(self, app, policies):
+        """Different values of a path parameter are counted and matched against the same key."""
+        with patch("src.app.middleware.rate_limit_middleware.policy_table", policies):
+            with patch("src.app.middleware.rate_limit_middleware.rate_limiter") as mock_limiter:
+                mock_limiter.check = AsyncMock(return_value=RateLimitResult(True, 5, 4, 60, 0))
+                client = TestClient(app)
+                client.get("/api/v1/user/alice")
+                client.get("/api/v1/user/bob")
+
+        assert {call.kwargs["path"] for call in mock_limiter.check.call_args_list} == {"api_v1_user_{username}"}
+
+    def test_unlimited_routes_pass_through(self, app):
+        """Routes without the rate limit dependency are never counted."""
+        with patch("src.app.middleware.rate_limit_middleware.rate_limiter") as mock_limiter:
+            response = TestClient(app).get("/api/v1/health")
+
+        assert response.status_code == 200
+        mock_limiter.check.assert_not_called()
@@ -0,0 +1,162 @@
+"""Unit tests for the token revocation cache."""
+
+import time
+from datetime import datetime, timedelta
+from unittest.mock import AsyncMock, Mock, patch
+
+import pytest
+from jose import jwt
+
+from src.app.core import security
+from src.app.core.security import (
+    TokenType,
+    blacklist_token,
+    create_access_token,
+    create_refresh_token,
+    verify_token,
+)
+from src.app.core.utils import token_revocation as token_revocation_module
+from src.app.core.utils.token_revocation import REVOKED_KEY, BloomFilter, TokenRevocationCache, token_id
+from src.app.core.worker import functions as worker_functions
+from src.app.core.worker.functions import purge_token_blacklist
+
+
+@pytest.fixture
+def revocations(fake_redis):
+    revocations = TokenRevocationCache(capacity=1000, error_rate=0.01)
+    revocations.initialize(fake_redis)
+    return revocations
+
+
+@pytest.fixture
+def exists():
+    with patch.object(token_revocation_module.crud_token_blacklist, "exists", AsyncMock(return_value=False)) as exists:
+        yield exists
+
+
+async def _load(revocations, mock_db, rows):
+    result = Mock()
+    result.all.return_value = rows
+    mock_db.execute = AsyncMock(return_value=result)
+    await revocations.load(mock_db)
+
+
+class TestBloomFilter:
+    """Test the bloom filter in front of Redis."""
+
+    def test_no_false_negatives_and_bounded_false_positives(self):
+        """Added items are always found, and others only at about the configured rate."""
+        bloom = BloomFilter(capacity=1000, error_rate=0.01)
+        for i in range(1000):
+            bloom.add(f"revoked-{i}")
+
+        assert all(f"revoked-{i}" in bloom for i in range(1000))
+        false_positives = sum(f"valid-{i}" in bloom for i in range(10000))
+        assert false_positives < 300
+
+
+class TestTokenRevocationCache:
+    """Test where revocation checks are answered."""
+
+    @pytest.mark.asyncio
+    async def test_unrevoked_tokens_are_answered_locally(self, revocations, mock_db, exists, fake_redis):
+        """A token missing from the bloom filter needs neither Redis nor the database."""
+        await _load(revocations, mock_db, [])
+
+        with patch.object(fake_redis, "zscore", AsyncMock()) as zscore:
+            assert not await revocations.is_revoked("valid", mock_db)
+
+        zscore.assert_not_called()
+        exists.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_revoked_tokens_are_confirmed_in_redis(self, revocations, mock_db, exists, fake_redis):
+        """A revoked token is found in Redis, which expires it with the token."""
+        await _load(revocations, mock_db, [])
+        expires_at = time.time() + 60
+
+        await revocations.revoke("revoked", expires_at)
+
+        assert await revocations.is_revoked("revoked", mock_db)
+        assert await fake_redis.zscore(REVOKED_KEY, "revoked") == pytest.approx(expires_at)
+        exists.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_load_restores_unexpired_revocations(self, revocations, mock_db, exists, fake_redis):
+        """Revocations from the database are added to the bloom filter and to Redis."""
+        await _load(revocations, mock_db, [("revoked", datetime.now() + timedelta(minutes=5))])
+
+        assert "revoked" in revocations.bloom
+        assert await fake_redis.zscore(REVOKED_KEY, "revoked") is not None
+        assert await revocations.is_revoked("revoked", mock_db)
+
+    @pytest.mark.asyncio
+    async def test_falls_back_to_the_database(self, revocations, mock_db, exists, fake_redis):
+        """Before the bloom filter is loaded, or when Redis fails, the database answers."""
+        exists.return_value = True
+        assert await revocations.is_revoked("revoked", mock_db)
+
+        await _load(revocations, mock_db, [])
+        revocations.bloom.add("revoked")
+        with patch.object(fake_redis, "zscore", AsyncMock(side_effect=ConnectionError)):
+            assert await revocations.is_revoked("revoked", mock_db)
+
+        assert exists.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_revocations_reach_other_workers(self, revocations, mock_db):
+        """A message on the revocation channel adds the token to the bloom filter."""
+        await _load(revocations, mock_db, [])
+
+        await revocations.reload("revoked")
+
+        assert "revoked" in revocations.bloom
+
+
+class TestTokenIds:
+    """Test blacklisting by the token's jti claim."""
+
+    @pytest.mark.asyncio
+    async def test_tokens_are_revoked_by_jti(self, mock_db):
+        """Every token carries a distinct jti, which is what gets blacklisted and checked."""
+        first = await create_access_token(data={"sub": "alice"})
+        second = await create_refresh_token(data={"sub": "alice"})
+        first_jti = jwt.get_unverified_claims(first)["jti"]
+        assert first_jti != jwt.get_unverified_claims(second)["jti"]
+
+        with patch.object(security.crud_token_blacklist, "create", AsyncMock()) as create:
+            with patch.object(security.token_revocations, "revoke", AsyncMock()) as revoke:
+                await blacklist_token(first, mock_db)
+
+        assert create.call_args.kwargs["object"].jti == first_jti
+        assert revoke.call_args.args[0] == first_jti
+
+        with patch.object(security.token_revocations, "is_revoked", AsyncMock(return_value=True)) as is_revoked:
+            assert await verify_token(first, TokenType.ACCESS, mock_db) is None
+        is_revoked.assert_called_once_with(first_jti, mock_db)
+
+    def test_tokens_without_jti_are_identified_by_digest(self):
+        """Tokens issued before the jti claim keep a stable, fixed-size id."""
+        assert token_id("legacy", {}) == token_id("legacy", {"sub": "alice"})
+        assert len(token_id("legacy", {})) == 64
+        assert token_id("legacy", {"jti": "abc"}) == "abc"
+
+
+class TestPurgeTokenBlacklist:
+    """Test the expired token purge job."""
+
+    @pytest.mark.asyncio
+    async def test_purges_in_batches(self, mock_db):
+        """Batches are deleted and committed until one comes back short."""
+        mock_db.execute = AsyncMock(side_effect=[Mock(rowcount=2), Mock(rowcount=2), Mock(rowcount=1)])
+        session = AsyncMock()
+        session.__aenter__.return_value = mock_db
+
+        with (
+            patch.object(worker_functions, "local_session", Mock(return_value=session)),
+            patch.object(worker_functions.settings, "TOKEN_BLACKLIST_PURGE_BATCH_SIZE", 2),
+        ):
+            assert await purge_token_blacklist({}) == 5
+
+        assert mock_db.execute.call_count == 3
+        assert mock_db.commit.call_count == 3
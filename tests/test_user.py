@@ -23,7 +23,7 @@ class TestWriteUser:
             mock_crud.create = AsyncMock(return_value=Mock(id=1))
             mock_crud.get = AsyncMock(return_value=sample_user_read)
 
-            with patch("src.app.api.v1.users.get_password_hash") as mock_hash:
+            with patch("src.app.api.v1.users.hash_password", AsyncMock()) as mock_hash:
                 mock_hash.return_value = "hashed_password"
 
                 result = await write_user(Mock(), user_create, mock_db)
@@ -98,6 +98,7 @@ class TestReadUsers:
 
         with patch("src.app.api.v1.users.crud_users") as mock_crud:
             mock_crud.get_multi = AsyncMock(return_value=mock_users_data)
+            mock_crud.count = AsyncMock(return_value=2)
 
             with patch("src.app.api.v1.users.paginated_response") as mock_paginated:
                 expected_response = {"data": [{"id": 1}, {"id": 2}], "pagination": {}}
@@ -0,0 +1,147 @@
+"""Unit tests for the username scoped queries."""
+
+from unittest.mock import patch
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import event
+
+from src.app.api.v1.posts import erase_post, patch_post, read_post, read_posts
+from src.app.api.v1.users import read_user_rate_limits, read_user_tier
+from src.app.core.exceptions.http_exceptions import NotFoundException
+from src.app.core.utils import cache as cache_module
+from src.app.core.utils.principal_cache import PrincipalCache
+from src.app.crud import crud_user_scoped
+from src.app.models import RateLimit, Tier
+from src.app.schemas.post import PostUpdate
+from tests.conftest import make_post, make_user, mock_request
+
+
+@pytest_asyncio.fixture
+async def db(sqlite_db, fake_redis):
+    sqlite_db.add(Tier(name="pro"))
+    await sqlite_db.flush()
+    sqlite_db.add_all(
+        [
+            RateLimit(tier_id=1, name="posts", path="api_v1_posts", limit=10, period=60),
+            RateLimit(tier_id=1, name="users", path="api_v1_users", limit=5, period=60),
+            make_user(1, tier_id=1),
+            make_user(2),
+            make_post(1, 1),
+            make_post(2, 1),
+            make_post(3, 2),
+        ]
+    )
+    await sqlite_db.commit()
+
+    with patch.object(cache_module, "client", fake_redis):
+        with patch.object(crud_user_scoped, "principal_cache", PrincipalCache(ttl=30)):
+            yield sqlite_db
+
+
+@pytest.fixture
+def queries(db):
+    queries = []
+    event.listen(db.bind.sync_engine, "before_cursor_execute", lambda *args: queries.append(args[2]))
+    return queries
+
+
+# the endpoints are called unwrapped, so the response cache doesn't hide their queries
+class TestPostEndpoints:
+    """Test that the post endpoints find the user and the post in one query."""
+
+    @pytest.mark.asyncio
+    async def test_read_post(self, db, queries):
+        """A post is read in one query, whether or not its user's id was cached."""
+        post = await read_post.__wrapped__(mock_request(), username="user1", id=1, db=db)
+        assert post["title"] == "Post 1"
+        assert len(queries) == 1
+
+        queries.clear()
+        assert (await read_post.__wrapped__(mock_request(), username="user1", id=2, db=db))["id"] == 2
+        assert len(queries) == 1
+
+    @pytest.mark.asyncio
+    async def test_read_post_not_found(self, db):
+        """Unknown users and posts of other users are not found."""
+        with pytest.raises(NotFoundException, match="User not found"):
+            await read_post.__wrapped__(mock_request(), username="nobody", id=1, db=db)
+        with pytest.raises(NotFoundException, match="Post not found"):
+            await read_post.__wrapped__(mock_request(), username="user1", id=3, db=db)
+        with pytest.raises(NotFoundException, match="Post not found"):
+            await read_post.__wrapped__(mock_request(), username="user2", id=1, db=db)
+
+    @pytest.mark.asyncio
+    async def test_read_posts(self, db, queries):
+        """A page is read in one query, plus the count until it is cached."""
+        page = await read_posts.__wrapped__(mock_request(), username="user1", db=db)
+        assert [post["id"] for post in page["data"]] == [1, 2]
+        assert page["total_count"] == 2
+        assert len(queries) == 2
+
+        queries.clear()
+        page = await read_posts.__wrapped__(mock_request(), username="user1", db=db)
+        assert page["total_count"] == 2
+        assert len(queries) == 1
+
+    @pytest.mark.asyncio
+    async def test_read_posts_past_the_last_page(self, db):
+        """An empty page is told apart from a missing user."""
+        page = await read_posts.__wrapped__(mock_request(), username="user2", db=db, page=2)
+        assert page["data"] == []
+
+        with pytest.raises(NotFoundException, match="User not found"):
+            await read_posts.__wrapped__(mock_request(), username="nobody", db=db, page=2)
+
+    @pytest.mark.asyncio
+    async def test_patch_and_erase_post(self, db, queries):
+        """Writes check the user and the post in one query, and only reach their own user's posts."""
+        current_user = {"id": 1, "username": "user1"}
+        values = PostUpdate(title="Edited")
+        await patch_post.__wrapped__(
+            mock_request("PATCH"), username="user1", id=1, values=values, current_user=current_user, db=db
+        )
+        # one select of the user and the post, then FastCRUD's row count and the update
+        assert len(queries) == 3
+        assert sum("FROM user" in query for query in queries) == 1
+
+        with pytest.raises(NotFoundException, match="Post not found"):
+            await erase_post.__wrapped__(
+                mock_request("DELETE"), username="user1", id=3, current_user=current_user, db=db
+            )
+
+        queries.clear()
+        await erase_post.__wrapped__(mock_request("DELETE"), username="user1", id=2, current_user=current_user, db=db)
+        assert queries[0].startswith("SELECT")
+        assert not any("FROM user" in query for query in queries[1:])
+
+
+class TestUserTierEndpoints:
+    """Test that the tier endpoints find the user, the tier and its rate limits in one query."""
+
+    @pytest.mark.asyncio
+    async def test_read_user_tier(self, db, queries):
+        """The user and their tier are read in one query."""
+        user = await read_user_tier(mock_request(), username="user1", db=db)
+        assert user["tier_name"] == "pro"
+        assert len(queries) == 1
+
+        assert await read_user_tier(mock_request(), username="user2", db=db) is None
+        with pytest.raises(NotFoundException, match="User not found"):
+            await read_user_tier(mock_request(), username="nobody", db=db)
+
+    @pytest.mark.asyncio
+    async def test_read_user_rate_limits(self, db, queries):
+        """The user, their tier and its rate limits are read in one query, cached or not."""
+        user = await read_user_rate_limits(mock_request(), username="user1", db=db)
+        assert sorted(rate_limit["name"] for rate_limit in user["tier_rate_limits"]) == ["posts", "users"]
+        assert len(queries) == 1
+
+        # resolving user1 through a post caches their id
+        await read_post.__wrapped__(mock_request(), username="user1", id=1, db=db)
+        queries.clear()
+        cached = await read_user_rate_limits(mock_request(), username="user1", db=db)
+        assert cached == user
+        assert len(queries) == 1
+
+        assert (await read_user_rate_limits(mock_request(), username="user2", db=db))["tier_rate_limits"] == []